@@ -1,8 +1,11 @@
 """
 项目配置文件
+导入时从环境变量（含 .env）解析一次，之后只读；目录由写入文件的模块在首次写入时创建。
 """
 import os
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -12,8 +15,35 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent.parent
 
 
-class Settings:
-    """项目配置类"""
+def _freeze(value):
+    """列表转为元组、字典转为只读映射（递归）"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+class _FrozenSettings(type):
+    """配置类的元类：类体执行完（配置解析完成）后冻结，禁止修改配置项"""
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        for key, value in namespace.items():
+            if key.isupper():
+                type.__setattr__(cls, key, _freeze(value))
+
+    def __setattr__(cls, name, value):
+        raise AttributeError(f"配置只读: {name}，请通过环境变量设置，脚本中可使用 Settings.override() 临时覆盖")
+
+    def __delattr__(cls, name):
+        raise AttributeError(f"配置只读: {name}")
+
+
+class Settings(metaclass=_FrozenSettings):
+    """项目配置类（只读）"""
+    
+    __slots__ = ()
     
     # 基础URL
     BASE_URL = os.getenv("BASE_URL", "https://ultimateqa.com/automation")
@@ -35,6 +65,130 @@ class Settings:
     # 权限配置
     PERMISSIONS = os.getenv("PERMISSIONS", "").split(",") if os.getenv("PERMISSIONS") else []
     
+    # 共享浏览器服务（仅 pytest-xdist 并行时生效，worker 连接 controller 启动的浏览器服务而不是各自启动浏览器）
+    BROWSER_SERVER = os.getenv("BROWSER_SERVER", "False").lower() == "true"
+    BROWSER_SERVER_COUNT = int(os.getenv("BROWSER_SERVER_COUNT", "1"))  # 浏览器服务数量
+    
+    # 异步引擎：async def 用例在同一进程内的最大并发数（每个用例独立上下文，共享一个浏览器）
+    ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "4"))
+    
+    # BrowserContext 复用池配置（默认关闭，开启后测试间复用已预热的上下文）
+    CONTEXT_POOL = os.getenv("CONTEXT_POOL", "False").lower() == "true"
+    CONTEXT_POOL_SIZE = int(os.getenv("CONTEXT_POOL_SIZE", "2"))  # 空闲上下文上限
+    CONTEXT_POOL_MAX_USES = int(os.getenv("CONTEXT_POOL_MAX_USES", "50"))  # 单个上下文最大复用次数
+    
+    # 登录配置（登录态缓存在首次使用某个测试数据用户时通过该页面登录）
+    LOGIN_URL = os.getenv("LOGIN_URL", "https://courses.ultimateqa.com/users/sign_in")
+    LOGIN_USERNAME_SELECTOR = os.getenv("LOGIN_USERNAME_SELECTOR", "input[name='user[email]']")
+    LOGIN_PASSWORD_SELECTOR = os.getenv("LOGIN_PASSWORD_SELECTOR", "input[name='user[password]']")
+    LOGIN_SUBMIT_SELECTOR = os.getenv("LOGIN_SUBMIT_SELECTOR", "button[type='submit']")
+    
+    # 登录态缓存配置
+    AUTH_STATE_DIR = BASE_DIR / ".auth"
+    AUTH_STATE_TTL = int(os.getenv("AUTH_STATE_TTL", "3600"))  # 登录态有效期（秒）
+    
+    # 网络请求拦截配置（context 级别，测试可通过 @pytest.mark.block_profile("名称") 覆盖）
+    # resource_types: 拦截的资源类型；deny: 拦截的URL通配符；allow: 始终放行的URL通配符（优先级最高）
+    BLOCK_PROFILE = os.getenv("BLOCK_PROFILE", "off")
+    BLOCK_PROFILES = {
+        "off": {},
+        "media": {
+            "resource_types": ["image", "media", "font"],
+        },
+        "trackers": {
+            "deny": [
+                "*://*.google-analytics.com/*",
+                "*://*.googletagmanager.com/*",
+                "*://*.doubleclick.net/*",
+                "*://*.facebook.net/*",
+                "*://*.hotjar.com/*",
+                "*://*.clarity.ms/*",
+            ],
+        },
+        "lean": {
+            "resource_types": ["image", "media", "font"],
+            "deny": [
+                "*://*.google-analytics.com/*",
+                "*://*.googletagmanager.com/*",
+                "*://*.doubleclick.net/*",
+                "*://*.facebook.net/*",
+                "*://*.hotjar.com/*",
+                "*://*.clarity.ms/*",
+                "*://*.youtube.com/*",
+                "*://fonts.googleapis.com/*",
+            ],
+            "allow": [],
+        },
+    }
+    
+    # HAR 录制/回放配置（命令行 --har-mode 优先）
+    HAR_MODE = os.getenv("HAR_MODE", "off")  # off, record, replay
+    HAR_DIR = BASE_DIR / "data" / "har"
+    HAR_NOT_FOUND = os.getenv("HAR_NOT_FOUND", "abort")  # 回放未命中请求: abort, fallback, error
+    HAR_MAX_AGE_DAYS = int(os.getenv("HAR_MAX_AGE_DAYS", "30"))  # 存档过期天数
+    HAR_URL_FILTER = os.getenv("HAR_URL_FILTER") or None  # 只录制/回放匹配的URL（通配符）
+    
+    # 本地缓存目录（资源大小表、响应缓存等）
+    CACHE_DIR = BASE_DIR / ".cache"
+    
+    # 磁盘响应缓存（所有上下文和 worker 共享，HAR 录制/回放时不生效）
+    RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "False").lower() == "true"
+    RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "200"))  # 缓存总大小上限（MB）
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))  # 缓存有效期上限（秒），实际有效期按响应头计算
+    RESPONSE_CACHE_TYPES = os.getenv("RESPONSE_CACHE_TYPES", "script,stylesheet,image,font").split(",")
+    
+    # 步骤级重试：页面操作和等待遇到瞬时错误（元素被重新渲染、导航连接重置等）时在步骤内退避重试
+    # 默认开启（pytest.ini 的 --reruns=1 依赖它处理瞬时错误）；成功路径只多一次函数调用（约 0.1 微秒，见 demo/benchmark_step_retry.py）
+    STEP_RETRY = os.getenv("STEP_RETRY", "True").lower() == "true"
+    STEP_RETRY_ATTEMPTS = int(os.getenv("STEP_RETRY_ATTEMPTS", "3"))  # 单个步骤最多尝试次数（含第一次）
+    STEP_RETRY_BUDGET = int(os.getenv("STEP_RETRY_BUDGET", "5"))  # 单个测试最多重试次数
+    STEP_RETRY_BACKOFF_MS = int(os.getenv("STEP_RETRY_BACKOFF_MS", "200"))  # 退避基础时间，每次翻倍并加随机抖动
+    STEP_RETRY_MAX_BACKOFF_MS = int(os.getenv("STEP_RETRY_MAX_BACKOFF_MS", "2000"))
+    
+    # 测试结果历史库（.cache/test_history.sqlite3）：按历史决定每个测试的重跑次数，覆盖 pytest.ini 中的 --reruns
+    FLAKY_HISTORY = os.getenv("FLAKY_HISTORY", "True").lower() == "true"
+    FLAKY_HISTORY_WINDOW = int(os.getenv("FLAKY_HISTORY_WINDOW", "20"))  # 统计最近多少次运行（更早的记录在运行结束时删除）
+    FLAKY_MIN_RUNS = int(os.getenv("FLAKY_MIN_RUNS", "3"))  # 少于该次数视为新测试；连续该次数相同错误视为确定性失败
+    FLAKY_RERUNS = int(os.getenv("FLAKY_RERUNS", "2"))  # 有不稳定历史的测试重跑次数
+    FLAKY_RERUNS_DELAY = float(os.getenv("FLAKY_RERUNS_DELAY", "0"))  # 重跑前等待（秒）
+    FLAKY_NEW_TEST_RERUNS = int(os.getenv("FLAKY_NEW_TEST_RERUNS", "1"))  # 历史不足的测试重跑次数（用于发现不稳定）
+    
+    # 并行调度（命令行 --schedule 优先）：duration 按历史耗时（.cache/test_durations.json）从长到短分配，
+    # 并尽量把共享登录态或 HAR 存档的测试分到同一个 worker（大分组按平均负载切块）；default 使用 xdist 默认调度
+    XDIST_SCHEDULE = os.getenv("XDIST_SCHEDULE", "duration")
+    
+    # 测试影响分析：运行测试时记录每个测试调用到的 pages/、utils/ 模块和测试数据键（有额外开销，按需开启）
+    IMPACT_RECORD = os.getenv("IMPACT_RECORD", "False").lower() == "true"
+    
+    # 导航性能采集：页面对象导航后记录 Navigation Timing、Paint、LCP/CLS、传输大小和请求数
+    # 到 reports/perf/perf-<运行 ID>.jsonl；页面对象的 PERF_BUDGET 超出时按 PERF_BUDGET_MODE 处理（off, warn, fail）
+    # 每次导航多一个 init script 和一次 evaluate，默认关闭，run_tests.py 运行时开启
+    PERF_METRICS = os.getenv("PERF_METRICS", "False").lower() == "true"
+    PERF_BUDGET_MODE = os.getenv("PERF_BUDGET_MODE", "warn")
+    
+    # 页面操作耗时统计：BasePage 操作按等待和执行阶段计时，终端摘要输出 p50/p95/p99 并写入 JSON 报告
+    # 默认关闭，run_tests.py 运行时开启
+    ACTION_TIMING = os.getenv("ACTION_TIMING", "False").lower() == "true"
+    
+    # 快速操作模式：BasePage 对字符串选择器不再先单独等待元素可见，由操作自身的可操作性检查等待（点击、填充等操作一次往返；默认关闭，开启前先用 demo/benchmark_actions.py 对比）
+    FAST_ACTIONS = os.getenv("FAST_ACTIONS", "False").lower() == "true"
+    
+    # 网络静默等待（替代 networkidle）：跟踪页面进行中的请求，忽略下列 URL 通配符、资源类型和进行中超过
+    # NETWORK_QUIET_LONG_REQUEST_MS 的长请求（长轮询），其余请求全部结束并静默 NETWORK_QUIET_MS 后视为页面稳定
+    NETWORK_QUIET_MS = int(os.getenv("NETWORK_QUIET_MS", "200"))
+    NETWORK_QUIET_IGNORE = [pattern for pattern in os.getenv(
+        "NETWORK_QUIET_IGNORE",
+        "*://*.google-analytics.com/*,*://*.googletagmanager.com/*,*://*.doubleclick.net/*,"
+        "*://*.facebook.net/*,*://*.hotjar.com/*,*://*.clarity.ms/*,*://hm.baidu.com/*",
+    ).split(",") if pattern]
+    NETWORK_QUIET_IGNORE_TYPES = os.getenv("NETWORK_QUIET_IGNORE_TYPES", "websocket,eventsource,media").split(",")
+    NETWORK_QUIET_LONG_REQUEST_MS = int(os.getenv("NETWORK_QUIET_LONG_REQUEST_MS", "5000"))
+    
+    # 日志：text 为按天轮转的文本日志 logs/test_YYYYMMDD.log；json 为每个进程（xdist worker）一个 JSON lines 文件
+    # logs/json/<运行 ID>/<worker>.jsonl，由后台线程写入，每行带测试 nodeid 和页面操作字段，会话结束后合并为 merged.jsonl
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")  # 日志文件级别，低于该级别（且低于控制台 INFO）的日志不会格式化
+    
     # 测试数据路径
     DATA_DIR = BASE_DIR / "data"
     TEST_DATA_FILE = DATA_DIR / "test_data.yaml"
@@ -43,6 +197,30 @@ class Settings:
     REPORTS_DIR = BASE_DIR / "reports"
     LOGS_DIR = BASE_DIR / "logs"
     SCREENSHOTS_DIR = BASE_DIR / "screenshots"
+    TRACES_DIR = BASE_DIR / "test-results"
+    
+    # Trace 录制模式（命令行 --trace-mode 优先）：off, on, retain-on-failure, on-first-retry
+    # 兼容旧用法：未设置 TRACE_MODE 时 TRACE=1（或 true/yes）等同 on
+    TRACE_MODE = os.getenv("TRACE_MODE") or (
+        "on" if os.getenv("TRACE", "").strip().lower() in ("1", "true", "yes") else "off"
+    )
+    TRACE_SCREENSHOTS = os.getenv("TRACE_SCREENSHOTS", "True").lower() == "true"
+    TRACE_SNAPSHOTS = os.getenv("TRACE_SNAPSHOTS", "True").lower() == "true"
+    TRACE_SOURCES = os.getenv("TRACE_SOURCES", "True").lower() == "true"
+    TRACE_MEASURE_CPU = os.getenv("TRACE_MEASURE_CPU", "True").lower() == "true"  # 按模式统计每测试 CPU 开销
+    
+    # 视频录制模式（命令行 --video-mode 优先）：off, on, retain-on-failure
+    # 录制视频的测试不使用上下文复用池；Playwright 不支持配置帧率，通过降低分辨率控制编码和磁盘开销
+    VIDEO_MODE = os.getenv("VIDEO_MODE", "off")
+    VIDEO_WIDTH = int(os.getenv("VIDEO_WIDTH", "640"))
+    VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", "360"))
+    
+    # 测试产物（失败截图、Trace、失败日志）后台写入配置
+    ARTIFACT_WORKERS = int(os.getenv("ARTIFACT_WORKERS", "2"))  # 后台写入线程数
+    ARTIFACT_MAX_PENDING = int(os.getenv("ARTIFACT_MAX_PENDING", "8"))  # 最大排队数，超过时测试线程等待
+    SCREENSHOT_TYPE = os.getenv("SCREENSHOT_TYPE", "png")  # png, jpeg（jpeg 在浏览器端编码更快、体积更小）
+    SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "80"))  # jpeg 质量
+    SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", "0"))  # 截图最大宽度，0 表示不缩放（需 Pillow）
     
     # API配置
     API_BASE_URL = os.getenv("API_BASE_URL", "https://api.example.com")
@@ -59,9 +237,34 @@ class Settings:
     IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", "20"))  # 隐式等待（秒）
     EXPLICIT_WAIT = int(os.getenv("EXPLICIT_WAIT", "30"))  # 显式等待（秒）
     
+    def __setattr__(self, name, value):
+        raise AttributeError(f"配置只读: {name}")
+    
+    @classmethod
+    @contextmanager
+    def override(cls, **values):
+        """
+        临时覆盖配置项（用于基准脚本和调试，只影响当前进程，不会传给 xdist worker）
+        
+        Example:
+            with Settings.override(FAST_ACTIONS=False):
+                ...
+        """
+        unknown = [name for name in values if not name.isupper() or not hasattr(cls, name)]
+        if unknown:
+            raise AttributeError(f"未定义的配置项: {', '.join(unknown)}")
+        previous = {name: getattr(cls, name) for name in values}
+        try:
+            for name, value in values.items():
+                type.__setattr__(cls, name, _freeze(value))
+            yield cls
+        finally:
+            for name, value in previous.items():
+                type.__setattr__(cls, name, value)
+    
     @classmethod
     def create_directories(cls):
-        """创建必要的目录"""
+        """创建必要的目录（各模块写入文件时会自动创建所在目录，一般无需调用）"""
         directories = [
             cls.DATA_DIR,
             cls.REPORTS_DIR,
@@ -71,7 +274,3 @@ class Settings:
         for directory in directories:
             directory.mkdir(parents=True, exist_ok=True)
 
-
-# 初始化时创建目录
-Settings.create_directories()
-
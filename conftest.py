@@ -2,19 +2,39 @@
 Pytest配置文件 - 全局fixture和钩子函数
 """
 import pytest
-from playwright.sync_api import Playwright, Browser, BrowserContext, Page
 from loguru import logger
 import os
+import tempfile
 from datetime import datetime
+from pathlib import Path
 
+from utils import action_timing
+from utils.artifact_writer import ArtifactWriter
+from utils.async_engine import (
+    AsyncEngine, is_async_item, ran_concurrently, replay_outcome, replayed_duration, replayed_screenshot,
+    run_items_concurrently, screenshot_options,
+)
+from utils.auth_cache import AuthStateCache
 from utils.browser_manager import BrowserManager
-from utils.logger_config import setup_logger
+from utils.browser_server import BrowserServerPool
+from utils.data_loader import DataLoader
+from utils.datasets import Dataset
+from utils.duration_scheduler import DurationScheduling, DurationStore, ScheduleRecorder, fixture_group
+from utils.flaky_history import FlakyHistory
+from utils.har_manager import HarManager
+from utils.logger_config import drain_logger, json_log_dir, merge_logs, prune_logs, setup_logger
+from utils import network_quiet
+from utils import perf_metrics
+from utils.network_blocker import NetworkBlocker, ResourceSizeTable, record_blocking_stats
+from utils.response_cache import ResponseCache
+from utils.session_stats import session_stats
+from utils import step_retry
+from utils.test_impact import ImpactMap, RuntimeRecorder, file_signature
+from utils.trace_manager import TraceManager
+from utils.video_manager import VideoManager
+from utils import wait_utils
 from config.settings import Settings
 
-
-# 配置日志
-setup_logger()
-
 """
 跳过测试文件的配置                                                           
 # ==================== 用例收集配置 ====================
@@ -33,6 +53,312 @@ collect_ignore_glob = [
 ]
 """
 
+_browser_server_pool_key = pytest.StashKey[BrowserServerPool]()
+
+
+def _dry_run(config) -> bool:
+    """只收集或只列出执行计划（--collect-only、--setup-plan）时不启动浏览器服务、异步引擎等资源"""
+    return config.option.collectonly or config.option.setupplan
+
+
+def _browser_launch_args(settings):
+    """浏览器启动参数（fixture 与共享浏览器服务共用）"""
+    return {
+        "headless": settings.HEADLESS,
+        "slow_mo": settings.SLOW_MO,
+        "timeout": settings.BROWSER_TIMEOUT * 1000,
+        "args": ["--start-maximized"],
+    }
+
+
+def _context_options(settings):
+    """创建浏览器上下文的参数（同步 fixture 与异步引擎共用）"""
+    # 按参考示例使用 no_viewport=True 以占用最大可用尺寸
+    return {
+        "no_viewport": True,
+        "locale": settings.LOCALE,
+        "timezone_id": settings.TIMEZONE,
+        "ignore_https_errors": settings.IGNORE_HTTPS_ERRORS,
+    }
+
+
+def _test_failed(item) -> bool:
+    """测试的 setup 或 call 阶段是否失败（由 pytest_runtest_makereport 写入 rep_*）"""
+    return any(
+        getattr(item, f"rep_{when}", None) is not None and getattr(item, f"rep_{when}").failed
+        for when in ("setup", "call")
+    )
+
+
+# 测试结果历史库（controller 在 pytest_configure 中创建）
+_flaky_history = None
+# 测试耗时记录和调度统计（controller 使用）
+_duration_store = None
+_schedule_recorder = None
+# 测试影响分析的运行时记录（IMPACT_RECORD=true 时每个进程各自记录）
+_impact_recorder = RuntimeRecorder(Settings.BASE_DIR) if Settings.IMPACT_RECORD else None
+_impact_records = {}
+# 导航性能记录的运行 ID（xdist worker 使用 controller 传入的 ID，写入同一个 JSONL 文件）
+_perf_run_id = None
+
+
+# 异步引擎（首次使用 async 用例时创建）
+_async_engine = None
+
+
+def _get_async_engine() -> AsyncEngine:
+    """获取当前进程的异步引擎"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = AsyncEngine(
+            browser_type=Settings.BROWSER,
+            launch_options=_browser_launch_args(Settings),
+            context_options=_context_options(Settings),
+            permissions=Settings.PERMISSIONS,
+        )
+    return _async_engine.start()
+
+
+def pytest_addoption(parser):
+    """自定义命令行选项"""
+    parser.addoption(
+        "--har-mode",
+        action="store",
+        default=None,
+        choices=HarManager.MODES,
+        help="HAR 录制/回放模式: record 录制存档, replay 从存档回放（离线）, off 关闭（默认取 HAR_MODE）",
+    )
+    parser.addoption(
+        "--trace-mode",
+        action="store",
+        default=None,
+        choices=TraceManager.MODES,
+        help="Trace 录制模式: on 全部保存, retain-on-failure 仅保存失败用例, "
+             "on-first-retry 仅在第一次重跑时录制, off 关闭（默认取 TRACE_MODE）",
+    )
+    parser.addoption(
+        "--video-mode",
+        action="store",
+        default=None,
+        choices=VideoManager.MODES,
+        help="视频录制模式: on 全部保存, retain-on-failure 仅保存失败用例, off 关闭（默认取 VIDEO_MODE）",
+    )
+    parser.addoption(
+        "--schedule",
+        action="store",
+        default=None,
+        choices=("duration", "default"),
+        help="并行调度方式: duration 按历史耗时从长到短分配并按共享 fixture 分组, default 使用 xdist 默认调度"
+             "（默认取 XDIST_SCHEDULE）",
+    )
+
+
+def pytest_configure(config):
+    """xdist controller 按需启动共享浏览器服务，并打开测试结果历史库和耗时记录"""
+    global _perf_run_id
+    workerinput = getattr(config, "workerinput", {})
+    _perf_run_id = workerinput.get("perf_run_id") or datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 日志在这里而不是导入时配置，文件在第一条日志写入时才创建；JSON 日志按运行 ID 分目录，每个 worker 一个文件
+    setup_logger(run_id=_perf_run_id)
+    is_controller = not hasattr(config, "workerinput") and config.getoption("numprocesses", None)
+    if Settings.BROWSER_SERVER and is_controller and not _dry_run(config):
+        launch_args = _browser_launch_args(Settings)
+        # slow_mo 由 worker 连接时在客户端生效
+        launch_args.pop("slow_mo")
+        endpoints_file = os.path.join(tempfile.gettempdir(), f"pw-browser-servers-{os.getpid()}.json")
+        pool = BrowserServerPool(Settings.BROWSER, launch_args, Settings.BROWSER_SERVER_COUNT, endpoints_file)
+        pool.start()
+        config.stash[_browser_server_pool_key] = pool
+    # 结果只由 controller（或未并行时的唯一进程）写入历史库
+    global _flaky_history, _duration_store
+    if hasattr(config, "workerinput") or _dry_run(config):
+        return
+    if Settings.LOG_FORMAT == "json":
+        prune_logs()
+    if Settings.FLAKY_HISTORY:
+        _flaky_history = FlakyHistory(
+            Settings.CACHE_DIR / "test_history.sqlite3",
+            window=Settings.FLAKY_HISTORY_WINDOW,
+            min_runs=Settings.FLAKY_MIN_RUNS,
+        )
+    _duration_store = DurationStore(Settings.CACHE_DIR / "test_durations.json")
+    _duration_store.seed_from_json_report(Settings.REPORTS_DIR / "report.json")
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """并行调度：按历史耗时从长到短分配（--dist 为默认的 load 时生效）"""
+    global _schedule_recorder
+    mode = config.getoption("--schedule") or Settings.XDIST_SCHEDULE
+    _schedule_recorder = ScheduleRecorder(mode)
+    if mode == "duration" and config.getvalue("dist") == "load" and _duration_store is not None:
+        return DurationScheduling(config, _duration_store, log)
+    return None
+
+
+def pytest_generate_tests(metafunc):
+    """
+    @pytest.mark.dataset("users.csv", argname="row", id_field="username") 按数据文件逐行参数化
+    （.xlsx、.csv、.jsonl，相对路径基于 data 目录）。参数只是行号，测试运行时才读取该行，
+    各 xdist worker 收集到相同的测试 ID，共用磁盘上的行偏移索引，只解析自己执行的行。
+    """
+    marker = metafunc.definition.get_closest_marker("dataset")
+    if marker is None:
+        return
+    path = Path(marker.args[0])
+    if not path.is_absolute():
+        path = Settings.DATA_DIR / path
+    argname = marker.kwargs.get("argname", "row")
+    dataset = Dataset(path, sheet=marker.kwargs.get("sheet"), id_field=marker.kwargs.get("id_field"))
+    metafunc.parametrize(argname, dataset.params(), ids=dataset.ids())
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    标记共享昂贵 fixture 的分组（随报告回传给 controller，用于调度），
+    并按结果历史设置每个测试的重跑次数（已有 @pytest.mark.flaky 标记的测试保持不变）
+    """
+    for item in items:
+        group = fixture_group(item)
+        if group:
+            item.user_properties.append(("fixture_group", group))
+    
+    if not Settings.FLAKY_HISTORY or _dry_run(config):
+        return
+    if _flaky_history is not None:
+        policies = _flaky_history.policies()
+    else:
+        # xdist worker 只读取策略
+        history = FlakyHistory(
+            Settings.CACHE_DIR / "test_history.sqlite3",
+            window=Settings.FLAKY_HISTORY_WINDOW,
+            min_runs=Settings.FLAKY_MIN_RUNS,
+        )
+        policies = history.policies()
+        history.close()
+    
+    reruns = {
+        FlakyHistory.FLAKY: (Settings.FLAKY_RERUNS, Settings.FLAKY_RERUNS_DELAY),
+        FlakyHistory.NEW: (Settings.FLAKY_NEW_TEST_RERUNS, 0),
+        # 历史稳定或确定性失败的测试不重跑，失败立即报告
+        FlakyHistory.STABLE: (0, 0),
+        FlakyHistory.DETERMINISTIC: (0, 0),
+    }
+    for item in items:
+        if item.get_closest_marker("flaky") is not None:
+            continue
+        count, delay = reruns[policies.get(item.nodeid, FlakyHistory.NEW)]
+        item.add_marker(pytest.mark.flaky(reruns=count, reruns_delay=delay))
+
+
+def pytest_runtest_logreport(report):
+    """把每个阶段的结果写入历史库和耗时记录（xdist 下 worker 的报告会转发给 controller）"""
+    if _flaky_history is not None:
+        _flaky_history.record(report)
+    if _duration_store is not None:
+        _duration_store.observe(report)
+    if _schedule_recorder is not None:
+        _schedule_recorder.observe(report)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    测试执行期间（含 fixture）的日志带上测试 nodeid；
+    IMPACT_RECORD=true 时记录测试（含 fixture）调用到的项目模块和测试数据键
+    （async 用例在异步引擎线程中执行，记录不到，只保存按静态分析选择的占位记录）
+    """
+    with logger.contextualize(nodeid=item.nodeid):
+        if _impact_recorder is None:
+            yield
+            return
+        if is_async_item(item):
+            yield
+            record = RuntimeRecorder.static_record()
+            record["signature"] = file_signature(item.path)
+            _impact_records[item.nodeid] = record
+            return
+        _impact_recorder.start()
+        try:
+            yield
+        finally:
+            record = _impact_recorder.stop()
+            record["signature"] = file_signature(item.path)
+            _impact_records[item.nodeid] = record
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """非函数级 fixture 只在第一个使用它的测试中建立，其调用到的模块记为共享模块（影响全部测试）"""
+    if _impact_recorder is None or fixturedef.scope == "function":
+        yield
+        return
+    with _impact_recorder.shared_scope():
+        yield
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """把共享浏览器服务端点文件和性能记录的运行 ID 传给 xdist worker"""
+    node.workerinput["perf_run_id"] = _perf_run_id
+    pool = node.config.stash.get(_browser_server_pool_key, None)
+    if pool is not None:
+        node.workerinput["browser_server_file"] = str(pool.endpoints_file)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """
+    存在 async 用例时：同步用例按默认流程执行，async 用例在异步引擎中按 ASYNC_CONCURRENCY 并发执行。
+    xdist worker 的执行循环由 xdist 接管，此时 async 用例通过 pytest_pyfunc_call 逐个执行。
+    """
+    config = session.config
+    if hasattr(config, "workerinput") or _dry_run(config):
+        return None
+    async_items = [item for item in session.items if is_async_item(item)]
+    if not async_items:
+        return None
+
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+
+    sync_items = [item for item in session.items if not is_async_item(item)]
+    for i, item in enumerate(sync_items):
+        # 最后一个同步用例之后还有 async 用例：nextitem 为 None 会提前拆除 session 级 fixture
+        nextitem = sync_items[i + 1] if i + 1 < len(sync_items) else async_items[0]
+        item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+
+    run_items_concurrently(session, async_items, _get_async_engine(), Settings.ASYNC_CONCURRENCY)
+    if session.shouldfail:
+        raise session.Failed(session.shouldfail)
+    return True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """执行 async 用例：回放并发执行的结果，或（xdist worker、失败重跑时）在异步引擎中逐个执行"""
+    if not is_async_item(pyfuncitem):
+        return None
+    if replay_outcome(pyfuncitem):
+        return True
+    funcargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    _get_async_engine().run(pyfuncitem.obj(**funcargs))
+    return True
+
+
+def pytest_unconfigure(config):
+    """停止共享浏览器服务和异步引擎"""
+    if _async_engine is not None:
+        _async_engine.close()
+    pool = config.stash.get(_browser_server_pool_key, None)
+    if pool is not None:
+        pool.stop()
+
+
 @pytest.fixture(scope="session")
 def settings():
     """全局配置fixture"""
@@ -50,61 +376,308 @@ def playwright():
 @pytest.fixture(scope="session")
 def browser_type_launch_args(settings):
     """浏览器启动参数"""
-    launch_args = {
-        "headless": settings.HEADLESS,
-        "slow_mo": settings.SLOW_MO,
-        "timeout": settings.BROWSER_TIMEOUT * 1000,
-        "args": ["--start-maximized"],
-    }
-    return launch_args
+    return _browser_launch_args(settings)
 
 
 @pytest.fixture(scope="session")
-def browser(playwright, browser_type_launch_args, settings):
-    """浏览器实例 - session级别"""
-    browser_manager = BrowserManager(playwright)
-    browser = browser_manager.launch_browser(
-        browser_type=settings.BROWSER,
-        **browser_type_launch_args
-    )
+def browser_manager(playwright):
+    """浏览器管理器 - session级别"""
+    manager = BrowserManager(playwright)
+    yield manager
+    manager.close_browser()
+
+
+@pytest.fixture(scope="session")
+def browser(browser_manager, browser_type_launch_args, settings, pytestconfig):
+    """浏览器实例 - session级别（controller 启动了共享浏览器服务时连接服务，否则独立启动）"""
+    workerinput = getattr(pytestconfig, "workerinput", {})
+    endpoints_file = workerinput.get("browser_server_file")
+    if endpoints_file:
+        browser = browser_manager.connect_browser(
+            endpoints_file,
+            worker_index=int(workerinput["workerid"].lstrip("gw") or 0),
+            browser_type=settings.BROWSER,
+            slow_mo=browser_type_launch_args["slow_mo"],
+            timeout=browser_type_launch_args["timeout"],
+        )
+    else:
+        browser = browser_manager.launch_browser(
+            browser_type=settings.BROWSER,
+            **browser_type_launch_args
+        )
     yield browser
-    browser.close()
+
+
+@pytest.fixture(scope="session")
+def context_options(settings):
+    """创建浏览器上下文的参数"""
+    return _context_options(settings)
+
+
+@pytest.fixture(scope="session")
+def context_pool(browser, browser_manager, context_options, settings):
+    """上下文复用池 - 设置 CONTEXT_POOL=true 时启用，否则为 None"""
+    if not settings.CONTEXT_POOL:
+        yield None
+        return
+    pool = browser_manager.create_context_pool(
+        context_options=context_options,
+        permissions=settings.PERMISSIONS,
+        max_size=settings.CONTEXT_POOL_SIZE,
+        max_uses=settings.CONTEXT_POOL_MAX_USES,
+    )
+    yield pool
+    browser_manager.close_context_pool()
+
+
+@pytest.fixture(scope="session")
+def login_flow(browser, context_options):
+    """
+    登录流程：接收测试数据中的凭据，返回登录后的 storage_state。
+    不同站点可在子目录 conftest.py 中覆盖该 fixture。
+    """
+    from pages.login_page import LoginPage
+
+    def _login(credentials):
+        login_context = browser.new_context(**context_options)
+        try:
+            login_page = LoginPage(login_context.new_page())
+            login_page.login(credentials["username"], credentials["password"])
+            return login_context.storage_state()
+        finally:
+            login_context.close()
+
+    return _login
+
+
+@pytest.fixture(scope="session")
+def auth_cache(settings):
+    """登录态缓存 - session级别（每个 xdist worker 一份，磁盘文件跨 worker 共享）"""
+    cache = AuthStateCache(settings.AUTH_STATE_DIR, ttl=settings.AUTH_STATE_TTL)
+    yield cache
+    cache.close()
 
 
 @pytest.fixture(scope="function")
-def context(browser, settings, request):
-    """浏览器上下文 - 每个测试函数一个。终端设置 TRACE=1 再运行 pytest 时会录制 Trace 到 test-results/。"""
-    # 按参考示例使用 no_viewport=True 以占用最大可用尺寸
-    context = browser.new_context(
-        no_viewport=True,
-        locale=settings.LOCALE,
-        timezone_id=settings.TIMEZONE,
-        ignore_https_errors=settings.IGNORE_HTTPS_ERRORS,
+def auth_user(request):
+    """
+    当前测试使用的登录用户（测试数据键），未指定时为 None。
+    可通过 @pytest.mark.auth_user("test_successful_login") 指定，
+    也可通过 @pytest.mark.parametrize("auth_user", [...]) 直接参数化。
+    """
+    marker = request.node.get_closest_marker("auth_user")
+    return marker.args[0] if marker and marker.args else None
+
+
+@pytest.fixture(scope="function")
+def auth_state(auth_user, auth_cache, login_flow):
+    """当前测试用户的 storage_state 文件路径，未指定用户时为 None"""
+    if not auth_user:
+        return None
+    credentials = DataLoader.get_test_data(auth_user)
+    if not credentials:
+        raise ValueError(f"测试数据中不存在登录用户: {auth_user}")
+    return auth_cache.get_state(auth_user, credentials, login_flow)
+
+
+@pytest.fixture(scope="session")
+def artifact_writer(settings, pytestconfig):
+    """测试产物后台写入器 - session级别，结束时等待写入完成并生成索引"""
+    workerinput = getattr(pytestconfig, "workerinput", None)
+    suffix = f"-{workerinput['workerid']}" if workerinput else ""
+    writer = ArtifactWriter(
+        settings.REPORTS_DIR / f"artifacts{suffix}.json",
+        max_workers=settings.ARTIFACT_WORKERS,
+        max_pending=settings.ARTIFACT_MAX_PENDING,
+        screenshot_max_width=settings.SCREENSHOT_MAX_WIDTH,
+        jpeg_quality=settings.SCREENSHOT_QUALITY,
+    )
+    yield writer
+    writer.close()
+
+
+@pytest.fixture(scope="session")
+def trace_manager(pytestconfig, settings, artifact_writer):
+    """Trace 录制管理器 - session级别"""
+    manager = TraceManager(
+        mode=pytestconfig.getoption("--trace-mode") or settings.TRACE_MODE,
+        output_dir=settings.TRACES_DIR,
+        artifact_writer=artifact_writer,
+        screenshots=settings.TRACE_SCREENSHOTS,
+        snapshots=settings.TRACE_SNAPSHOTS,
+        sources=settings.TRACE_SOURCES,
+        measure_cpu=settings.TRACE_MEASURE_CPU,
+    )
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def video_manager(pytestconfig, settings, artifact_writer):
+    """视频录制管理器 - session级别"""
+    manager = VideoManager(
+        mode=pytestconfig.getoption("--video-mode") or settings.VIDEO_MODE,
+        output_dir=settings.TRACES_DIR,
+        artifact_writer=artifact_writer,
+        width=settings.VIDEO_WIDTH,
+        height=settings.VIDEO_HEIGHT,
+    )
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def perf_store(settings):
+    """导航性能记录文件 - session级别，未启用 PERF_METRICS 时为 None"""
+    if not settings.PERF_METRICS:
+        yield None
+        return
+    store = perf_metrics.PerfStore(settings.REPORTS_DIR / "perf" / f"perf-{_perf_run_id}.jsonl", _perf_run_id)
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="session")
+def har_manager(pytestconfig, settings):
+    """HAR 存档管理器 - session级别"""
+    manager = HarManager(
+        mode=pytestconfig.getoption("--har-mode") or settings.HAR_MODE,
+        har_dir=settings.HAR_DIR,
+        not_found=settings.HAR_NOT_FOUND,
+        max_age_days=settings.HAR_MAX_AGE_DAYS,
+        url_filter=settings.HAR_URL_FILTER,
+    )
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def response_cache(har_manager, settings):
+    """磁盘响应缓存 - 设置 RESPONSE_CACHE=true 时启用（HAR 模式下为 None）"""
+    if not settings.RESPONSE_CACHE or har_manager.enabled:
+        yield None
+        return
+    cache = ResponseCache(
+        settings.CACHE_DIR / "responses.sqlite3",
+        max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+        ttl=settings.RESPONSE_CACHE_TTL,
+        resource_types=settings.RESPONSE_CACHE_TYPES,
     )
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(scope="session")
+def resource_size_table(settings):
+    """资源大小表 - 用于估算请求拦截节省的字节数"""
+    table = ResourceSizeTable(settings.CACHE_DIR / "resource_sizes.json")
+    yield table
+    table.save()
+
+
+@pytest.fixture(scope="function")
+def block_profile(request, settings):
+    """当前测试使用的请求拦截配置名称（@pytest.mark.block_profile 优先，否则使用 BLOCK_PROFILE）"""
+    marker = request.node.get_closest_marker("block_profile")
+    name = marker.args[0] if marker and marker.args else settings.BLOCK_PROFILE
+    if name not in settings.BLOCK_PROFILES:
+        raise ValueError(f"未定义的请求拦截配置: {name}，可选: {', '.join(settings.BLOCK_PROFILES)}")
+    return name
+
+
+@pytest.fixture(scope="function")
+def context(browser, browser_manager, context_options, context_pool, auth_state, block_profile,
+            resource_size_table, har_manager, response_cache, trace_manager, video_manager, settings, request):
+    """
+    浏览器上下文 - 每个测试函数一个。
+    按 --trace-mode / TRACE_MODE 录制 Trace、按 --video-mode / VIDEO_MODE 录制视频到 test-results/。
+    """
+    # 共享浏览器服务崩溃重启后重新连接
+    if browser_manager.is_remote:
+        browser = browser_manager.ensure_connected()
+    # 启用复用池时从池中获取；标记 no_context_pool、需要登录态或启用 HAR、视频录制的测试仍独立创建
+    pooled = (
+        context_pool is not None
+        and auth_state is None
+        and not har_manager.enabled
+        and not video_manager.enabled
+        and request.node.get_closest_marker("no_context_pool") is None
+    )
+    if pooled:
+        context = context_pool.acquire()
+    elif auth_state:
+        context = browser.new_context(
+            storage_state=auth_state, **context_options, **video_manager.context_options()
+        )
+        if settings.PERMISSIONS:
+            context.grant_permissions(settings.PERMISSIONS)
+    else:
+        context = browser.new_context(**context_options, **video_manager.context_options())
+        # 设置权限
+        if settings.PERMISSIONS:
+            context.grant_permissions(settings.PERMISSIONS)
+    
+    videos = video_manager.watch(context) if video_manager.enabled else []
+    
+    # HAR 录制/回放（@pytest.mark.har("名称") 可让多个测试共享同一存档）
+    har_marker = request.node.get_closest_marker("har")
+    try:
+        har_session = har_manager.attach(
+            context, request.node.nodeid, har_marker.args[0] if har_marker and har_marker.args else None
+        )
+    except Exception:
+        context.close()
+        raise
     
-    # 设置权限
-    if settings.PERMISSIONS:
-        context.grant_permissions(settings.PERMISSIONS)
+    # 静态资源优先从磁盘响应缓存返回
+    if response_cache is not None:
+        response_cache.attach(context)
     
-    # 仅当环境变量 TRACE=1（或 true/yes）时录制 Trace，便于终端调试
-    trace_on = os.environ.get("TRACE", "").strip().lower() in ("1", "true", "yes")
-    if trace_on:
-        context.tracing.start(screenshots=True, snapshots=True, sources=True)
+    # 按配置拦截无关资源（后注册的路由先执行，未拦截的请求交给响应缓存或 HAR 回放）
+    blocker = NetworkBlocker(block_profile, settings.BLOCK_PROFILES[block_profile], resource_size_table)
+    blocker.attach(context)
+    # 无论是否拦截都记录响应大小（被拦截的请求没有响应，只能从不拦截时的运行中学到）
+    resource_size_table.attach(context)
+    
+    # 每个测试录制一个 Trace chunk，复用池中的上下文无需重启 tracing
+    trace_state = trace_manager.begin(context, request.node)
     
     yield context
     
-    if trace_on:
-        trace_dir = "test-results"
-        os.makedirs(trace_dir, exist_ok=True)
-        trace_path = os.path.join(trace_dir, f"trace-{request.node.name}.zip")
-        context.tracing.stop(path=trace_path)
-    context.close()
+    failed = _test_failed(request.node)
+    trace_manager.end(trace_state, context, request.node, failed=failed)
+    
+    resource_size_table.detach(context)
+    if blocker.enabled:
+        blocking_stats = blocker.detach()
+        record_blocking_stats(request.node.nodeid, blocking_stats)
+        request.node.user_properties.append(("blocked_requests", blocking_stats["blocked"]))
+        request.node.user_properties.append(("blocked_bytes_saved", blocking_stats["bytes_saved"]))
+    if response_cache is not None:
+        response_cache.detach(context)
+    
+    if pooled:
+        # 失败用例的上下文状态不可信，直接回收
+        rep_call = getattr(request.node, "rep_call", None)
+        context_pool.release(context, reusable=rep_call is not None and rep_call.passed)
+    else:
+        # 视频在上下文关闭时完成写入；通过用例的视频直接删除，失败用例的视频链接到报告
+        request.node.video_paths = video_manager.close_context(
+            context, videos, request.node, failed, remote=browser_manager.is_remote
+        )
+    # HAR 录制在上下文关闭时写入存档
+    har_manager.finish(har_session)
 
 
 @pytest.fixture(scope="function")
 def page(context):
     """页面实例 - 每个测试函数一个"""
     page = context.new_page()
+    # 扩大资源时序缓冲，导航性能采集统计完整的请求数和传输大小
+    if Settings.PERF_METRICS:
+        page.add_init_script(perf_metrics.INIT_SCRIPT)
+    # 从创建页面开始跟踪请求（网络静默等待）
+    network_quiet.track(page)
     
     # 设置默认超时
     page.set_default_timeout(30000)
@@ -114,22 +687,91 @@ def page(context):
     page.close()
 
 
+@pytest.fixture(scope="session")
+def async_browser():
+    """异步浏览器实例（playwright.async_api）- 由异步引擎共享"""
+    return _get_async_engine().browser
+
+
+@pytest.fixture(scope="function")
+def async_context(request):
+    """异步浏览器上下文 - 每个 async 测试函数一个"""
+    # 已在并发执行循环中使用独立上下文执行完毕，回放结果时无需再创建
+    if ran_concurrently(request.node):
+        yield None
+        return
+    engine = _get_async_engine()
+    context = engine.run(engine.new_context())
+    yield context
+    engine.run(context.close())
+
+
+@pytest.fixture(scope="function")
+def async_page(async_context):
+    """异步页面实例 - 每个 async 测试函数一个"""
+    if async_context is None:
+        return None
+    return _get_async_engine().run(AsyncEngine.new_page(async_context))
+
+
 @pytest.fixture(scope="function", autouse=True)
-def setup_test(page, request):
+def setup_test(request, settings, artifact_writer, perf_store):
     """测试前置和后置处理"""
     test_name = request.node.name
     logger.info(f"开始执行测试: {test_name}")
+    # async 用例使用异步页面，不创建同步页面
+    is_async = is_async_item(request.node)
+    page = None if is_async else request.getfixturevalue("page")
+    # 并发执行的 async 用例已在执行时获取截图字节
+    replayed = ran_concurrently(request.node)
+    # 步骤级重试预算（每个测试独立）
+    if settings.STEP_RETRY:
+        step_retry.begin_test(step_retry.RetryBudget(
+            request.node.nodeid,
+            limit=settings.STEP_RETRY_BUDGET,
+            max_attempts=settings.STEP_RETRY_ATTEMPTS,
+            backoff_ms=settings.STEP_RETRY_BACKOFF_MS,
+            max_backoff_ms=settings.STEP_RETRY_MAX_BACKOFF_MS,
+        ))
+    # 页面对象导航后的性能采集和预算检查
+    if perf_store is not None and page is not None:
+        perf_metrics.begin_test(perf_metrics.PerfCollector(
+            request.node.nodeid, perf_store, budget_mode=settings.PERF_BUDGET_MODE
+        ))
     
     yield
     
-    # 测试失败时截图
-    if request.node.rep_call.failed:
-        screenshot_dir = "screenshots"
-        os.makedirs(screenshot_dir, exist_ok=True)
+    perf_metrics.end_test()
+    budget = step_retry.end_test()
+    if budget is not None and budget.records:
+        request.node.user_properties.append(("step_retries", len(budget.records)))
+    
+    # 测试失败时截图：测试线程只获取截图字节，编码和写盘交给后台线程
+    rep_call = getattr(request.node, "rep_call", None)
+    if rep_call is not None and rep_call.failed:
+        nodeid = request.node.nodeid
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_path = f"{screenshot_dir}/{test_name}_{timestamp}.png"
-        page.screenshot(path=screenshot_path, full_page=True)
-        logger.error(f"测试失败，截图已保存: {screenshot_path}")
+        options = screenshot_options()
+        screenshot_path = settings.SCREENSHOTS_DIR / f"{test_name}_{timestamp}.{'jpg' if options['type'] == 'jpeg' else 'png'}"
+        
+        data = None
+        if page is not None:
+            data = page.screenshot(**options)
+        elif replayed:
+            data = replayed_screenshot(request.node)
+        elif is_async and "async_page" in request.fixturenames:
+            async_page = request.getfixturevalue("async_page")
+            data = _get_async_engine().run(async_page.screenshot(**options))
+        if data is not None:
+            artifact_writer.submit_screenshot(nodeid, data, screenshot_path)
+            logger.error(f"测试失败，截图已提交保存: {screenshot_path}")
+        
+        # 失败日志：错误信息和捕获的输出
+        sections = "\n\n".join(f"----- {title} -----\n{content}" for title, content in rep_call.sections)
+        artifact_writer.submit_text(
+            nodeid, "log", f"{rep_call.longreprtext}\n\n{sections}",
+            settings.TRACES_DIR / f"log-{test_name}_{timestamp}.txt",
+        )
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -137,4 +779,93 @@ def pytest_runtest_makereport(item, call):
     """获取测试结果"""
     outcome = yield
     rep = outcome.get_result()
+    # 并发执行的 async 用例报告真实执行耗时
+    if rep.when == "call" and is_async_item(item):
+        duration = replayed_duration(item)
+        if duration is not None:
+            rep.duration = duration
+    # PERF_BUDGET_MODE=fail 时，超出性能预算的测试标记为失败
+    if rep.when == "call" and rep.passed and Settings.PERF_BUDGET_MODE == "fail":
+        violations = perf_metrics.current_violations()
+        if violations:
+            rep.outcome = "failed"
+            rep.longrepr = "性能预算超出:\n" + "\n".join(f"  {violation}" for violation in violations)
     setattr(item, f"rep_{rep.when}", rep)
+    # 失败用例的视频在上下文关闭（teardown）后才可用，链接到 HTML 报告
+    if rep.when == "teardown" and getattr(item, "video_paths", None):
+        try:
+            from pytest_html import extras
+        except ImportError:
+            return
+        report_dir = Settings.REPORTS_DIR
+        rep.extras = getattr(rep, "extras", []) + [
+            extras.url(os.path.relpath(path, report_dir), name=f"视频: {os.path.basename(path)}")
+            for path in item.video_paths
+        ]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_runtest_metadata(item, call):
+    """失败用例的视频路径写入 JSON 报告（pytest-json-report）"""
+    if call.when == "teardown" and getattr(item, "video_paths", None):
+        return {"videos": [str(path) for path in item.video_paths]}
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    """页面操作耗时百分位和直方图写入 JSON 报告（pytest-json-report）"""
+    action_timing.flush()
+    stats = session_stats.get("action_timing")
+    if stats:
+        json_report["action_timing"] = {
+            "unit": "ms",
+            "summary": action_timing.summary_rows(stats),
+            "histograms_us": stats.get("actions", {}),
+        }
+
+
+def pytest_sessionfinish(session):
+    """xdist worker 结束时回传会话统计"""
+    pool = session.config.stash.get(_browser_server_pool_key, None)
+    if pool is not None:
+        session_stats.record("browser_startup", pool.stats())
+    global _flaky_history
+    if _flaky_history is not None:
+        _flaky_history.close()
+        _flaky_history = None
+    if _duration_store is not None:
+        _duration_store.save()
+    if _schedule_recorder is not None:
+        _schedule_recorder.finish(Settings.REPORTS_DIR / "schedule.json")
+    if _impact_records:
+        ImpactMap(Settings.BASE_DIR, Settings.CACHE_DIR / "impact_map.json").merge_runtime(
+            _impact_records, _impact_recorder.shared
+        )
+    action_timing.flush()
+    wait_utils.flush()
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        # worker 的日志在回传结果前写完，controller 收到全部结果后合并
+        drain_logger()
+        workeroutput["session_stats"] = session_stats.dumps()
+    elif Settings.LOG_FORMAT == "json" and not _dry_run(session.config):
+        drain_logger()
+        merged = merge_logs(json_log_dir(_perf_run_id))
+        if merged is not None:
+            logger.info(f"日志已合并: {merged}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """controller 合并 xdist worker 的会话统计"""
+    data = getattr(node, "workeroutput", {}).get("session_stats")
+    if data:
+        session_stats.loads(data)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """在终端摘要中输出会话统计"""
+    for section, lines in session_stats.summary_lines().items():
+        terminalreporter.write_sep("-", f"{section} 统计")
+        for line in lines:
+            terminalreporter.write_line(line)
@@ -0,0 +1,86 @@
+"""
+微基准：对比 BasePage 操作在普通模式（先等待元素可见再操作）和快速模式（FAST_ACTIONS，一次往返）下的单次耗时
+使用本地 HTML（page.set_content），不依赖网络
+
+运行: python demo/benchmark_actions.py [-n 次数] [--headed]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.sync_api import sync_playwright
+
+from config.settings import Settings
+from pages.base_page import BasePage
+
+HTML = """
+<html><body>
+  <input id="name" />
+  <input id="agree" type="checkbox" />
+  <select id="city"><option value="bj">北京</option><option value="sh">上海</option></select>
+  <button id="submit" onclick="document.querySelector('#result').textContent = 'clicked ' + Date.now()">提交</button>
+  <div id="result">ready</div>
+</body></html>
+"""
+
+
+def run_actions(page_object: BasePage, iterations: int) -> dict:
+    """每个操作执行 iterations 次，返回 {操作: [耗时毫秒]}"""
+    actions = {
+        "click": lambda i: page_object.click("#submit"),
+        "fill": lambda i: page_object.fill("#name", f"user{i}"),
+        "get_text": lambda i: page_object.get_text("#result"),
+        "get_value": lambda i: page_object.get_value("#name"),
+        "check": lambda i: page_object.check("#agree") if i % 2 == 0 else page_object.uncheck("#agree"),
+        "select_option": lambda i: page_object.select_option("#city", "sh" if i % 2 else "bj"),
+        "hover": lambda i: page_object.hover("#submit"),
+    }
+    samples = {name: [] for name in actions}
+    for i in range(iterations):
+        for name, action in actions.items():
+            start = time.perf_counter()
+            action(i)
+            samples[name].append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BasePage 操作耗时微基准")
+    parser.add_argument("-n", "--iterations", type=int, default=200, help="每个操作的执行次数")
+    parser.add_argument("--headed", action="store_true", help="有头模式运行")
+    args = parser.parse_args()
+
+    results = {}
+    # 只测操作本身：关闭操作计时统计
+    with Settings.override(ACTION_TIMING=False), sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=not args.headed)
+        page = browser.new_page()
+        page.set_content(HTML)
+        page_object = BasePage(page)
+        # 预热
+        with Settings.override(FAST_ACTIONS=True):
+            run_actions(page_object, 10)
+        for mode, fast in (("普通模式", False), ("快速模式", True)):
+            with Settings.override(FAST_ACTIONS=fast):
+                results[mode] = run_actions(page_object, args.iterations)
+        browser.close()
+
+    print(f"每个操作 {args.iterations} 次（毫秒）")
+    print(f"{'操作':<14} {'普通 p50':>9} {'普通 p95':>9} {'快速 p50':>9} {'快速 p95':>9} {'p50 降低':>9}")
+    for name in results["普通模式"]:
+        normal = sorted(results["普通模式"][name])
+        fast = sorted(results["快速模式"][name])
+        normal_p50, fast_p50 = statistics.median(normal), statistics.median(fast)
+        print(
+            f"{name:<14} {normal_p50:>9.2f} {normal[int(len(normal) * 0.95) - 1]:>9.2f} "
+            f"{fast_p50:>9.2f} {fast[int(len(fast) * 0.95) - 1]:>9.2f} "
+            f"{(1 - fast_p50 / normal_p50) * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+微基准：对比逐个操作和批量操作（BasePage.fill_form / read_many）的耗时
+1. 本地 20 个字段的表单：逐个 fill/check/select_option 对比 fill_form，逐个 get_value 对比 read_many
+2. Complicated 大页面：逐个 get_text 读取 Button 文本对比 read_many（需要网络）
+
+运行: python demo/benchmark_batch.py [-n 次数] [--buttons 数量] [--skip-remote]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.sync_api import sync_playwright
+
+from config.settings import Settings
+from pages.base_page import BasePage
+from pages.complicated_page import Complicated
+from pages.index_page import IndexPage
+
+FIELD_COUNT = 20
+
+
+def build_form() -> str:
+    """16 个文本框、2 个复选框、2 个下拉框"""
+    fields = [f'<input id="text{i}" />' for i in range(16)]
+    fields += [f'<input id="flag{i}" type="checkbox" />' for i in range(2)]
+    fields += [f'<select id="choice{i}"><option value="a">A</option><option value="b">B</option></select>'
+               for i in range(2)]
+    return "<html><body><form>" + "".join(f"<div>{field}</div>" for field in fields) + "</form></body></html>"
+
+
+def form_values(round_index: int) -> dict:
+    values = {f"#text{i}": f"value-{round_index}-{i}" for i in range(16)}
+    values.update({f"#flag{i}": round_index % 2 == 0 for i in range(2)})
+    values.update({f"#choice{i}": "b" if round_index % 2 else "a" for i in range(2)})
+    return values
+
+
+def fill_sequential(page_object: BasePage, values: dict):
+    for selector, value in values.items():
+        if isinstance(value, bool):
+            page_object.check(selector) if value else page_object.uncheck(selector)
+        elif selector.startswith("#choice"):
+            page_object.select_option(selector, value)
+        else:
+            page_object.fill(selector, value)
+
+
+def timed(func, iterations: int) -> list:
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, sequential: list, batched: list):
+    seq, bat = statistics.median(sequential), statistics.median(batched)
+    print(f"{name:<28} {seq:>10.1f} {bat:>10.1f} {seq / bat:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量表单填充和读取微基准")
+    parser.add_argument("-n", "--iterations", type=int, default=30, help="每种方式的执行次数")
+    parser.add_argument("--buttons", type=int, default=20, help="Complicated 页面读取的 Button 数量")
+    parser.add_argument("--skip-remote", action="store_true", help="不访问 Complicated 页面")
+    args = parser.parse_args()
+
+    selectors = list(form_values(0))
+    with Settings.override(ACTION_TIMING=False), sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(build_form())
+        page_object = BasePage(page)
+
+        print(f"中位数（毫秒），每种方式 {args.iterations} 次")
+        print(f"{'场景':<28} {'逐个':>10} {'批量':>10} {'加速':>8}")
+        report(
+            f"填充 {FIELD_COUNT} 个字段",
+            timed(lambda i: fill_sequential(page_object, form_values(i)), args.iterations),
+            timed(lambda i: page_object.fill_form(form_values(i)), args.iterations),
+        )
+        report(
+            f"读取 {FIELD_COUNT} 个字段",
+            timed(lambda i: [page_object.get_value(selector) for selector in selectors if "flag" not in selector],
+                  args.iterations),
+            timed(lambda i: page_object.read_many(selectors), args.iterations),
+        )
+
+        if not args.skip_remote:
+            # 与测试相同：从首页点击链接进入 complicated-page
+            index_page = IndexPage(page)
+            index_page.openUrl()
+            index_page.click_big_page_link()
+            complicated = Complicated(page)
+            xpaths = [Complicated.BUTTON_XPATH.format(index=i + 1) for i in range(args.buttons)]
+            report(
+                f"Complicated 读取 {args.buttons} 个 Button",
+                timed(lambda i: [complicated.get_text(xpath) for xpath in xpaths], args.iterations),
+                timed(lambda i: complicated.read_button_texts(args.buttons), args.iterations),
+            )
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+微基准：DataLoader 的导入耗时和单次查找耗时
+1. 导入耗时：新进程中导入 utils.data_loader 和 conftest（xdist worker 启动时的导入），
+   改动前模块顶层导入 pandas 和 openpyxl，用先导入这两个包模拟
+2. 单次查找：改动前每次调用重新打开并用纯 Python SafeLoader 解析整个 YAML，改动后命中进程内缓存
+
+运行: python demo/benchmark_data_loader.py [-n 次数] [--runs 进程数]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import yaml
+
+from config.settings import Settings
+from utils.data_loader import DataLoader
+
+LEGACY_PRELOAD = "import pandas, openpyxl; "
+
+
+def import_ms(statement: str, runs: int) -> float:
+    """新进程中执行导入语句的耗时中位数（毫秒）"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print((time.perf_counter() - start) * 1000)"
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def legacy_get_test_data(test_name: str, data_file) -> dict:
+    """改动前的实现"""
+    with open(data_file, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return data.get(test_name, {})
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataLoader 导入和查找耗时")
+    parser.add_argument("-n", "--iterations", type=int, default=2000, help="查找次数")
+    parser.add_argument("--runs", type=int, default=5, help="导入耗时测量的进程数")
+    args = parser.parse_args()
+
+    print(f"导入耗时中位数（毫秒），{args.runs} 个进程")
+    print(f"{'模块':<24} {'改动前':>10} {'改动后':>10}")
+    for module in ("utils.data_loader", "conftest"):
+        before = import_ms(f"{LEGACY_PRELOAD}import {module}", args.runs)
+        after = import_ms(f"import {module}", args.runs)
+        print(f"{module:<24} {before:>10.1f} {after:>10.1f}")
+
+    data_file = Settings.TEST_DATA_FILE
+    key = next(iter(DataLoader.load_yaml(data_file)))
+    before = per_call_us(lambda: legacy_get_test_data(key, data_file), args.iterations)
+    after = per_call_us(lambda: DataLoader.get_test_data(key), args.iterations)
+    print(f"\nget_test_data 单次耗时（微秒），{args.iterations} 次")
+    print(f"{'改动前':>10} {'改动后':>10} {'加速':>8}")
+    print(f"{before:>10.1f} {after:>10.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+基准：10 万行数据集的读取和参数化收集
+1. 读取：改动前的整表读取（pandas read_excel / read_csv 后 to_dict("records")，JSON 整体加载）
+   对比流式数据集（Dataset 建立行偏移索引，首次扫描和命中索引缓存两种情况）
+2. 收集：@pytest.mark.dataset 参数化 10 万行的测试文件执行 pytest --collect-only（首次建立索引和命中索引缓存）
+每个场景在独立进程中运行，记录耗时和进程峰值内存（ru_maxrss）。
+
+运行: python demo/benchmark_datasets.py [--rows 行数] [--formats csv,jsonl,xlsx] [--keep]
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config.settings import Settings
+from utils.datasets import Dataset
+
+WORK_DIR = Settings.CACHE_DIR / "bench_datasets"
+FIELDS = ["id", "username", "email", "amount", "note"]
+
+# 子进程脚本：执行语句后输出耗时（毫秒）和峰值内存（MB）
+RUNNER = """
+import resource, sys, time
+start = time.perf_counter()
+{body}
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+LEGACY = {
+    "csv": "import pandas as pd; rows = pd.read_csv(r'{path}').to_dict('records')",
+    "jsonl": "import json; rows = json.load(open(r'{path}', encoding='utf-8'))",
+    "xlsx": "import pandas as pd; rows = pd.read_excel(r'{path}').to_dict('records')",
+}
+STREAMING = (
+    "from utils.datasets import Dataset; dataset = Dataset(r'{path}', id_field='id', cache_dir=r'{cache}'); "
+    "params, ids = dataset.params(), dataset.ids()"
+)
+
+TEST_FILE = '''
+import pytest
+
+
+@pytest.mark.dataset(r"{path}", id_field="id")
+def test_row(row):
+    assert row["id"]
+'''
+
+
+def generate(rows: int, formats):
+    """生成数据文件（JSONL 另外生成一份 JSON 数组供改动前的整体加载对比）"""
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    records = (
+        {"id": f"u{i:06d}", "username": f"user{i}", "email": f"user{i}@example.com",
+         "amount": i * 1.5, "note": "备注 " * 5}
+        for i in range(rows)
+    )
+    files = {fmt: WORK_DIR / f"data_{rows}.{fmt}" for fmt in formats}
+    writers = {}
+    if "csv" in files:
+        import csv
+        csv_file = open(files["csv"], "w", encoding="utf-8", newline="")
+        writers["csv"] = csv.writer(csv_file)
+        writers["csv"].writerow(FIELDS)
+    if "jsonl" in files:
+        jsonl_file = open(files["jsonl"], "w", encoding="utf-8")
+    if "xlsx" in files:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(FIELDS)
+    json_rows = []
+    for record in records:
+        values = [record[name] for name in FIELDS]
+        if "csv" in files:
+            writers["csv"].writerow(values)
+        if "jsonl" in files:
+            jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            json_rows.append(record)
+        if "xlsx" in files:
+            sheet.append(values)
+    if "csv" in files:
+        csv_file.close()
+    if "jsonl" in files:
+        jsonl_file.close()
+        with open(WORK_DIR / f"data_{rows}.json", "w", encoding="utf-8") as f:
+            json.dump(json_rows, f, ensure_ascii=False)
+    if "xlsx" in files:
+        workbook.save(files["xlsx"])
+    return files
+
+
+def run(body: str, *args: str):
+    output = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(body=body), *args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    elapsed, peak = output.strip().splitlines()[-1].split()
+    return float(elapsed), float(peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式数据集读取和参数化收集基准")
+    parser.add_argument("--rows", type=int, default=100_000, help="数据行数")
+    parser.add_argument("--formats", default="csv,jsonl,xlsx", help="测试的数据格式")
+    parser.add_argument("--keep", action="store_true", help="保留生成的数据文件")
+    args = parser.parse_args()
+
+    formats = args.formats.split(",")
+    files = generate(args.rows, formats)
+    cache = WORK_DIR / "index"
+    print(f"{args.rows} 行，耗时（毫秒）/ 峰值内存（MB）")
+    print(f"{'场景':<26} {'耗时':>10} {'峰值内存':>10}")
+    try:
+        for fmt, path in files.items():
+            legacy_path = path.with_suffix(".json") if fmt == "jsonl" else path
+            shutil.rmtree(cache, ignore_errors=True)
+            for name, body in (
+                (f"{fmt} 整表读取（改动前）", LEGACY[fmt].format(path=legacy_path)),
+                (f"{fmt} 流式索引（首次）", STREAMING.format(path=path, cache=cache)),
+                (f"{fmt} 流式索引（缓存）", STREAMING.format(path=path, cache=cache)),
+            ):
+                elapsed, peak = run(body)
+                print(f"{name:<26} {elapsed:>10.0f} {peak:>10.1f}")
+
+            # 参数化钩子使用默认缓存目录（Settings.CACHE_DIR/datasets），第一次收集时建立索引
+            test_file = WORK_DIR / f"test_dataset_{fmt}.py"
+            test_file.write_text(TEST_FILE.format(path=path), encoding="utf-8")
+            for label in ("首次", "缓存"):
+                elapsed, peak = run(
+                    "import pytest; code = pytest.main(sys.argv[1:])",
+                    "-q", "--collect-only", "-o", "addopts=", "-p", "no:cacheprovider", str(test_file),
+                )
+                print(f"{fmt + ' 收集（' + label + '）':<26} {elapsed:>10.0f} {peak:>10.1f}")
+    finally:
+        if not args.keep:
+            for path in files.values():
+                for cached in (Settings.CACHE_DIR / "datasets").glob(f"{Dataset(path)._cache_key()}.*"):
+                    cached.unlink()
+            shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+基准：xdist worker 启动时的导入耗时（防止启动变慢的回归）
+1. 在新进程中（已导入 pytest，与 worker 一致）导入 conftest，记录耗时中位数
+2. python -X importtime 统计耗时最多的模块（累计耗时）
+3. pytest --collect-only 的总耗时
+超过 --max-ms 时以非零状态退出，可在 CI 中作为启动耗时的回归检查。
+
+运行: python demo/benchmark_import.py [--runs 进程数] [--top 模块数] [--max-ms 毫秒]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_CONFTEST = (
+    "import time, pytest; start = time.perf_counter(); import conftest; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def conftest_import_ms(runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_CONFTEST], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+
+def slowest_modules(top: int) -> list:
+    """-X importtime 输出中累计耗时最多的模块（只统计 conftest 导入链，pytest 预先导入）"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pytest, sys; print('-', file=sys.stderr); import conftest"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    lines = stderr.split("-\n", 1)[-1].splitlines()
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def collect_ms() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-o", "addopts=", "-p", "no:cacheprovider"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="conftest 导入耗时基准")
+    parser.add_argument("--runs", type=int, default=7, help="测量的进程数")
+    parser.add_argument("--top", type=int, default=15, help="输出耗时最多的模块数")
+    parser.add_argument("--max-ms", type=float, default=0, help="conftest 导入耗时中位数上限（毫秒），0 表示不检查")
+    args = parser.parse_args()
+
+    samples = conftest_import_ms(args.runs)
+    median = statistics.median(samples)
+    print(f"导入 conftest（已导入 pytest）: 中位数 {median:.0f}ms, 最小 {min(samples):.0f}ms, 最大 {max(samples):.0f}ms")
+    print(f"pytest --collect-only 总耗时: {collect_ms():.0f}ms")
+    print("\n累计耗时最多的模块（毫秒）:")
+    for cumulative, name in slowest_modules(args.top):
+        print(f"{cumulative:>8.1f}  {name}")
+
+    if args.max_ms and median > args.max_ms:
+        print(f"\n导入耗时 {median:.0f}ms 超过上限 {args.max_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+基准：页面操作日志在调用线程上的开销
+模拟 BasePage 操作：每次操作之间等待 --pause-ms（代表浏览器往返，释放 GIL，后台写日志的线程在此期间工作），
+只统计 logger 调用本身的耗时（平均值和 p99）。场景：
+1. 改动前：f-string + 同步文本文件 sink（DEBUG）
+2. 占位符 + 同步文本文件 sink
+3. loguru enqueue=True + serialize=True（调用线程 pickle 记录并写管道）
+4. 占位符 + JsonLinesSink（LOG_FORMAT=json，后台线程序列化和写盘）
+5. LOG_LEVEL=INFO 时的 DEBUG 日志：f-string（仍会格式化）对比占位符（入口直接返回）
+
+运行: python demo/benchmark_logging.py [-n 次数] [--pause-ms 毫秒]
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from loguru import logger
+
+from utils.logger_config import JsonLinesSink
+
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
+class FakeFrame:
+    def __repr__(self):
+        return "<Frame name= url='https://ultimateqa.com/complicated-page'>"
+
+
+class FakeLocator:
+    """与 Playwright Locator 相同的 repr（格式化消息时的开销）"""
+
+    def __init__(self, selector: str):
+        self._frame = FakeFrame()
+        self._selector = selector
+
+    def __repr__(self):
+        return f"<Locator frame={self._frame!r} selector={self._selector!r}>"
+
+
+def log_fstring(locator, value):
+    logger.debug(f"填充输入框: {locator} = '{value}'")
+
+
+def log_lazy(locator, value):
+    logger.debug("填充输入框: {target} = '{value}'", action="fill", target=locator, value=value)
+
+
+def measure(log, iterations: int, pause_s: float):
+    locator = FakeLocator("internal:role=textbox[name=\"Username\"i]")
+    samples = []
+    with logger.contextualize(nodeid="tests/test_login.py::test_successful_login"):
+        for i in range(iterations):
+            time.sleep(pause_s)
+            start = time.perf_counter()
+            log(locator, f"user{i}")
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.mean(samples) * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面操作日志开销")
+    parser.add_argument("-n", "--iterations", type=int, default=5000, help="每个场景的日志次数")
+    parser.add_argument("--pause-ms", type=float, default=0.2, help="两次操作之间的等待（毫秒）")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench-logging-"))
+    scenarios = [
+        ("改动前 f-string + 同步文本", log_fstring, lambda: logger.add(work_dir / "a.log", format=TEXT_FORMAT, level="DEBUG")),
+        ("占位符 + 同步文本", log_lazy, lambda: logger.add(work_dir / "b.log", format=TEXT_FORMAT, level="DEBUG")),
+        ("loguru enqueue + serialize", log_lazy,
+         lambda: logger.add(work_dir / "c.jsonl", level="DEBUG", enqueue=True, serialize=True)),
+        ("占位符 + JsonLinesSink", log_lazy,
+         lambda: logger.add(JsonLinesSink(work_dir / "d.jsonl", "main"), format="{message}", level="DEBUG")),
+        ("INFO 级别 f-string", log_fstring, lambda: logger.add(work_dir / "e.log", format=TEXT_FORMAT, level="INFO")),
+        ("INFO 级别占位符", log_lazy, lambda: logger.add(work_dir / "f.log", format=TEXT_FORMAT, level="INFO")),
+    ]
+    print(f"每次日志调用的耗时（微秒），{args.iterations} 次，操作间隔 {args.pause_ms}ms")
+    print(f"{'场景':<28} {'平均':>8} {'p99':>8}")
+    try:
+        for name, log, add_sink in scenarios:
+            logger.remove()
+            add_sink()
+            mean, p99 = measure(log, args.iterations, args.pause_ms / 1000)
+            # 写完队列中的日志再进入下一个场景
+            logger.complete()
+            logger.remove()
+            print(f"{name:<28} {mean:>8.1f} {p99:>8.1f}")
+    finally:
+        logger.remove()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
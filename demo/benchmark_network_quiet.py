@@ -0,0 +1,104 @@
+"""
+微基准：对比 reload 后等待 networkidle 和等待网络静默（WaitUtils.wait_for_network_quiet）的耗时
+1. 本地页面（page.route 模拟，不依赖网络）：加载后每 300ms 发一次统计信标，并挂起一个长轮询请求，
+   networkidle 会一直等到超时
+2. 首页：reload 后分别等待 networkidle 和网络静默（需要网络）
+
+运行: python demo/benchmark_network_quiet.py [-n 次数] [--timeout 毫秒] [--skip-remote]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+
+from config.settings import Settings
+from pages.index_page import IndexPage
+
+LOCAL_URL = "http://bench.local/"
+HTML = """
+<html><body>
+  <div id="list">loading</div>
+  <script>
+    fetch("/api/list").then((r) => r.text()).then((t) => document.querySelector("#list").textContent = t);
+    fetch("/api/poll");
+    setInterval(() => navigator.sendBeacon("https://hm.baidu.com/hm.gif?t=" + Date.now()), 300);
+  </script>
+</body></html>
+"""
+
+
+def route_local(page):
+    def handle(route):
+        url = route.request.url
+        if url == LOCAL_URL:
+            route.fulfill(body=HTML, content_type="text/html")
+        elif url.endswith("/api/list"):
+            route.fulfill(body="ready")
+        elif url.endswith("/api/poll"):
+            # 长轮询：不响应
+            pass
+        else:
+            route.fulfill(status=204)
+
+    page.route("**/*", handle)
+
+
+def timed_reload(page_object: IndexPage, wait_until: str, timeout: int) -> float:
+    """reload 并等待，返回毫秒；networkidle 超时按超时时间计"""
+    start = time.perf_counter()
+    try:
+        if wait_until == "networkidle":
+            page_object.page.reload(wait_until="load")
+            page_object.page.wait_for_load_state("networkidle", timeout=timeout)
+        else:
+            page_object.reload()
+    except PlaywrightTimeoutError:
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+def report(name: str, page_object: IndexPage, iterations: int, timeout: int):
+    idle = [timed_reload(page_object, "networkidle", timeout) for _ in range(iterations)]
+    quiet = [timed_reload(page_object, "quiet", timeout) for _ in range(iterations)]
+    idle_p50, quiet_p50 = statistics.median(idle), statistics.median(quiet)
+    print(f"{name:<20} {idle_p50:>12.0f} {quiet_p50:>12.0f} {idle_p50 - quiet_p50:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="networkidle 和网络静默等待耗时对比")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="每种方式的执行次数")
+    parser.add_argument("--timeout", type=int, default=5000, help="networkidle 超时时间（毫秒）")
+    parser.add_argument("--skip-remote", action="store_true", help="不访问首页")
+    args = parser.parse_args()
+
+    print(f"reload 耗时中位数（毫秒），每种方式 {args.iterations} 次，静默窗口 {Settings.NETWORK_QUIET_MS}ms")
+    print(f"{'场景':<20} {'networkidle':>12} {'网络静默':>12} {'节省':>10}")
+    # 长轮询地址加入忽略列表（实际项目中通过环境变量 NETWORK_QUIET_IGNORE 配置）
+    ignore = Settings.NETWORK_QUIET_IGNORE + ("*/api/poll",)
+    with Settings.override(ACTION_TIMING=False, NETWORK_QUIET_IGNORE=ignore), sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+
+        page = browser.new_page()
+        route_local(page)
+        local_page = IndexPage(page)
+        page.goto(LOCAL_URL)
+        report("本地（信标+长轮询）", local_page, args.iterations, args.timeout)
+        page.close()
+
+        if not args.skip_remote:
+            page = browser.new_page()
+            index_page = IndexPage(page)
+            index_page.openUrl()
+            report("首页", index_page, args.iterations, args.timeout)
+            page.close()
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
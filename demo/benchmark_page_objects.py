@@ -0,0 +1,83 @@
+"""
+微基准：页面对象构造和定位器查找的开销
+对比改动前的做法（每个页面对象新建 Settings、AssertUtils、WaitUtils，每次调用重新创建 Locator）
+和声明式定位器注册（Loc 缓存在实例上、辅助对象按 Page 共享）。
+只在客户端创建对象，不与浏览器交互，使用空白页即可。
+
+运行: python demo/benchmark_page_objects.py [-n 次数]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.sync_api import sync_playwright
+
+from config.settings import Settings
+from pages.complicated_page import Complicated
+from pages.index_page import IndexPage
+from utils.assert_utils import AssertUtils
+from utils.wait_utils import WaitUtils
+
+
+class LegacyPage:
+    """改动前的构造方式"""
+
+    def __init__(self, page):
+        self.page = page
+        self.settings = Settings()
+        self.assert_utils = AssertUtils(page)
+        self.wait_utils = WaitUtils(page)
+
+    def get_buttons(self):
+        return self.page.get_by_role("link", name=Complicated.BUTTON_NAME)
+
+    def get_big_page_link_locator(self):
+        return self.page.get_by_text(IndexPage.LINK_TEXT)
+
+
+def measure(func, iterations: int) -> float:
+    """每次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面对象构造和定位器查找微基准")
+    parser.add_argument("-n", "--iterations", type=int, default=5000, help="每个场景的调用次数")
+    args = parser.parse_args()
+    n = args.iterations
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+        legacy = LegacyPage(page)
+        complicated = Complicated(page)
+        index_page = IndexPage(page)
+
+        scenarios = [
+            ("构造页面对象", lambda i: LegacyPage(page), lambda i: Complicated(page)),
+            ("get_buttons()", lambda i: legacy.get_buttons(), lambda i: complicated.get_buttons()),
+            ("get_buttons().nth(i)", lambda i: legacy.get_buttons().nth(i % 10),
+             lambda i: complicated.buttons.nth(i % 10)),
+            ("首页链接定位器", lambda i: legacy.get_big_page_link_locator(),
+             lambda i: index_page.get_big_page_link_locator()),
+            ("构造 + 查找", lambda i: LegacyPage(page).get_buttons(), lambda i: Complicated(page).buttons),
+        ]
+        print(f"每次调用平均耗时（微秒），{n} 次")
+        print(f"{'场景':<24} {'改动前':>10} {'定位器注册':>10} {'加速':>8}")
+        for name, before, after in scenarios:
+            # 预热
+            measure(before, 100)
+            measure(after, 100)
+            before_us, after_us = measure(before, n), measure(after, n)
+            print(f"{name:<24} {before_us:>10.2f} {after_us:>10.2f} {before_us / after_us:>7.1f}x")
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
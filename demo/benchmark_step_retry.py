@@ -0,0 +1,41 @@
+"""
+微基准：步骤级重试（STEP_RETRY）在成功路径上的开销
+对比直接调用步骤函数和通过 run_step 调用（有重试预算、没有发生错误）的单次耗时。
+只测客户端开销，不启动浏览器；一次浏览器往返通常在毫秒级，可与结果对照。
+
+运行: python demo/benchmark_step_retry.py [-n 次数]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import step_retry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="步骤级重试成功路径开销")
+    parser.add_argument("-n", "--iterations", type=int, default=200000, help="调用次数")
+    args = parser.parse_args()
+
+    def action():
+        return None
+
+    direct = timeit.timeit(action, number=args.iterations) / args.iterations * 1e6
+    step_retry.begin_test(step_retry.RetryBudget("benchmark"))
+    try:
+        wrapped = timeit.timeit(
+            lambda: step_retry.run_step("click", "#submit", action, step_retry.ACTION_KINDS), number=args.iterations
+        ) / args.iterations * 1e6
+    finally:
+        step_retry.end_test()
+    print(f"单次耗时（微秒），{args.iterations} 次")
+    print(f"{'直接调用':<12} {direct:>8.3f}")
+    print(f"{'run_step':<12} {wrapped:>8.3f}")
+    print(f"{'额外开销':<12} {wrapped - direct:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+异步基础页面类 - 所有异步页面对象的基类
+基于 playwright.async_api，方法与 BasePage 一致（操作类方法需 await）
+"""
+from playwright.async_api import Page, Locator
+from loguru import logger
+from typing import Optional, Tuple, Union
+from weakref import WeakKeyDictionary
+
+from utils.async_assert_utils import AsyncAssertUtils
+from utils.async_wait_utils import AsyncWaitUtils
+from utils.locator_registry import Loc
+from config.settings import Settings
+
+# 每个 Page 共享一组断言和等待工具
+_page_helpers: "WeakKeyDictionary[Page, Tuple[AsyncAssertUtils, AsyncWaitUtils]]" = WeakKeyDictionary()
+
+
+class AsyncBasePage:
+    """
+    异步基础页面类 - 使用 Playwright 推荐的定位器方法
+    定位器可在类属性中用 Loc 声明（与 BasePage 相同），首次访问时解析并缓存
+    """
+    
+    # 配置只读，所有页面对象共享一个实例
+    settings = Settings()
+    
+    def __init__(self, page: Page):
+        self.page = page
+        helpers = _page_helpers.get(page)
+        if helpers is None:
+            helpers = _page_helpers[page] = (AsyncAssertUtils(page), AsyncWaitUtils(page))
+        self.assert_utils, self.wait_utils = helpers
+    
+    # ==================== Playwright 推荐定位器方法 ====================
+    
+    def get_by_role(self, role: str, name: Optional[str] = None, **kwargs) -> Locator:
+        """
+        根据角色定位元素（推荐使用）
+        
+        Args:
+            role: 角色名称 (button, textbox, link, heading, checkbox, radio, etc.)
+            name: 可访问名称（可选）
+            **kwargs: 其他选项 (checked, disabled, exact, expanded, included, level, pressed, selected)
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_role("button", name="Sign in").click()
+            await self.get_by_role("textbox", name="Username").fill("admin")
+        """
+        return self.page.get_by_role(role, name=name, **kwargs)
+    
+    def get_by_text(self, text: str, exact: bool = False) -> Locator:
+        """
+        根据文本内容定位元素（推荐使用）
+        
+        Args:
+            text: 文本内容
+            exact: 是否精确匹配
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_text("Welcome").click()
+            await self.get_by_text("Submit", exact=True).click()
+        """
+        return self.page.get_by_text(text, exact=exact)
+    
+    def get_by_label(self, text: str, exact: bool = False) -> Locator:
+        """
+        根据标签文本定位表单控件（推荐使用）
+        
+        Args:
+            text: 标签文本
+            exact: 是否精确匹配
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_label("Username").fill("admin")
+            await self.get_by_label("Password").fill("password")
+        """
+        return self.page.get_by_label(text, exact=exact)
+    
+    def get_by_placeholder(self, text: str, exact: bool = False) -> Locator:
+        """
+        根据占位符定位输入框（推荐使用）
+        
+        Args:
+            text: 占位符文本
+            exact: 是否精确匹配
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_placeholder("Enter your email").fill("test@example.com")
+        """
+        return self.page.get_by_placeholder(text, exact=exact)
+    
+    def get_by_alt_text(self, text: str, exact: bool = False) -> Locator:
+        """
+        根据 alt 文本定位元素（通常是图片）（推荐使用）
+        
+        Args:
+            text: alt 文本
+            exact: 是否精确匹配
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_alt_text("Company logo").click()
+        """
+        return self.page.get_by_alt_text(text, exact=exact)
+    
+    def get_by_title(self, text: str, exact: bool = False) -> Locator:
+        """
+        根据 title 属性定位元素（推荐使用）
+        
+        Args:
+            text: title 文本
+            exact: 是否精确匹配
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_title("Close dialog").click()
+        """
+        return self.page.get_by_title(text, exact=exact)
+    
+    def get_by_test_id(self, test_id: str) -> Locator:
+        """
+        根据 test-id 属性定位元素（推荐使用）
+        默认使用 data-testid 属性，可在 playwright.config 中配置
+        
+        Args:
+            test_id: test-id 值
+            
+        Returns:
+            Locator对象
+            
+        Example:
+            await self.get_by_test_id("submit-button").click()
+        """
+        return self.page.get_by_test_id(test_id)
+    
+    async def navigate(self, url: Optional[str] = None):
+        """
+        导航到指定URL
+        
+        Args:
+            url: 目标URL，如果为None则使用页面的默认URL
+        """
+        if url is None:
+            url = self.URL if hasattr(self, "URL") else self.settings.BASE_URL
+        
+        logger.info("导航到: {target}", action="navigate", target=url)
+        # 使用 load 避免 networkidle 在资源多的页面等待过久（常超过 1 分钟）
+        await self.page.goto(url, wait_until="load")
+    
+    async def get_title(self) -> str:
+        """获取页面标题"""
+        return await self.page.title()
+    
+    def get_url(self) -> str:
+        """获取当前URL"""
+        return self.page.url
+    
+    async def click(self, locator: Union[str, Locator], timeout: int = 30000):
+        """
+        点击元素
+        
+        Args:
+            locator: 定位器（可以是字符串选择器或 Locator 对象）
+            timeout: 超时时间（毫秒）
+            
+        Example:
+            # 使用 Playwright 定位器（推荐）
+            await self.click(self.get_by_role("button", name="Submit"))
+            await self.click(self.get_by_text("Click me"))
+            
+            # 使用传统选择器（兼容旧代码）
+            await self.click("#submit-button")
+        """
+        if isinstance(locator, str):
+            logger.debug("点击元素: {target}", action="click", target=locator)
+            await self.wait_utils.wait_for_element(locator, timeout=timeout)
+            await self.page.locator(locator).click(timeout=timeout)
+        else:
+            logger.debug("点击元素: {target}", action="click", target=locator)
+            await locator.click(timeout=timeout)
+    
+    async def fill(self, locator: Union[str, Locator], value: str, timeout: int = 30000):
+        """
+        填充输入框
+        
+        Args:
+            locator: 定位器（可以是字符串选择器或 Locator 对象）
+            value: 输入值
+            timeout: 超时时间（毫秒）
+            
+        Example:
+            # 使用 Playwright 定位器（推荐）
+            await self.fill(self.get_by_label("Username"), "admin")
+            await self.fill(self.get_by_placeholder("Email"), "test@example.com")
+            
+            # 使用传统选择器
+            await self.fill("#username", "admin")
+        """
+        if isinstance(locator, str):
+            logger.debug("填充输入框: {target} = '{value}'", action="fill", target=locator, value=value)
+            await self.wait_utils.wait_for_element(locator, timeout=timeout)
+            await self.page.locator(locator).fill(value, timeout=timeout)
+        else:
+            logger.debug("填充输入框: {target} = '{value}'", action="fill", target=locator, value=value)
+            await locator.fill(value, timeout=timeout)
+    
+    async def type_text(self, locator: Union[str, Locator], text: str, delay: int = 100, timeout: int = 30000):
+        """
+        输入文本（带延迟，模拟真实输入）
+        
+        Args:
+            locator: 定位器（可以是字符串选择器或 Locator 对象）
+            text: 输入文本
+            delay: 每个字符的延迟（毫秒）
+            timeout: 超时时间（毫秒）
+            
+        Example:
+            # 使用 Playwright 定位器（推荐）
+            await self.type_text(self.get_by_label("Password"), "secret123")
+        """
+        if isinstance(locator, str):
+            logger.debug("输入文本: {target} = '{value}'", action="type_text", target=locator, value=text)
+            await self.wait_utils.wait_for_element(locator, timeout=timeout)
+            await self.page.locator(locator).type(text, delay=delay, timeout=timeout)
+        else:
+            logger.debug("输入文本: {target} = '{value}'", action="type_text", target=locator, value=text)
+            await locator.type(text, delay=delay, timeout=timeout)
+    
+    async def get_text(self, locator: Union[str, Locator], timeout: int = 30000) -> str:
+        """
+        获取元素文本
+        
+        Args:
+            locator: 定位器（可以是字符串选择器或 Locator 对象）
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            元素文本
+            
+        Example:
+            # 使用 Playwright 定位器（推荐）
+            text = await self.get_text(self.get_by_text("Welcome"))
+        """
+        if isinstance(locator, str):
+            await self.wait_utils.wait_for_element(locator, timeout=timeout)
+            text = await self.page.locator(locator).inner_text(timeout=timeout)
+            logger.debug("获取文本: {target} = '{value}'", action="get_text", target=locator, value=text)
+        else:
+            text = await locator.inner_text(timeout=timeout)
+            logger.debug("获取文本: {target} = '{value}'", action="get_text", target=locator, value=text)
+        return text
+    
+    async def get_value(self, selector: str, timeout: int = 30000) -> str:
+        """
+        获取元素值
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            元素值
+        """
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        value = await self.page.locator(selector).input_value(timeout=timeout)
+        logger.debug("获取值: {target} = '{value}'", action="get_value", target=selector, value=value)
+        return value
+    
+    async def is_visible(self, locator: Union[str, Locator], timeout: int = 5000) -> bool:
+        """
+        检查元素是否可见
+        
+        Args:
+            locator: 定位器（可以是字符串选择器或 Locator 对象）
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            是否可见
+            
+        Example:
+            # 使用 Playwright 定位器（推荐）
+            if await self.is_visible(self.get_by_role("button", name="Submit")):
+                await self.click(self.get_by_role("button", name="Submit"))
+        """
+        try:
+            if isinstance(locator, str):
+                await self.page.locator(locator).wait_for(state="visible", timeout=timeout)
+            else:
+                await locator.wait_for(state="visible", timeout=timeout)
+            return True
+        except:
+            return False
+    
+    async def is_enabled(self, selector: str, timeout: int = 5000) -> bool:
+        """
+        检查元素是否启用
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            是否启用
+        """
+        try:
+            locator = self.page.locator(selector)
+            return await locator.is_enabled(timeout=timeout)
+        except:
+            return False
+    
+    async def select_option(self, selector: str, value: str, timeout: int = 30000):
+        """
+        选择下拉框选项
+        
+        Args:
+            selector: 下拉框选择器
+            value: 选项值
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug("选择选项: {target} = '{value}'", action="select_option", target=selector, value=value)
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        await self.page.locator(selector).select_option(value, timeout=timeout)
+    
+    async def check(self, selector: str, timeout: int = 30000):
+        """
+        勾选复选框
+        
+        Args:
+            selector: 复选框选择器
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug("勾选复选框: {target}", action="check", target=selector)
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        await self.page.locator(selector).check(timeout=timeout)
+    
+    async def uncheck(self, selector: str, timeout: int = 30000):
+        """
+        取消勾选复选框
+        
+        Args:
+            selector: 复选框选择器
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug("取消勾选复选框: {target}", action="uncheck", target=selector)
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        await self.page.locator(selector).uncheck(timeout=timeout)
+    
+    async def hover(self, selector: str, timeout: int = 30000):
+        """
+        鼠标悬停
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug("鼠标悬停: {target}", action="hover", target=selector)
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        await self.page.locator(selector).hover(timeout=timeout)
+    
+    async def screenshot(self, path: str, full_page: bool = True):
+        """
+        截图
+        
+        Args:
+            path: 截图保存路径
+            full_page: 是否截取整个页面
+        """
+        logger.debug("截图保存到: {path}", action="screenshot", path=path)
+        await self.page.screenshot(path=path, full_page=full_page)
+    
+    async def wait_for_selector(self, selector: str, timeout: int = 30000) -> Locator:
+        """
+        等待选择器出现
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            Locator对象
+        """
+        return await self.wait_utils.wait_for_element(selector, timeout=timeout)
+    
+    async def scroll_to_element(self, selector: str, timeout: int = 30000):
+        """
+        滚动到元素
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug("滚动到元素: {target}", action="scroll_to_element", target=selector)
+        await self.wait_utils.wait_for_element(selector, timeout=timeout)
+        await self.page.locator(selector).scroll_into_view_if_needed(timeout=timeout)
+    
+    async def reload(self, wait_until: str = "quiet"):
+        """
+        重新加载页面
+        
+        Args:
+            wait_until: 等待条件 (load, domcontentloaded, networkidle, quiet)；
+                        quiet 等 load 后再等待网络静默（见 WaitUtils.wait_for_network_quiet）
+        """
+        logger.debug("重新加载页面", action="reload")
+        if wait_until != "quiet":
+            await self.page.reload(wait_until=wait_until)
+            return
+        await self.page.reload(wait_until="load")
+        await self.wait_utils.wait_for_network_quiet(label=f"{type(self).__name__}.reload")
+    
+    async def go_back(self):
+        """返回上一页"""
+        logger.debug("返回上一页", action="go_back")
+        await self.page.go_back()
+    
+    async def go_forward(self):
+        """前进下一页"""
+        logger.debug("前进下一页", action="go_forward")
+        await self.page.go_forward()
+
@@ -0,0 +1,46 @@
+"""
+complicated-page页面对象（异步版本）
+"""
+
+from playwright.async_api import Locator
+from loguru import logger
+from pages.async_base_page import AsyncBasePage
+from pages.complicated_page import Complicated
+
+
+class AsyncComplicated(AsyncBasePage):
+    BUTTON_NAME = Complicated.BUTTON_NAME
+    buttons = Complicated.buttons
+
+    def __init__(self, page):
+        super().__init__(page)
+
+    def get_buttons(self) -> Locator:
+        """返回所有名为 Button 的按钮定位器列表（Locator）"""
+        return self.buttons
+
+    async def click_button(self, index: int = 0):
+        """
+        点击指定序号的 Button（默认第一个）
+
+        Args:
+            index: 第几个按钮（0-based）
+        """
+        target = self.buttons.nth(index)
+        logger.info(f"点击第 {index} 个 Button")
+        await target.click()
+
+    async def scroll_by(self, delta_y):
+        """
+        按像素滚动页面
+        
+        Args:
+            delta_y: 向下为正，向上为负（像素）
+        """
+        logger.info(f"滚动页面: delta_y={delta_y}")
+        await self.page.mouse.wheel(0, delta_y)
+
+    async def scroll_to_text(self, text: str):
+        """滚动到包含指定文本的元素"""
+        locator = self.page.get_by_text(text)
+        await locator.scroll_into_view_if_needed()
@@ -0,0 +1,40 @@
+"""
+首页页面对象（异步版本）
+"""
+
+from loguru import logger
+from pages.async_base_page import AsyncBasePage
+from pages.index_page import IndexPage
+
+
+class AsyncIndexPage(AsyncBasePage):
+    LINK_TEXT = IndexPage.LINK_TEXT
+    URL = IndexPage.URL
+    big_page_link = IndexPage.big_page_link
+
+    def __init__(self, page):
+        super().__init__(page)
+
+    async def openUrl(self):
+        """打开首页"""
+        await self.navigate()
+    
+    async def click_big_page_link(self):
+        """
+        点击 'Big page with many elements' 链接
+        使用 Playwright 推荐的 get_by_text() 定位器方法
+        """
+        logger.info("点击 'Big page with many elements' 链接")
+        await self.click(self.big_page_link)
+        await self.page.wait_for_url("**/complicated-page")
+        await self.wait_utils.wait_for_network_quiet(label="AsyncIndexPage.click_big_page_link")
+    
+    def get_big_page_link_locator(self):
+        """
+        获取 'Big page with many elements' 链接的定位器
+        返回 Locator 对象，可以用于链式操作
+        
+        Returns:
+            Locator对象
+        """
+        return self.big_page_link
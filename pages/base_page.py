@@ -2,23 +2,80 @@
 基础页面类 - 所有页面对象的基类
 使用 Playwright 推荐的定位器方法
 """
+from playwright.sync_api import Error as PlaywrightError
 from playwright.sync_api import Page, Locator
 from loguru import logger
-from typing import Optional, Union
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+from weakref import WeakKeyDictionary
 
+from utils import perf_metrics
+from utils.action_timing import NULL_TIMER, ActionTimer
 from utils.assert_utils import AssertUtils
+from utils.dom_batch import READ_ELEMENT_SCRIPT, BatchError, run_batch, selector_kind
+from utils.locator_registry import Loc
+from utils.step_retry import ACTION_KINDS, NAVIGATE_KINDS, READ_KINDS, run_step
 from utils.wait_utils import WaitUtils
 from config.settings import Settings
 
 
+# 每个 Page 共享一组断言和等待工具（同一页面上的多个页面对象复用，页面关闭回收后自动移除）
+_page_helpers: "WeakKeyDictionary[Page, Tuple[AssertUtils, WaitUtils]]" = WeakKeyDictionary()
+
+
 class BasePage:
-    """基础页面类 - 使用 Playwright 推荐的定位器方法"""
+    """
+    基础页面类 - 使用 Playwright 推荐的定位器方法
+    
+    定位器可在类属性中用 Loc 声明，首次访问时解析并缓存在页面对象实例上：
+        buttons = Loc.role("link", name="Button")
+    
+    操作日志使用占位符加关键字参数（logger.debug("点击元素: {target}", action="click", target=locator)）：
+    低于日志级别时不格式化消息，关键字参数作为 JSON 日志的 action/target 等字段
+    """
+    
+    # 配置只读，所有页面对象共享一个实例
+    settings = Settings()
+    
+    # 性能预算（子类按需覆盖），如 {"load_ms": 5000, "lcp_ms": 2500, "cls": 0.1, "requests": 100, "transfer_kb": 2000}
+    # 指标名见 utils/perf_metrics.py，超出时按 PERF_BUDGET_MODE 记录警告或使测试失败
+    PERF_BUDGET: Optional[Dict[str, float]] = None
     
     def __init__(self, page: Page):
         self.page = page
-        self.settings = Settings()
-        self.assert_utils = AssertUtils(page)
-        self.wait_utils = WaitUtils(page)
+        helpers = _page_helpers.get(page)
+        if helpers is None:
+            helpers = _page_helpers[page] = (AssertUtils(page), WaitUtils(page))
+        self.assert_utils, self.wait_utils = helpers
+    
+    def _time_action(self, method: str, target=None):
+        """
+        操作计时器：with 块计总耗时，timer.phase("wait") / timer.phase("action") 分别计等待和执行阶段
+        未启用 ACTION_TIMING 时返回共享的空计时器
+        """
+        if not self.settings.ACTION_TIMING:
+            return NULL_TIMER
+        return ActionTimer(type(self).__name__, method, target)
+    
+    def _locate(self, selector: str, timer, timeout: int, actionable: bool = True) -> Locator:
+        """
+        字符串选择器转为 Locator
+        
+        FAST_ACTIONS 关闭时先单独等待元素可见（多一次往返，选择器解析两次）；
+        开启时，点击、填充等自带可操作性检查（等待元素可见）的操作跳过单独等待，一次往返完成；
+        读取、逐字输入、滚动等不检查可见性的操作传 actionable=False，仍先等待元素可见，
+        严格模式和错误信息（原始选择器）与关闭时一致。
+        等待不单独重试：由调用方的 run_step 按操作自身的错误类别重试整个操作（定位 + 执行）。
+        
+        Args:
+            selector: 元素选择器
+            timer: 操作计时器
+            timeout: 超时时间（毫秒）
+            actionable: 操作自身会等待元素可见（FAST_ACTIONS 开启时可跳过单独等待）
+        """
+        if not self.settings.FAST_ACTIONS or not actionable:
+            with timer.phase("wait"):
+                return self.wait_utils.wait_for_element(selector, timeout=timeout, retry=False)
+        return self.page.locator(selector)
     
     # ==================== Playwright 推荐定位器方法 ====================
     
@@ -148,9 +205,27 @@ class BasePage:
         if url is None:
             url = self.URL if hasattr(self, "URL") else self.settings.BASE_URL
         
-        logger.info(f"导航到: {url}")
+        logger.info("导航到: {target}", action="navigate", target=url)
         # 使用 load 避免 networkidle 在资源多的页面等待过久（常超过 1 分钟）
-        self.page.goto(url, wait_until="load")
+        # 连接重置等瞬时网络错误在步骤内重试
+        with self._time_action("navigate", url):
+            run_step("navigate", url, lambda: self.page.goto(url, wait_until="load"), NAVIGATE_KINDS)
+        self.measure_performance("navigate")
+    
+    def measure_performance(self, action: str, budget: Optional[Dict[str, float]] = None) -> Optional[dict]:
+        """
+        采集当前页面的导航性能（Navigation Timing、Paint、LCP/CLS、传输大小和请求数）并检查性能预算
+        
+        Args:
+            action: 触发导航的操作，记录名称为 "页面类名.操作"
+            budget: 性能预算，默认使用当前页面对象的 PERF_BUDGET
+            
+        Returns:
+            采集到的性能数据，未启用 PERF_METRICS 时返回 None
+        """
+        return perf_metrics.measure(
+            self.page, f"{type(self).__name__}.{action}", self.PERF_BUDGET if budget is None else budget
+        )
     
     def get_title(self) -> str:
         """获取页面标题"""
@@ -176,13 +251,20 @@ class BasePage:
             # 使用传统选择器（兼容旧代码）
             self.click("#submit-button")
         """
-        if isinstance(locator, str):
-            logger.debug(f"点击元素: {locator}")
-            self.wait_utils.wait_for_element(locator, timeout=timeout)
-            self.page.locator(locator).click(timeout=timeout)
-        else:
-            logger.debug(f"点击元素: {locator}")
-            locator.click(timeout=timeout)
+        logger.debug("点击元素: {target}", action="click", target=locator)
+        with self._time_action("click", locator) as timer:
+            # Locator 的可操作性等待在 click 内部完成，只计执行阶段
+            if isinstance(locator, str):
+                def _click():
+                    target = self._locate(locator, timer, timeout)
+                    with timer.phase("action"):
+                        target.click(timeout=timeout)
+            else:
+                def _click():
+                    with timer.phase("action"):
+                        locator.click(timeout=timeout)
+            # 元素被重新渲染（detached）等瞬时错误在步骤内重试
+            run_step("click", locator, _click, ACTION_KINDS)
     
     def fill(self, locator: Union[str, Locator], value: str, timeout: int = 30000):
         """
@@ -201,13 +283,18 @@ class BasePage:
             # 使用传统选择器
             self.fill("#username", "admin")
         """
-        if isinstance(locator, str):
-            logger.debug(f"填充输入框: {locator} = '{value}'")
-            self.wait_utils.wait_for_element(locator, timeout=timeout)
-            self.page.locator(locator).fill(value, timeout=timeout)
-        else:
-            logger.debug(f"填充输入框: {locator} = '{value}'")
-            locator.fill(value, timeout=timeout)
+        logger.debug("填充输入框: {target} = '{value}'", action="fill", target=locator, value=value)
+        with self._time_action("fill", locator) as timer:
+            if isinstance(locator, str):
+                def _fill():
+                    target = self._locate(locator, timer, timeout)
+                    with timer.phase("action"):
+                        target.fill(value, timeout=timeout)
+            else:
+                def _fill():
+                    with timer.phase("action"):
+                        locator.fill(value, timeout=timeout)
+            run_step("fill", locator, _fill, ACTION_KINDS)
     
     def type_text(self, locator: Union[str, Locator], text: str, delay: int = 100, timeout: int = 30000):
         """
@@ -223,13 +310,18 @@ class BasePage:
             # 使用 Playwright 定位器（推荐）
             self.type_text(self.get_by_label("Password"), "secret123")
         """
-        if isinstance(locator, str):
-            logger.debug(f"输入文本: {locator} = '{text}'")
-            self.wait_utils.wait_for_element(locator, timeout=timeout)
-            self.page.locator(locator).type(text, delay=delay, timeout=timeout)
-        else:
-            logger.debug(f"输入文本: {locator} = '{text}'")
-            locator.type(text, delay=delay, timeout=timeout)
+        logger.debug("输入文本: {target} = '{value}'", action="type_text", target=locator, value=text)
+        with self._time_action("type_text", locator) as timer:
+            if isinstance(locator, str):
+                def _type():
+                    target = self._locate(locator, timer, timeout, actionable=False)
+                    with timer.phase("action"):
+                        target.type(text, delay=delay, timeout=timeout)
+            else:
+                def _type():
+                    with timer.phase("action"):
+                        locator.type(text, delay=delay, timeout=timeout)
+            run_step("type_text", locator, _type, ACTION_KINDS)
     
     def get_text(self, locator: Union[str, Locator], timeout: int = 30000) -> str:
         """
@@ -246,13 +338,19 @@ class BasePage:
             # 使用 Playwright 定位器（推荐）
             text = self.get_text(self.get_by_text("Welcome"))
         """
-        if isinstance(locator, str):
-            self.wait_utils.wait_for_element(locator, timeout=timeout)
-            text = self.page.locator(locator).inner_text(timeout=timeout)
-            logger.debug(f"获取文本: {locator} = '{text}'")
-        else:
-            text = locator.inner_text(timeout=timeout)
-            logger.debug(f"获取文本: {locator} = '{text}'")
+        with self._time_action("get_text", locator) as timer:
+            if isinstance(locator, str):
+                def _read() -> str:
+                    target = self._locate(locator, timer, timeout, actionable=False)
+                    with timer.phase("action"):
+                        return target.inner_text(timeout=timeout)
+            else:
+                def _read() -> str:
+                    with timer.phase("action"):
+                        return locator.inner_text(timeout=timeout)
+            # 读取是只读操作，页面跳转导致的错误也可以重试
+            text = run_step("get_text", locator, _read, READ_KINDS)
+        logger.debug("获取文本: {target} = '{value}'", action="get_text", target=locator, value=text)
         return text
     
     def get_value(self, selector: str, timeout: int = 30000) -> str:
@@ -266,11 +364,134 @@ class BasePage:
         Returns:
             元素值
         """
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        value = self.page.locator(selector).input_value(timeout=timeout)
-        logger.debug(f"获取值: {selector} = '{value}'")
+        with self._time_action("get_value", selector) as timer:
+            def _read() -> str:
+                target = self._locate(selector, timer, timeout, actionable=False)
+                with timer.phase("action"):
+                    return target.input_value(timeout=timeout)
+            value = run_step("get_value", selector, _read, READ_KINDS)
+        logger.debug("获取值: {target} = '{value}'", action="get_value", target=selector, value=value)
         return value
     
+    def fill_form(self, fields: Mapping[Union[str, Locator], Any], timeout: int = 30000,
+                  raise_on_error: bool = True) -> Dict[Union[str, Locator], str]:
+        """
+        批量填充表单
+        CSS/XPath 选择器的字段在一次浏览器往返中完成（等待可见、赋值并触发 input/change 事件），
+        Locator 和 Playwright 专有选择器的字段随后逐个操作
+        
+        Args:
+            fields: {定位器: 值}，str 填充输入框（下拉框按 value 或选项文本选择），
+                    bool 勾选/取消勾选复选框或单选框，list 选择多个下拉选项
+            timeout: 等待字段可见、可编辑的超时时间（毫秒）
+            raise_on_error: 有字段失败时抛出 BatchError
+            
+        Returns:
+            {定位器: 错误信息}，全部成功时为空
+            
+        Example:
+            self.fill_form({"#username": "admin", "#remember": True, "#city": "上海"})
+        """
+        logger.debug("批量填充表单: {count} 个字段", action="fill_form", count=len(fields))
+        errors: Dict[Union[str, Locator], str] = {}
+        with self._time_action("fill_form", f"{len(fields)} 个字段") as timer, timer.phase("action"):
+            batch, keys, sequential = [], [], []
+            for locator, value in fields.items():
+                kind = selector_kind(locator)
+                if kind is None:
+                    sequential.append(locator)
+                    continue
+                if isinstance(value, bool):
+                    batch.append({"kind": kind[0], "selector": kind[1], "op": "check", "value": value})
+                else:
+                    value = [str(v) for v in value] if isinstance(value, (list, tuple)) else str(value)
+                    batch.append({"kind": kind[0], "selector": kind[1], "op": "fill", "value": value})
+                keys.append(locator)
+            results = run_step(
+                "fill_form", f"{len(batch)} 个字段", lambda: run_batch(self.page, batch, timeout), ACTION_KINDS
+            )
+            for locator, result in zip(keys, results):
+                if result.get("unsupported"):
+                    sequential.append(locator)
+                elif result.get("error"):
+                    errors[locator] = result["error"]
+            for locator in sequential:
+                try:
+                    self._fill_field(locator, fields[locator], timeout)
+                except PlaywrightError as e:
+                    errors[locator] = str(e).splitlines()[0]
+        if errors:
+            if raise_on_error:
+                raise BatchError("fill_form", errors)
+            logger.warning(f"批量填充表单有 {len(errors)} 个字段失败: {errors}")
+        return errors
+    
+    def _fill_field(self, locator: Union[str, Locator], value: Any, timeout: int):
+        """逐个填充单个字段（批量脚本不支持的定位器）"""
+        target = locator if isinstance(locator, Locator) else self.page.locator(locator)
+        if isinstance(value, bool):
+            target.set_checked(value, timeout=timeout)
+        elif isinstance(value, (list, tuple)):
+            target.select_option([str(v) for v in value], timeout=timeout)
+        elif target.evaluate("el => el instanceof HTMLSelectElement", timeout=timeout):
+            target.select_option(str(value), timeout=timeout)
+        else:
+            target.fill(str(value), timeout=timeout)
+    
+    def read_many(self, locators: Union[Sequence[Union[str, Locator]], Mapping[str, Union[str, Locator]]],
+                  timeout: int = 30000, raise_on_error: bool = True) -> Dict[Any, Optional[str]]:
+        """
+        批量读取元素的值或文本
+        输入框、文本域、下拉框读取 value，复选框/单选框读取 "true"/"false"，其他元素读取 innerText；
+        CSS/XPath 选择器在一次浏览器往返中读取，其余定位器随后逐个读取
+        
+        Args:
+            locators: 定位器列表，或 {名称: 定位器}
+            timeout: 等待元素可见的超时时间（毫秒）
+            raise_on_error: 有字段失败时抛出 BatchError
+            
+        Returns:
+            {定位器或名称: 值}，失败字段的值为 None
+            
+        Example:
+            values = self.read_many({"title": "h1", "email": "#email", "agree": "#agree"})
+        """
+        items = list(locators.items()) if isinstance(locators, Mapping) else [(locator, locator) for locator in locators]
+        values: Dict[Any, Optional[str]] = {key: None for key, _ in items}
+        errors: Dict[Any, str] = {}
+        with self._time_action("read_many", f"{len(items)} 个字段") as timer, timer.phase("action"):
+            batch, keys, sequential = [], [], []
+            for key, locator in items:
+                kind = selector_kind(locator)
+                if kind is None:
+                    sequential.append((key, locator))
+                    continue
+                batch.append({"kind": kind[0], "selector": kind[1], "op": "read", "value": None})
+                keys.append((key, locator))
+            results = run_step(
+                "read_many", f"{len(batch)} 个字段", lambda: run_batch(self.page, batch, timeout), READ_KINDS
+            )
+            for (key, locator), result in zip(keys, results):
+                if result.get("unsupported"):
+                    sequential.append((key, locator))
+                elif result.get("error"):
+                    errors[key] = result["error"]
+                else:
+                    values[key] = result["value"]
+            for key, locator in sequential:
+                target = locator if isinstance(locator, Locator) else self.page.locator(locator)
+                try:
+                    target.wait_for(state="visible", timeout=timeout)
+                    values[key] = target.evaluate(READ_ELEMENT_SCRIPT, timeout=timeout)
+                except PlaywrightError as e:
+                    errors[key] = str(e).splitlines()[0]
+        if errors:
+            if raise_on_error:
+                raise BatchError("read_many", errors)
+            logger.warning(f"批量读取有 {len(errors)} 个字段失败: {errors}")
+        logger.debug("批量读取: {value}", action="read_many", value=values)
+        return values
+    
     def is_visible(self, locator: Union[str, Locator], timeout: int = 5000) -> bool:
         """
         检查元素是否可见
@@ -287,14 +508,15 @@ class BasePage:
             if self.is_visible(self.get_by_role("button", name="Submit")):
                 self.click(self.get_by_role("button", name="Submit"))
         """
-        try:
-            if isinstance(locator, str):
-                self.page.locator(locator).wait_for(state="visible", timeout=timeout)
-            else:
-                locator.wait_for(state="visible", timeout=timeout)
-            return True
-        except:
-            return False
+        with self._time_action("is_visible", locator) as timer, timer.phase("wait"):
+            try:
+                if isinstance(locator, str):
+                    self.page.locator(locator).wait_for(state="visible", timeout=timeout)
+                else:
+                    locator.wait_for(state="visible", timeout=timeout)
+                return True
+            except:
+                return False
     
     def is_enabled(self, selector: str, timeout: int = 5000) -> bool:
         """
@@ -322,9 +544,13 @@ class BasePage:
             value: 选项值
             timeout: 超时时间（毫秒）
         """
-        logger.debug(f"选择选项: {selector} = '{value}'")
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        self.page.locator(selector).select_option(value, timeout=timeout)
+        logger.debug("选择选项: {target} = '{value}'", action="select_option", target=selector, value=value)
+        with self._time_action("select_option", selector) as timer:
+            def _select_option():
+                target = self._locate(selector, timer, timeout)
+                with timer.phase("action"):
+                    target.select_option(value, timeout=timeout)
+            run_step("select_option", selector, _select_option, ACTION_KINDS)
     
     def check(self, selector: str, timeout: int = 30000):
         """
@@ -334,9 +560,13 @@ class BasePage:
             selector: 复选框选择器
             timeout: 超时时间（毫秒）
         """
-        logger.debug(f"勾选复选框: {selector}")
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        self.page.locator(selector).check(timeout=timeout)
+        logger.debug("勾选复选框: {target}", action="check", target=selector)
+        with self._time_action("check", selector) as timer:
+            def _check():
+                target = self._locate(selector, timer, timeout)
+                with timer.phase("action"):
+                    target.check(timeout=timeout)
+            run_step("check", selector, _check, ACTION_KINDS)
     
     def uncheck(self, selector: str, timeout: int = 30000):
         """
@@ -346,9 +576,13 @@ class BasePage:
             selector: 复选框选择器
             timeout: 超时时间（毫秒）
         """
-        logger.debug(f"取消勾选复选框: {selector}")
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        self.page.locator(selector).uncheck(timeout=timeout)
+        logger.debug("取消勾选复选框: {target}", action="uncheck", target=selector)
+        with self._time_action("uncheck", selector) as timer:
+            def _uncheck():
+                target = self._locate(selector, timer, timeout)
+                with timer.phase("action"):
+                    target.uncheck(timeout=timeout)
+            run_step("uncheck", selector, _uncheck, ACTION_KINDS)
     
     def hover(self, selector: str, timeout: int = 30000):
         """
@@ -358,9 +592,13 @@ class BasePage:
             selector: 元素选择器
             timeout: 超时时间（毫秒）
         """
-        logger.debug(f"鼠标悬停: {selector}")
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        self.page.locator(selector).hover(timeout=timeout)
+        logger.debug("鼠标悬停: {target}", action="hover", target=selector)
+        with self._time_action("hover", selector) as timer:
+            def _hover():
+                target = self._locate(selector, timer, timeout)
+                with timer.phase("action"):
+                    target.hover(timeout=timeout)
+            run_step("hover", selector, _hover, ACTION_KINDS)
     
     def screenshot(self, path: str, full_page: bool = True):
         """
@@ -370,7 +608,7 @@ class BasePage:
             path: 截图保存路径
             full_page: 是否截取整个页面
         """
-        logger.debug(f"截图保存到: {path}")
+        logger.debug("截图保存到: {path}", action="screenshot", path=path)
         self.page.screenshot(path=path, full_page=full_page)
     
     def wait_for_selector(self, selector: str, timeout: int = 30000) -> Locator:
@@ -394,27 +632,34 @@ class BasePage:
             selector: 元素选择器
             timeout: 超时时间（毫秒）
         """
-        logger.debug(f"滚动到元素: {selector}")
-        self.wait_utils.wait_for_element(selector, timeout=timeout)
-        self.page.locator(selector).scroll_into_view_if_needed(timeout=timeout)
+        logger.debug("滚动到元素: {target}", action="scroll_to_element", target=selector)
+        with self._time_action("scroll_to_element", selector) as timer:
+            target = self._locate(selector, timer, timeout, actionable=False)
+            with timer.phase("action"):
+                target.scroll_into_view_if_needed(timeout=timeout)
     
-    def reload(self, wait_until: str = "networkidle"):
+    def reload(self, wait_until: str = "quiet"):
         """
         重新加载页面
         
         Args:
-            wait_until: 等待条件 (load, domcontentloaded, networkidle)
-        """
-        logger.debug("重新加载页面")
-        self.page.reload(wait_until=wait_until)
+            wait_until: 等待条件 (load, domcontentloaded, networkidle, quiet)；
+                        quiet 等 load 后再等待网络静默（见 WaitUtils.wait_for_network_quiet）
+        """
+        logger.debug("重新加载页面", action="reload")
+        if wait_until != "quiet":
+            self.page.reload(wait_until=wait_until)
+            return
+        self.page.reload(wait_until="load")
+        self.wait_utils.wait_for_network_quiet(label=f"{type(self).__name__}.reload")
     
     def go_back(self):
         """返回上一页"""
-        logger.debug("返回上一页")
+        logger.debug("返回上一页", action="go_back")
         self.page.go_back()
     
     def go_forward(self):
         """前进下一页"""
-        logger.debug("前进下一页")
+        logger.debug("前进下一页", action="go_forward")
         self.page.go_forward()
 
@@ -2,21 +2,39 @@
 complicated-page页面对象
 """
 
+from typing import List
+
 from playwright.sync_api import Page, Locator
 from loguru import logger
-from pages.base_page import BasePage
+from pages.base_page import BasePage, Loc
 
 
 class Complicated(BasePage):
     # 该页面上“Button”一组按钮（均为<a>，role=link，name=Button）
     BUTTON_NAME = "Button"
+    # 第 index 个（从 1 开始）Button 的 XPath，可在浏览器内直接解析，用于批量读取
+    BUTTON_XPATH = "(//a[normalize-space()='Button'])[{index}]"
+
+    buttons = Loc.role("link", name=BUTTON_NAME)
+    # 元素多的大页面，预算比首页宽松
+    PERF_BUDGET = {"load_ms": 8000, "lcp_ms": 5000, "cls": 0.25, "requests": 150, "transfer_kb": 5000}
 
     def __init__(self,page):
         super().__init__(page)
 
     def get_buttons(self) -> Locator:
         """返回所有名为 Button 的按钮定位器列表（Locator）"""
-        return self.page.get_by_role("link", name=self.BUTTON_NAME)
+        return self.buttons
+
+    def read_button_texts(self, count: int) -> List[str]:
+        """
+        批量读取前 count 个 Button 的文本（一次浏览器往返）
+
+        Args:
+            count: 读取的按钮数量
+        """
+        values = self.read_many([self.BUTTON_XPATH.format(index=i + 1) for i in range(count)])
+        return list(values.values())
 
     def click_button(self, index: int = 0):
         """
@@ -25,10 +43,9 @@ class Complicated(BasePage):
         Args:
             index: 第几个按钮（0-based）
         """
-        buttons = self.get_buttons()
-        target = buttons.nth(index)
         logger.info(f"点击第 {index} 个 Button")
-        target.click()
+        # 通过 BasePage.click 执行：元素被重新渲染时步骤内重试，并计入操作耗时统计
+        self.click(self.buttons.nth(index))
 
     def scroll_by(self, delta_y):
         """
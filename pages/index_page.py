@@ -4,12 +4,15 @@
 
 from playwright.sync_api import Page
 from loguru import logger
-from pages.base_page import BasePage
+from pages.base_page import BasePage, Loc
+from pages.complicated_page import Complicated
 from config.settings import Settings
 
 class IndexPage(BasePage):
     LINK_TEXT = "Big page with many elements"
     URL = Settings.BASE_URL
+    big_page_link = Loc.text(LINK_TEXT)
+    PERF_BUDGET = {"load_ms": 5000, "lcp_ms": 4000, "cls": 0.1, "requests": 50, "transfer_kb": 1500}
 
     def __init__(self, page):
         super().__init__(page)
@@ -25,9 +28,12 @@ class IndexPage(BasePage):
         """
         logger.info("点击 'Big page with many elements' 链接")
         # 使用 Playwright 推荐的定位器方法
-        self.click(self.get_by_text(self.LINK_TEXT))
+        self.click(self.big_page_link)
         self.page.wait_for_url("**/complicated-page")
-        self.wait_utils.wait_for_load_state("networkidle")
+        # 等待相关请求静默，不被统计信标和长轮询拖住（networkidle 至少多等 500ms）
+        self.wait_utils.wait_for_network_quiet(label="IndexPage.click_big_page_link")
+        # 跳转后的页面按目标页面对象的预算检查
+        self.measure_performance("click_big_page_link", budget=Complicated.PERF_BUDGET)
     
     def get_big_page_link_locator(self):
         """
@@ -37,4 +43,4 @@ class IndexPage(BasePage):
         Returns:
             Locator对象
         """
-        return self.get_by_text("Big page with many elements")
\ No newline at end of file
+        return self.big_page_link
\ No newline at end of file
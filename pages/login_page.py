@@ -0,0 +1,34 @@
+"""
+登录页面对象
+"""
+
+from loguru import logger
+from pages.base_page import BasePage
+from config.settings import Settings
+
+
+class LoginPage(BasePage):
+    URL = Settings.LOGIN_URL
+    # 选择器可通过环境变量覆盖，以适配不同站点
+    USERNAME_INPUT = Settings.LOGIN_USERNAME_SELECTOR
+    PASSWORD_INPUT = Settings.LOGIN_PASSWORD_SELECTOR
+    SUBMIT_BUTTON = Settings.LOGIN_SUBMIT_SELECTOR
+
+    def __init__(self, page):
+        super().__init__(page)
+
+    def login(self, username: str, password: str):
+        """
+        打开登录页并使用指定账号登录
+
+        Args:
+            username: 用户名
+            password: 密码
+        """
+        logger.info(f"登录用户: {username}")
+        self.navigate()
+        self.fill(self.USERNAME_INPUT, username)
+        self.fill(self.PASSWORD_INPUT, password)
+        self.click(self.SUBMIT_BUTTON)
+        # 登录成功后离开登录页
+        self.page.wait_for_url(lambda url: url.rstrip("/") != self.URL.rstrip("/"))
@@ -25,20 +25,22 @@ def find_project_root():
     return current
 
 
-def run_tests(marker=None, file=None, parallel=False, html_report=True):
+def build_command(project_root, marker=None, file=None, parallel=False, html_report=True, schedule=None, targets=None):
     """
-    运行测试
+    构建 pytest 命令
     
     Args:
-        marker: 测试标记（如：smoke, login等）
+        project_root: 项目根目录
+        marker: 测试标记
         file: 测试文件路径
         parallel: 是否并行运行
         html_report: 是否生成HTML报告
-    """
-    # 确保在项目根目录运行
-    project_root = find_project_root()
-    os.chdir(project_root)
+        schedule: 并行调度方式（duration / default），为空时取 XDIST_SCHEDULE
+        targets: 测试影响分析选出的测试文件或 nodeid
     
+    Returns:
+        命令参数列表
+    """
     # 使用当前 Python 解释器调用 pytest，避免 Windows 下找不到可执行文件
     cmd = [sys.executable, "-m", "pytest", "-v"]
     
@@ -56,15 +58,115 @@ def run_tests(marker=None, file=None, parallel=False, html_report=True):
                 file_path = project_root / file_path
         cmd.append(str(file_path))
     
+    if targets:
+        cmd.extend(targets)
+    
     if parallel:
         cmd.extend(["-n", "auto"])
+        if schedule:
+            cmd.append(f"--schedule={schedule}")
     
     if html_report:
         cmd.extend(["--html=reports/report.html", "--self-contained-html"])
     
+    return cmd
+
+
+def build_env(browser_server=False, impact_record=False, metrics=True):
+    """
+    构建子进程环境变量
+    
+    Args:
+        browser_server: 并行时共享浏览器服务
+        impact_record: 记录测试影响分析的运行时数据
+        metrics: 开启导航性能采集和页面操作耗时统计（环境变量已显式设置时以环境变量为准）
+    """
     # 子进程不继承 PWDEBUG，避免通过 run_tests.py 运行时误开 Playwright Inspector
     env = os.environ.copy()
     env.pop("PWDEBUG", None)
+    if metrics:
+        env.setdefault("PERF_METRICS", "true")
+        env.setdefault("ACTION_TIMING", "true")
+    if browser_server:
+        env["BROWSER_SERVER"] = "true"
+    if impact_record:
+        env["IMPACT_RECORD"] = "true"
+    return env
+
+
+def select_impacted(project_root, ref):
+    """
+    根据自 git 引用以来变更的文件选择受影响的测试
+    
+    Args:
+        project_root: 项目根目录
+        ref: git 引用（分支、标签或提交）
+    
+    Returns:
+        测试文件或 nodeid 列表，需要运行全部测试时返回 None
+    """
+    import time
+    
+    sys.path.insert(0, str(project_root))
+    from config.settings import Settings
+    from utils.test_impact import ImpactMap, changed_data_keys, changed_files
+    
+    start = time.perf_counter()
+    impact_map = ImpactMap(project_root, Settings.CACHE_DIR / "impact_map.json")
+    parsed = impact_map.refresh()
+    if parsed:
+        impact_map.save()
+    changed = changed_files(project_root, ref)
+    changed_data = {
+        rel: changed_data_keys(project_root, ref, rel) for rel in changed if rel.startswith("data/")
+    }
+    run_all, targets = impact_map.select(changed, changed_data)
+    elapsed = time.perf_counter() - start
+    
+    print(f"自 {ref} 以来变更的文件: {len(changed)}")
+    for rel in changed:
+        keys = changed_data.get(rel)
+        print(f"  {rel}" + (f"（变更的数据键: {', '.join(sorted(keys))}）" if keys else ""))
+    print(f"测试影响分析耗时: {elapsed:.3f}s（重新解析 {parsed} 个文件，"
+          f"运行时记录 {len(impact_map.runtime)} 个测试）")
+    if run_all:
+        print("变更涉及全局文件（conftest.py、pytest.ini 或其导入的模块），运行全部测试")
+        return None
+    print(f"受影响的测试: {len(targets)}")
+    for target in targets:
+        print(f"  {target}")
+    return targets
+
+
+def run_tests(marker=None, file=None, parallel=False, html_report=True, browser_server=False, schedule=None,
+              changed_since=None, impact_record=False, metrics=True):
+    """
+    运行测试
+    
+    Args:
+        marker: 测试标记（如：smoke, login等）
+        file: 测试文件路径
+        parallel: 是否并行运行
+        html_report: 是否生成HTML报告
+        browser_server: 并行时各 worker 连接共享浏览器服务，而不是各自启动浏览器
+        schedule: 并行调度方式（duration 按历史耗时从长到短分配 / default xdist 默认调度）
+        changed_since: 只运行受自该 git 引用以来的变更影响的测试
+        impact_record: 记录每个测试调用到的模块和测试数据键，用于细化测试影响分析
+        metrics: 开启导航性能采集和页面操作耗时统计
+    """
+    # 确保在项目根目录运行
+    project_root = find_project_root()
+    os.chdir(project_root)
+    
+    targets = None
+    if changed_since:
+        targets = select_impacted(project_root, changed_since)
+        if targets == []:
+            print("没有受影响的测试")
+            sys.exit(0)
+    
+    cmd = build_command(project_root, marker, file, parallel, html_report, schedule, targets)
+    env = build_env(browser_server, impact_record, metrics)
 
     print(f"执行命令: {' '.join(cmd)}")
     print(f"工作目录: {project_root}")
@@ -72,6 +174,72 @@ def run_tests(marker=None, file=None, parallel=False, html_report=True):
     sys.exit(result.returncode)
 
 
+def compare_schedule(marker=None, file=None, browser_server=False):
+    """
+    在同一批测试上分别使用 xdist 默认调度和按耗时调度并行运行，对比完成时间
+    
+    Args:
+        marker: 测试标记
+        file: 测试文件路径
+        browser_server: 是否共享浏览器服务
+    """
+    import json
+    
+    project_root = find_project_root()
+    os.chdir(project_root)
+    env = build_env(browser_server)
+    schedule_file = project_root / "reports" / "schedule.json"
+    
+    results = []
+    for schedule in ("default", "duration"):
+        cmd = build_command(project_root, marker, file, parallel=True, html_report=False, schedule=schedule)
+        print(f"执行命令: {' '.join(cmd)}")
+        if schedule_file.exists():
+            schedule_file.unlink()
+        subprocess.run(cmd, cwd=project_root, env=env)
+        if schedule_file.exists():
+            with open(schedule_file, "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+    
+    print(f"\n{'调度':<10} {'worker':>6} {'完成时间':>8} {'理论下限':>8} {'空闲':>6} {'尾部':>6}")
+    for result in results:
+        print(
+            f"{result['mode']:<10} {result['workers']:>6} {result['makespan_s']:>7}s {result['lower_bound_s']:>7}s "
+            f"{result['idle_pct']:>5}% {result['tail_s']:>5}s"
+        )
+
+
+def flaky_report(top=30):
+    """
+    输出测试结果历史库中的不稳定率报告
+    
+    Args:
+        top: 最多显示的测试数量
+    """
+    project_root = find_project_root()
+    sys.path.insert(0, str(project_root))
+    from config.settings import Settings
+    from utils.flaky_history import FlakyHistory
+    
+    db_path = Settings.CACHE_DIR / "test_history.sqlite3"
+    if not db_path.exists():
+        print(f"尚无测试结果历史: {db_path}")
+        return
+    history = FlakyHistory(db_path, window=Settings.FLAKY_HISTORY_WINDOW, min_runs=Settings.FLAKY_MIN_RUNS)
+    rows = history.report()
+    history.close()
+    
+    print(f"最近 {Settings.FLAKY_HISTORY_WINDOW} 次运行的不稳定率（共 {len(rows)} 个测试）")
+    print(f"{'不稳定率':>8} {'运行':>5} {'失败':>5} {'重跑后通过':>10} {'平均耗时':>8}  {'策略':<13} 测试")
+    for row in rows[:top]:
+        print(
+            f"{row['flake_rate'] * 100:>7.1f}% {row['runs']:>5} {row['failed']:>5} {row['flaky']:>10} "
+            f"{row['avg_duration']:>7.1f}s  {row['policy']:<13} {row['nodeid']}"
+        )
+        if row["last_error"]:
+            print(f"{'':>45}最近错误: {row['last_error'][:100]}")
+
+
 if __name__ == "__main__":
     import argparse
     
@@ -80,13 +248,38 @@ if __name__ == "__main__":
     parser.add_argument("-f", "--file", help="测试文件路径")
     parser.add_argument("-p", "--parallel", action="store_true", help="并行运行测试")
     parser.add_argument("--no-html", action="store_true", help="不生成HTML报告")
+    parser.add_argument("-s", "--browser-server", action="store_true", help="并行时共享浏览器服务（配合 -p 使用）")
+    parser.add_argument("--schedule", choices=["duration", "default"],
+                        help="并行调度方式: duration 按历史耗时从长到短分配, default xdist 默认调度（配合 -p 使用）")
+    parser.add_argument("--compare-schedule", action="store_true",
+                        help="分别用默认调度和按耗时调度并行运行同一批测试，对比完成时间")
+    parser.add_argument("--flaky-report", action="store_true", help="输出测试不稳定率报告（不运行测试）")
+    parser.add_argument("--top", type=int, default=30, help="不稳定率报告最多显示的测试数量")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="测试影响分析：只运行受自该 git 引用以来的变更影响的测试")
+    parser.add_argument("--impact-record", action="store_true",
+                        help="记录每个测试调用到的 pages/、utils/ 模块和测试数据键，用于细化测试影响分析")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="不开启导航性能采集和页面操作耗时统计（PERF_METRICS、ACTION_TIMING）")
     
     args = parser.parse_args()
     
+    if args.flaky_report:
+        flaky_report(top=args.top)
+        sys.exit(0)
+    if args.compare_schedule:
+        compare_schedule(marker=args.marker, file=args.file, browser_server=args.browser_server)
+        sys.exit(0)
+    
     run_tests(
         marker=args.marker,
         file=args.file,
         parallel=args.parallel,
-        html_report=not args.no_html
+        html_report=not args.no_html,
+        browser_server=args.browser_server,
+        schedule=args.schedule,
+        changed_since=args.changed_since,
+        impact_record=args.impact_record,
+        metrics=not args.no_metrics
     )
 
@@ -0,0 +1,30 @@
+"""
+首页功能测试用例（异步版本，同一进程内并发执行）
+"""
+import pytest
+from loguru import logger
+from pages.async_index_page import AsyncIndexPage
+from config.settings import Settings
+
+
+@pytest.mark.ui
+@pytest.mark.smoke
+class TestIndexAsync:
+    """首页测试类（异步）"""
+    
+    async def test_navigate_directly(self, async_page):
+        """测试直接使用navigate方法打开首页"""
+        index_page = AsyncIndexPage(async_page)
+        await index_page.navigate()
+        
+        # 验证URL
+        assert Settings.BASE_URL in index_page.get_url()
+        logger.info("直接使用navigate方法打开首页成功")
+    
+    async def test_big_page_link_visible(self, async_page):
+        """测试 'Big page with many elements' 链接可见"""
+        index_page = AsyncIndexPage(async_page)
+        await index_page.openUrl()
+        
+        big_page_locator = index_page.get_big_page_link_locator()
+        assert await index_page.is_visible(big_page_locator), "链接应该可见"
@@ -0,0 +1,39 @@
+"""
+单元测试（不需要浏览器）
+覆盖根目录 conftest 中自动使用的 setup_test，单元测试不创建页面；
+被测模块登记的会话统计和日志与真实运行隔离，不进入终端摘要和 logs/
+"""
+import sys
+
+import pytest
+from loguru import logger
+
+from utils import session_stats as session_stats_module
+from utils.session_stats import SessionStats
+
+
+@pytest.fixture(autouse=True)
+def setup_test():
+    """单元测试无需浏览器前置处理"""
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_session_stats(monkeypatch):
+    """每个测试使用独立的会话统计：替换所有已导入模块中的全局实例"""
+    stats = SessionStats()
+    shared = session_stats_module.session_stats
+    for module in list(sys.modules.values()):
+        if vars(module).get("session_stats") is shared:
+            monkeypatch.setattr(module, "session_stats", stats)
+    return stats
+
+
+@pytest.fixture(autouse=True)
+def silence_logs():
+    """关闭被测模块的日志（不写入 logs/）"""
+    for name in ("utils", "pages"):
+        logger.disable(name)
+    yield
+    for name in ("utils", "pages"):
+        logger.enable(name)
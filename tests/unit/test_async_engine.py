@@ -0,0 +1,69 @@
+"""
+异步执行引擎：用例超时和失败截图
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from utils import async_engine
+
+pytest_plugins = ["pytester"]
+
+
+def _items(pytester, source, *args):
+    pytester.makeini("[pytest]\ntimeout = 300\n")
+    items, _ = pytester.inline_genitems(pytester.makepyfile(source), *args)
+    return {item.name: item for item in items}
+
+
+def test_item_timeout(pytester):
+    items = _items(pytester, """
+        import pytest
+
+        async def test_default():
+            pass
+
+        @pytest.mark.timeout(5)
+        async def test_marked():
+            pass
+
+        @pytest.mark.timeout(0)
+        async def test_disabled():
+            pass
+    """, "-p", "no:cacheprovider")
+
+    assert async_engine.item_timeout(items["test_default"]) == 300
+    assert async_engine.item_timeout(items["test_marked"]) == 5
+    assert async_engine.item_timeout(items["test_disabled"]) is None
+
+
+class FakePage:
+    async def screenshot(self, **options):
+        return b"png"
+
+
+class FakeEngine:
+    @asynccontextmanager
+    async def test_resources(self):
+        yield {"async_page": FakePage()}
+
+
+def test_hung_item_times_out_with_screenshot(pytester):
+    items = _items(pytester, """
+        import asyncio
+        import pytest
+
+        @pytest.mark.timeout(0.1)
+        async def test_hung(async_page):
+            await asyncio.sleep(30)
+    """, "-p", "no:cacheprovider")
+
+    async def _run():
+        return await async_engine._run_item(FakeEngine(), items["test_hung"], asyncio.Semaphore(1))
+
+    outcome = asyncio.run(_run())
+    assert isinstance(outcome.error, pytest.fail.Exception)
+    assert "超时" in str(outcome.error)
+    assert outcome.screenshot == b"png"
+    assert outcome.stop - outcome.start < 5
@@ -0,0 +1,51 @@
+"""
+流式数据集的 CSV 行偏移索引：结果必须与 csv.DictReader 一致
+"""
+import csv
+
+import pytest
+
+from utils.datasets import Dataset
+
+
+def _dict_rows(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize("content", [
+    pytest.param('name,desc\nTV,15" screen\nPhone,"multi\nline"\nLaptop,ok\n', id="stray-quote"),
+    pytest.param('name,desc\nPhone,"multi\nline\n\nwith blank"\nTV,"say ""hi"""\n', id="quoted-newlines"),
+    pytest.param('﻿name,desc\nTV,ok\nPhone,fine\n', id="bom"),
+    pytest.param('name,desc\n\nTV,ok\n\n\nPhone,fine', id="blank-lines-no-trailing-newline"),
+    pytest.param('name,desc\r\nTV,"a\r\nb"\r\nPhone,\r\n', id="crlf"),
+    pytest.param('name,desc\nTV\nPhone,ok,extra\n', id="ragged"),
+])
+def test_csv_rows_match_dict_reader(tmp_path, content):
+    path = tmp_path / "data.csv"
+    path.write_bytes(content.encode("utf-8"))
+    expected = _dict_rows(path)
+
+    dataset = Dataset(path, id_field="name", cache_dir=tmp_path / "cache")
+    assert len(dataset) == len(expected)
+    assert [dataset.row(i) for i in range(len(dataset))] == expected
+    assert dataset.ids() == [row["name"] for row in expected]
+    assert len(dataset.params()) == len(dataset.ids())
+
+
+def test_csv_index_cache_reused(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text('name,desc\nTV,15" screen\nPhone,"multi\nline"\n', encoding="utf-8")
+    Dataset(path, id_field="name", cache_dir=tmp_path / "cache").ids()
+
+    cached = Dataset(path, id_field="name", cache_dir=tmp_path / "cache")
+    assert cached.ids() == ["TV", "Phone"]
+    assert cached.row(1) == {"name": "Phone", "desc": "multi\nline"}
+
+
+def test_csv_header_only(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("name,desc\n", encoding="utf-8")
+    dataset = Dataset(path, cache_dir=tmp_path / "cache")
+    assert len(dataset) == 0
+    assert dataset.params() == []
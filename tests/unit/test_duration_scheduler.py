@@ -0,0 +1,64 @@
+"""
+按耗时调度：工作单元的构造（昂贵 fixture 分组切块）
+"""
+import json
+
+import pytest
+
+from utils.duration_scheduler import DurationStore, build_work_units
+
+
+@pytest.fixture
+def store(tmp_path):
+    def _store(entries):
+        path = tmp_path / "test_durations.json"
+        path.write_text(json.dumps(entries), encoding="utf-8")
+        return DurationStore(path)
+    return _store
+
+
+def _simulate(units, workers):
+    """LPT：单元依次分给当前负载最小的 worker，返回完成时间"""
+    loads = [0.0] * workers
+    for duration in units:
+        loads[loads.index(min(loads))] += duration
+    return max(loads)
+
+
+def test_large_group_split_across_workers(store):
+    entries = {f"tests/test_admin.py::test_{i}": {"duration": 1.0, "group": "auth:admin"} for i in range(100)}
+    entries.update({f"tests/test_public.py::test_{i}": {"duration": 1.0, "group": None} for i in range(20)})
+    collection = list(entries)
+    durations = store(entries)
+
+    units = build_work_units(collection, durations, workers=4)
+
+    # 每块不超过平均负载（120 / 4）
+    group_units = {name: work for name, work in units.items() if name.startswith("group:auth:admin")}
+    assert len(group_units) == 4
+    assert all(len(work) <= 30 for work in group_units.values())
+    assert sorted(nodeid for work in group_units.values() for nodeid in work) == sorted(collection[:100])
+    assert _simulate([len(work) * 1.0 for work in units.values()], 4) == 30.0
+
+
+def test_small_group_kept_together(store):
+    entries = {
+        "tests/test_a.py::test_slow": {"duration": 10.0, "group": None},
+        "tests/test_b.py::test_1": {"duration": 2.0, "group": "har:shop"},
+        "tests/test_b.py::test_2": {"duration": 2.0, "group": "har:shop"},
+        "tests/test_c.py::test_1": {"duration": 3.0, "group": None},
+    }
+
+    units = build_work_units(list(entries), store(entries), workers=2)
+
+    assert list(units) == ["tests/test_a.py::test_slow", "group:har:shop#0", "tests/test_c.py::test_1"]
+    assert units["group:har:shop#0"] == {"tests/test_b.py::test_1": False, "tests/test_b.py::test_2": False}
+
+
+def test_unknown_tests_use_default_estimate(store):
+    entries = {"tests/test_a.py::test_known": {"duration": 4.0, "group": None}}
+    collection = ["tests/test_a.py::test_new", "tests/test_a.py::test_known"]
+
+    units = build_work_units(collection, store(entries), workers=2)
+
+    assert sorted(units) == sorted(collection)
@@ -0,0 +1,57 @@
+"""
+测试结果历史：最近 window 次运行的统计和旧记录清理
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from utils.flaky_history import FlakyHistory
+
+
+def _report(nodeid, outcome, rerun=0):
+    longrepr = "E   AssertionError: boom" if outcome in ("failed", "rerun") else ""
+    return SimpleNamespace(nodeid=nodeid, when="call", outcome=outcome, rerun=rerun,
+                           duration=1.0, longreprtext=longrepr)
+
+
+@pytest.fixture
+def record_runs(tmp_path):
+    db_path = tmp_path / "history.sqlite3"
+
+    def _record(outcomes, nodeid="tests/test_a.py::test_a", window=3):
+        for outcome in outcomes:
+            history = FlakyHistory(db_path, window=window, min_runs=2)
+            if outcome == "flaky":
+                history.record(_report(nodeid, "rerun"))
+                history.record(_report(nodeid, "passed", rerun=1))
+            else:
+                history.record(_report(nodeid, outcome))
+            history.close()
+        return FlakyHistory(db_path, window=window, min_runs=2)
+
+    return _record
+
+
+def test_window_applied_per_test(record_runs):
+    history = record_runs(["flaky", "passed", "passed", "passed"], window=5)
+    history.window = 3
+    summary = history.summarize(history._runs()["tests/test_a.py::test_a"])
+    assert summary["runs"] == 3
+    assert summary["policy"] == FlakyHistory.STABLE
+    history.close()
+
+
+def test_old_runs_pruned_on_close(record_runs):
+    history = record_runs(["failed", "flaky", "passed", "passed", "failed"])
+    rows = history._conn.execute("SELECT run_id, outcome FROM results ORDER BY created").fetchall()
+    assert [outcome for _, outcome in rows] == ["passed", "passed", "failed"]
+    assert len({run_id for run_id, _ in rows}) == 3
+    history.close()
+
+
+def test_rerun_rows_kept_with_their_run(record_runs):
+    history = record_runs(["passed", "passed", "flaky"], window=1)
+    runs = history._runs()["tests/test_a.py::test_a"]
+    assert len(runs) == 1 and runs[0]["reruns"] == 1
+    assert history.summarize(runs)["policy"] == FlakyHistory.FLAKY
+    history.close()
@@ -0,0 +1,63 @@
+"""
+HAR 共享存档分片合并和回放未命中统计
+"""
+import json
+import os
+import zipfile
+
+from utils.har_manager import HarSession, merge_archives
+
+
+def _entry(url, status, method="GET"):
+    return {"request": {"method": method, "url": url}, "response": {"status": status}}
+
+
+def _archive(path, entries, files, mtime):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("har.har", json.dumps({"log": {"version": "1.2", "entries": entries}}))
+        for name in files:
+            archive.writestr(name, name.encode())
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_merge_archives_later_parts_win(tmp_path):
+    _archive(tmp_path / "a.har.zip", [_entry("https://x/1", 200), _entry("https://x/2", 200)], ["a.js"], 1_000)
+    _archive(tmp_path / "b.har.zip", [_entry("https://x/2", 404), _entry("https://x/3", 200)], ["b.js"], 2_000)
+
+    output = tmp_path / "shared.har.zip"
+    count = merge_archives([tmp_path / "b.har.zip", tmp_path / "a.har.zip"], output)
+
+    with zipfile.ZipFile(output) as archive:
+        entries = json.loads(archive.read("har.har"))["log"]["entries"]
+        assert sorted(archive.namelist()) == ["a.js", "b.js", "har.har"]
+    assert count == 3
+    assert {entry["request"]["url"]: entry["response"]["status"] for entry in entries} == {
+        "https://x/1": 200, "https://x/2": 404, "https://x/3": 200,
+    }
+
+
+def test_merge_archives_skips_unreadable_part(tmp_path):
+    _archive(tmp_path / "a.har.zip", [_entry("https://x/1", 200)], [], 1_000)
+    (tmp_path / "broken.har.zip").write_bytes(b"not a zip")
+    assert merge_archives([tmp_path / "a.har.zip", tmp_path / "broken.har.zip"], tmp_path / "out.har.zip") == 1
+
+
+class _Route:
+    def __init__(self, url):
+        self.request = type("Request", (), {"url": url})()
+        self.calls = []
+
+    def fallback(self):
+        self.calls.append("fallback")
+
+    def abort(self):
+        self.calls.append("abort")
+
+
+def test_unmatched_requests_follow_policy(tmp_path):
+    for policy, expected in (("abort", "abort"), ("error", "abort"), ("fallback", "fallback")):
+        session = HarSession("replay", tmp_path / "x.har.zip", policy)
+        route = _Route("https://x/missing")
+        session.on_unmatched(route)
+        assert session.unmatched == ["https://x/missing"]
+        assert route.calls == [expected]
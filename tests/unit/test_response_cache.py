@@ -0,0 +1,68 @@
+"""
+磁盘响应缓存：有效期计算、过期和 last_access 批量写入
+"""
+import time
+from email.utils import formatdate
+
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache, freshness_lifetime
+
+NOW = 1_700_000_000.0
+MAX_TTL = 86400
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"cache-control": "public, max-age=600"}, 600),
+    ({"cache-control": "max-age=600, s-maxage=60"}, 60),
+    ({"cache-control": "max-age=600", "age": "100"}, 500),
+    ({"cache-control": "max-age=999999"}, MAX_TTL),
+    ({"cache-control": "max-age=0"}, 0),
+    ({"cache-control": "no-cache, max-age=600"}, 0),
+    ({"cache-control": "private, max-age=600"}, 0),
+    ({"cache-control": "no-store"}, 0),
+    ({"cache-control": "max-age=600", "set-cookie": "a=1"}, 0),
+    ({"date": formatdate(NOW, usegmt=True), "expires": formatdate(NOW + 300, usegmt=True)}, 300),
+    ({"expires": "0"}, 0),
+    ({"date": formatdate(NOW, usegmt=True), "last-modified": formatdate(NOW - 1000, usegmt=True)}, 100),
+    ({}, 0),
+])
+def test_freshness_lifetime(headers, expected):
+    assert freshness_lifetime(headers, NOW, MAX_TTL) == pytest.approx(expected)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=1 << 20, ttl=MAX_TTL)
+    yield cache
+    cache.close()
+
+
+def test_uncacheable_response_not_stored(cache):
+    cache.put("https://example.com/a.js", {}, 200, {"Cache-Control": "no-cache"}, b"a")
+    assert cache.get("https://example.com/a.js", {}) is None
+
+
+def test_expired_entry_not_served(cache):
+    cache.put("https://example.com/a.js", {}, 200, {}, b"a", lifetime=0.05)
+    assert cache.get("https://example.com/a.js", {})[2] == b"a"
+    time.sleep(0.1)
+    assert cache.get("https://example.com/a.js", {}) is None
+
+
+def test_last_access_written_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, "_ACCESS_FLUSH_SIZE", 3)
+    for name in "abc":
+        cache.put(f"https://example.com/{name}.js", {}, 200, {"cache-control": "max-age=60"}, b"x")
+
+    def last_access():
+        return dict(cache._conn.execute("SELECT url, last_access FROM entries").fetchall())
+
+    before = last_access()
+    cache.get("https://example.com/a.js", {})
+    cache.get("https://example.com/b.js", {})
+    assert last_access() == before
+    cache.get("https://example.com/c.js", {})
+    after = last_access()
+    assert all(after[url] >= before[url] for url in before) and after != before
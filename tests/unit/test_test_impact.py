@@ -0,0 +1,139 @@
+"""
+测试影响分析：静态依赖和运行时记录的测试选择
+"""
+import importlib.util
+import textwrap
+
+import pytest
+
+from utils.test_impact import ImpactMap, RuntimeRecorder, file_signature
+
+FILES = {
+    "conftest.py": "from utils import fixtures_helper\nfrom utils import session_helper\nfrom config import settings\n",
+    "config/__init__.py": "",
+    "config/settings.py": "TIMEOUT = 1\n",
+    "utils/__init__.py": "",
+    "utils/fixtures_helper.py": "def helper():\n    return 1\n",
+    "utils/session_helper.py": "def start():\n    return 1\n",
+    "utils/standalone.py": "def util():\n    return 1\n",
+    "pages/__init__.py": "",
+    "pages/login_page.py": "from utils import standalone\n",
+    "pages/async_page.py": "",
+    "tests/__init__.py": "",
+    "tests/test_login.py": "from pages.login_page import LoginPage\n\ndef test_a():\n    pass\n\ndef test_b():\n    pass\n",
+    "tests/test_async.py": "from pages import async_page\n\nasync def test_async():\n    pass\n",
+    "tests/test_other.py": "def test_other():\n    pass\n",
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    for rel, content in FILES.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return tmp_path
+
+
+def _map(root, runtime=None, shared=()):
+    impact_map = ImpactMap(root, root / ".cache" / "impact_map.json")
+    impact_map.refresh()
+    if runtime is not None:
+        records = {}
+        for nodeid, record in runtime.items():
+            test_file = nodeid.split("::")[0]
+            records[nodeid] = dict(record, signature=file_signature(root / test_file))
+        impact_map.merge_runtime(records, shared)
+    return impact_map
+
+
+def _record(*modules, data_keys=()):
+    return {"modules": list(modules), "data_keys": list(data_keys)}
+
+
+RUNTIME = {
+    "tests/test_login.py::test_a": _record("utils/fixtures_helper.py", "pages/login_page.py", "utils/standalone.py"),
+    "tests/test_login.py::test_b": _record("pages/login_page.py", data_keys=["admin"]),
+    "tests/test_async.py::test_async": RuntimeRecorder.static_record(),
+}
+
+
+@pytest.mark.parametrize("changed", ["conftest.py", "pytest.ini"])
+def test_global_files_run_all(project, changed):
+    assert _map(project, RUNTIME).select([changed], {}) == (True, [])
+
+
+def test_fixture_module_without_runtime_runs_all(project):
+    assert _map(project).select(["utils/fixtures_helper.py"], {}) == (True, [])
+
+
+def test_fixture_module_narrowed_by_runtime(project):
+    run_all, targets = _map(project, RUNTIME).select(["utils/fixtures_helper.py"], {})
+    assert not run_all
+    # 调用了该模块的测试、无法记录的 async 用例、没有运行时记录的测试文件
+    assert targets == ["tests/test_async.py::test_async", "tests/test_login.py::test_a", "tests/test_other.py"]
+
+
+def test_shared_and_config_modules_run_all(project):
+    impact_map = _map(project, RUNTIME, shared=["utils/session_helper.py"])
+    assert impact_map.select(["utils/session_helper.py"], {}) == (True, [])
+    assert impact_map.select(["config/settings.py"], {}) == (True, [])
+
+
+def test_static_import_narrowed_by_runtime(project):
+    run_all, targets = _map(project, RUNTIME).select(["utils/standalone.py"], {})
+    assert not run_all
+    assert targets == ["tests/test_login.py::test_a"]
+
+
+def test_async_items_fall_back_to_static_analysis(project):
+    run_all, targets = _map(project, RUNTIME).select(["pages/async_page.py"], {})
+    assert not run_all
+    assert targets == ["tests/test_async.py::test_async"]
+
+
+def test_changed_data_keys(project):
+    impact_map = _map(project, RUNTIME)
+    assert impact_map.select([], {"data/test_data.yaml": {"admin"}}) == (False, ["tests/test_login.py::test_b"])
+    assert impact_map.select([], {"data/test_data.yaml": {"test_a"}}) == (False, ["tests/test_login.py::test_a"])
+
+
+def test_changed_test_file_selected_whole(project):
+    assert _map(project, RUNTIME).select(["tests/test_other.py"], {}) == (False, ["tests/test_other.py"])
+
+
+def test_stale_records_ignored(project):
+    impact_map = _map(project, RUNTIME)
+    (project / "tests/test_login.py").write_text(FILES["tests/test_login.py"] + "\n# changed\n", encoding="utf-8")
+    impact_map.refresh()
+    run_all, targets = impact_map.select(["utils/standalone.py"], {})
+    assert targets == ["tests/test_login.py"]
+
+
+def test_recorder_separates_shared_modules(tmp_path):
+    module_file = tmp_path / "utils" / "recorded.py"
+    module_file.parent.mkdir()
+    module_file.write_text(textwrap.dedent("""
+        def session_setup():
+            return 1
+
+        def in_test():
+            return 2
+    """), encoding="utf-8")
+    spec = importlib.util.spec_from_file_location("recorded_for_impact", module_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    recorder = RuntimeRecorder(tmp_path)
+    recorder.start()
+    try:
+        with recorder.shared_scope():
+            module.session_setup()
+        first = recorder.stop()
+        recorder.start()
+        module.in_test()
+    finally:
+        second = recorder.stop()
+    assert first["modules"] == []
+    assert recorder.shared == {"utils/recorded.py"}
+    assert second["modules"] == ["utils/recorded.py"]
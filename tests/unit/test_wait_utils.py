@@ -0,0 +1,119 @@
+"""
+等待工具：节省时间估算、步骤重试和网络静默超时
+"""
+import time
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils import step_retry, wait_utils
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    monkeypatch.setattr(wait_utils, "_stats", {})
+    return wait_utils._stats
+
+
+@pytest.mark.parametrize("kwargs, estimate", [
+    ({"checks": 1}, 3.0),
+    ({"first_check": True}, 3.0),
+    ({"checks": 2}, 500.0),
+    ({}, 500.0),
+])
+def test_first_check_not_credited(kwargs, estimate):
+    wait_utils._record_wait("python", 3.0, True, **kwargs)
+    assert wait_utils._stats["python"]["polling_estimate_ms"] == estimate
+
+
+def test_later_check_rounded_to_polling_interval():
+    wait_utils._record_wait("mutation", 620.0, True)
+    wait_utils._record_wait("mutation", 700.0, False)
+    entry = wait_utils._stats["mutation"]
+    assert entry["polling_estimate_ms"] == 1000.0 + 700.0
+    assert entry["timeouts"] == 1
+
+
+class FakePage:
+    def __init__(self):
+        self.waited = []
+
+    def wait_for_timeout(self, timeout):
+        self.waited.append(timeout)
+
+
+def test_python_condition_satisfied_immediately(monkeypatch):
+    monkeypatch.setattr(wait_utils.network_quiet, "track", lambda page: None)
+    page = FakePage()
+    assert wait_utils.WaitUtils(page).wait_for_condition(lambda: True)
+    entry = wait_utils._stats["python"]
+    assert page.waited == []
+    assert entry["polling_estimate_ms"] == entry["elapsed_ms"]
+
+
+class FlakyLocator:
+    def __init__(self):
+        self.calls = 0
+
+    def wait_for(self, state, timeout):
+        self.calls += 1
+        if self.calls == 1:
+            raise PlaywrightError("Execution context was destroyed, most likely because of a navigation")
+
+
+class LocatorPage(FakePage):
+    def __init__(self):
+        super().__init__()
+        self.target = FlakyLocator()
+
+    def locator(self, selector):
+        return self.target
+
+
+@pytest.fixture
+def locator_page(monkeypatch):
+    monkeypatch.setattr(wait_utils.network_quiet, "track", lambda page: None)
+    monkeypatch.setattr(step_retry, "_current", step_retry.RetryBudget("test", backoff_ms=0))
+    return LocatorPage()
+
+
+def test_wait_for_element_retries_navigation_errors(locator_page):
+    wait_utils.WaitUtils(locator_page).wait_for_element("#a")
+    assert locator_page.target.calls == 2
+
+
+def test_wait_for_element_without_retry_raises(locator_page):
+    with pytest.raises(PlaywrightError):
+        wait_utils.WaitUtils(locator_page).wait_for_element("#a", retry=False)
+    assert locator_page.target.calls == 1
+
+
+class NetworkPage(FakePage):
+    def on(self, event, handler):
+        pass
+
+    def wait_for_timeout(self, timeout):
+        super().wait_for_timeout(timeout)
+        time.sleep(timeout / 1000)
+
+
+class PendingRequest:
+    url = "https://example.com/api/slow"
+    resource_type = "fetch"
+
+
+@pytest.fixture
+def busy_page():
+    page = NetworkPage()
+    wait_utils.network_quiet.track(page)._on_request(PendingRequest())
+    return page
+
+
+def test_network_quiet_timeout_raises(busy_page):
+    with pytest.raises(PlaywrightTimeoutError, match="等待网络静默超时"):
+        wait_utils.WaitUtils(busy_page).wait_for_network_quiet(quiet_ms=10, timeout=50)
+
+
+def test_network_quiet_timeout_without_raise(busy_page):
+    assert wait_utils.WaitUtils(busy_page).wait_for_network_quiet(quiet_ms=10, timeout=50, raise_on_timeout=False) is False
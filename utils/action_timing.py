@@ -0,0 +1,220 @@
+"""
+页面操作耗时统计工具
+BasePage 的每个操作（点击、填充、读取文本等）分为等待阶段（等待元素可见）和执行阶段计时，
+按 "页面对象.方法" 累计到 HDR 风格的直方图（对数分段、固定相对精度，可按桶累加合并），
+每个进程（xdist worker）各自累计，会话结束时登记到会话统计，由 controller 合并后输出 p50/p95/p99。
+未启用时操作使用共享的空计时器，只多一次属性访问和空的 with 块。
+"""
+import re
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.session_stats import session_stats
+
+# 每个 2 的幂区间分为 2^7 = 128 个桶，相对误差不超过 1/64
+_SUB_BUCKET_BITS = 7
+PHASES = ("total", "wait", "action")
+PERCENTILES = (50, 95, 99)
+
+_SELECTOR_PATTERN = re.compile(r"selector='(.*)'>$")
+
+
+def bucket(value_us: int) -> int:
+    """数值（微秒）所在桶的下界"""
+    shift = max(0, value_us.bit_length() - _SUB_BUCKET_BITS)
+    return (value_us >> shift) << shift
+
+
+def bucket_upper(lower: int) -> int:
+    """桶的上界（百分位取桶上界，结果偏保守）"""
+    shift = max(0, lower.bit_length() - _SUB_BUCKET_BITS)
+    return lower + (1 << shift) - 1
+
+
+def percentiles(histogram: Dict[str, int], quantiles=PERCENTILES) -> List[Optional[float]]:
+    """
+    计算直方图的百分位
+
+    Args:
+        histogram: {桶下界（微秒，字符串）: 次数}
+        quantiles: 百分位列表
+
+    Returns:
+        百分位值（毫秒），空直方图返回 None
+    """
+    buckets = sorted((int(lower), count) for lower, count in histogram.items())
+    total = sum(count for _, count in buckets)
+    if not total:
+        return [None for _ in quantiles]
+    results = []
+    for quantile in quantiles:
+        threshold = total * quantile / 100
+        seen = 0
+        for lower, count in buckets:
+            seen += count
+            if seen >= threshold:
+                results.append(bucket_upper(lower) / 1000)
+                break
+    return results
+
+
+def describe(target: Any) -> str:
+    """操作对象的简短描述：字符串选择器原样返回，Locator 取其选择器"""
+    if isinstance(target, str):
+        return target
+    text = repr(target)
+    match = _SELECTOR_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+class _Recorder:
+    """进程内的直方图累计器"""
+
+    def __init__(self):
+        self.actions: Dict[str, Dict[str, Any]] = {}
+        self.locators: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, target: str, durations: Dict[str, float], error: bool):
+        entry = self.actions.get(name)
+        if entry is None:
+            entry = self.actions[name] = {"count": 0, "errors": 0, **{phase: {} for phase in PHASES}}
+        entry["count"] += 1
+        if error:
+            entry["errors"] += 1
+        for phase, seconds in durations.items():
+            key = str(bucket(max(1, int(seconds * 1_000_000))))
+            histogram = entry[phase]
+            histogram[key] = histogram.get(key, 0) + 1
+        total_ms = durations["total"] * 1000
+        locator = self.locators.get(f"{name} {target}")
+        if locator is None:
+            locator = self.locators[f"{name} {target}"] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        locator["count"] += 1
+        locator["total_ms"] += total_ms
+        locator["max_ms"] = max(locator["max_ms"], total_ms)
+
+
+_recorder = _Recorder()
+
+
+class ActionTimer:
+    """单个操作的计时器：with 块为总耗时，phase() 累计等待和执行阶段（步骤重试时多次累加）"""
+
+    __slots__ = ("name", "target", "_start", "_phases")
+
+    def __init__(self, page_object: str, method: str, target: Any):
+        self.name = f"{page_object}.{method}"
+        self.target = target
+        self._start = 0.0
+        self._phases: Dict[str, float] = {}
+
+    def __enter__(self) -> "ActionTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        durations = dict(self._phases, total=time.perf_counter() - self._start)
+        _recorder.add(self.name, describe(self.target) if self.target is not None else "", durations,
+                      exc_type is not None)
+        return False
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "_start")
+
+    def __init__(self, timer: ActionTimer, name: str):
+        self.timer = timer
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        phases = self.timer._phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self._start
+        return False
+
+
+class _NullTimer:
+    """未启用时的空计时器（所有操作共享一个实例）"""
+
+    __slots__ = ()
+    _null_phase = nullcontext()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def phase(self, name: str):
+        return self._null_phase
+
+
+NULL_TIMER = _NullTimer()
+
+
+def flush():
+    """把本进程累计的直方图登记到会话统计（可重复调用，已登记的数据不会重复计入）"""
+    global _recorder
+    if not _recorder.actions:
+        return
+    recorder, _recorder = _recorder, _Recorder()
+    session_stats.record("action_timing", {"actions": recorder.actions, "locators": recorder.locators})
+
+
+def summary_rows(stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    按操作汇总百分位（用于终端摘要和 JSON 报告）
+
+    Returns:
+        [{"action", "count", "errors", "total": {"p50", "p95", "p99"}, "wait": {...}, "action_phase": {...}}]
+    """
+    rows = []
+    for name, entry in stats.get("actions", {}).items():
+        row = {"action": name, "count": entry.get("count", 0), "errors": entry.get("errors", 0)}
+        for phase in PHASES:
+            values = percentiles(entry.get(phase, {}))
+            row["action_phase" if phase == "action" else phase] = {
+                f"p{quantile}": value for quantile, value in zip(PERCENTILES, values)
+            }
+        rows.append(row)
+    # 按 p95 总耗时降序
+    return sorted(rows, key=lambda row: row["total"]["p95"] or 0, reverse=True)
+
+
+def slowest_locators(stats: Dict[str, Any], top: int = 5) -> List[Tuple[str, Dict[str, float]]]:
+    """累计耗时最多的操作对象"""
+    locators = stats.get("locators", {})
+    return sorted(locators.items(), key=lambda item: item[1].get("total_ms", 0), reverse=True)[:top]
+
+
+def _format_action_timing(stats: Dict[str, Any]) -> List[str]:
+    """操作耗时终端摘要（毫秒，每个阶段依次为 p50 p95 p99）"""
+
+    def _cells(values: Dict[str, Optional[float]]) -> str:
+        return " ".join(f"{value:>7.1f}" if value is not None else f"{'-':>7}" for value in values.values())
+
+    lines = [f"{'action':<40} {'count':>6} {'errors':>6} | {'total p50/p95/p99':^23} | "
+             f"{'wait p50/p95/p99':^23} | {'action p50/p95/p99':^23}"]
+    for row in summary_rows(stats):
+        lines.append(
+            f"{row['action']:<40} {row['count']:>6} {row['errors']:>6} | {_cells(row['total'])} | "
+            f"{_cells(row['wait'])} | {_cells(row['action_phase'])}"
+        )
+    slowest = slowest_locators(stats)
+    if slowest:
+        lines.append("累计耗时最多的操作对象:")
+        lines.extend(
+            f"  {name}: {entry['count']} 次, 累计 {entry['total_ms']:.0f}ms, 最长 {entry['max_ms']:.0f}ms"
+            for name, entry in slowest
+        )
+    return lines
+
+
+session_stats.register_formatter("action_timing", _format_action_timing)
@@ -0,0 +1,181 @@
+"""
+测试产物后台写入工具
+测试线程只负责快速获取原始数据（截图字节、临时 Trace 文件、失败日志文本），
+缩放、编码和写盘交给有界后台线程池处理；队列满时阻塞提交方（背压），
+会话结束时等待全部写入完成并生成产物索引。
+"""
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+from utils.session_stats import session_stats
+
+
+class ArtifactWriter:
+    """测试产物后台写入器"""
+
+    def __init__(
+        self,
+        index_file: Path,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        screenshot_max_width: int = 0,
+        jpeg_quality: int = 80,
+    ):
+        """
+        Args:
+            index_file: 产物索引文件路径
+            max_workers: 后台写入线程数
+            max_pending: 最大排队任务数，超过时提交方等待
+            screenshot_max_width: 截图最大宽度（像素），超过时等比缩小，0 表示不缩放（需安装 Pillow）
+            jpeg_quality: 保存为 JPEG 时的质量
+        """
+        self.index_file = Path(index_file)
+        self.screenshot_max_width = screenshot_max_width
+        self.jpeg_quality = jpeg_quality
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: List[Future] = []
+        self._index: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.stats = {
+            "artifacts": 0,
+            "failed": 0,
+            "bytes_written": 0,
+            "write_ms": 0.0,
+            "backpressure_wait_ms": 0.0,
+        }
+
+    def _submit(self, nodeid: str, kind: str, path: Path, task: Callable[[], int]) -> Path:
+        """提交后台任务；排队任务已满时阻塞等待"""
+        start = time.perf_counter()
+        self._slots.acquire()
+        self.stats["backpressure_wait_ms"] += (time.perf_counter() - start) * 1000
+
+        def _run():
+            task_start = time.perf_counter()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                size = task()
+                elapsed = (time.perf_counter() - task_start) * 1000
+                with self._lock:
+                    self.stats["artifacts"] += 1
+                    self.stats["bytes_written"] += size
+                    self.stats["write_ms"] += elapsed
+                    self._index.append({
+                        "nodeid": nodeid,
+                        "kind": kind,
+                        "path": str(path),
+                        "bytes": size,
+                        "write_ms": round(elapsed, 1),
+                    })
+            except Exception as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                logger.error(f"写入测试产物失败: {path}, 错误: {e}")
+            finally:
+                self._slots.release()
+
+        self._futures.append(self._executor.submit(_run))
+        return path
+
+    def _encode_screenshot(self, data: bytes, path: Path) -> int:
+        """按需缩放截图后写盘，返回写入的字节数（缩放需安装 Pillow，未安装时原样写入）"""
+        if self.screenshot_max_width:
+            try:
+                from PIL import Image
+            except ImportError:
+                Image = None
+            if Image is not None:
+                image = Image.open(io.BytesIO(data))
+                if image.width > self.screenshot_max_width:
+                    height = int(image.height * self.screenshot_max_width / image.width)
+                    image = image.resize((self.screenshot_max_width, height))
+                    buffer = io.BytesIO()
+                    if path.suffix.lower() in (".jpg", ".jpeg"):
+                        image.convert("RGB").save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+                    else:
+                        image.save(buffer, format="PNG", optimize=True)
+                    data = buffer.getvalue()
+        path.write_bytes(data)
+        return len(data)
+
+    def submit_screenshot(self, nodeid: str, data: bytes, path: Path) -> Path:
+        """
+        提交截图
+
+        Args:
+            nodeid: 测试 nodeid
+            data: 截图原始字节（page.screenshot() 的返回值）
+            path: 保存路径（.png / .jpg）
+
+        Returns:
+            保存路径
+        """
+        return self._submit(nodeid, "screenshot", Path(path), lambda: self._encode_screenshot(data, Path(path)))
+
+    def submit_file(self, nodeid: str, kind: str, src: Path, path: Path) -> Path:
+        """
+        提交已生成的临时文件（如 Trace），后台移动到目标路径
+
+        Args:
+            nodeid: 测试 nodeid
+            kind: 产物类型（trace、video 等）
+            src: 临时文件路径
+            path: 目标路径
+
+        Returns:
+            目标路径
+        """
+        def _move() -> int:
+            shutil.move(str(src), str(path))
+            return os.path.getsize(path)
+
+        return self._submit(nodeid, kind, Path(path), _move)
+
+    def submit_text(self, nodeid: str, kind: str, text: str, path: Path) -> Path:
+        """提交文本产物（如失败日志）"""
+        def _write() -> int:
+            data = text.encode("utf-8")
+            Path(path).write_bytes(data)
+            return len(data)
+
+        return self._submit(nodeid, kind, Path(path), _write)
+
+    def flush(self):
+        """等待已提交的任务全部完成"""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """等待写入完成、生成索引并登记会话统计"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        if self._index:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False, indent=2)
+            logger.info(f"测试产物索引已生成: {self.index_file}")
+        session_stats.record("artifacts", self.stats)
+
+
+def _format_artifact_stats(stats: Dict[str, Any]) -> List[str]:
+    """测试产物终端摘要"""
+    count = stats.get("artifacts", 0)
+    avg_write = stats.get("write_ms", 0) / count if count else 0
+    return [
+        f"产物: {count}, 失败: {stats.get('failed', 0)}, 大小: {stats.get('bytes_written', 0) / 1024 / 1024:.2f}MB, "
+        f"后台平均写入耗时: {avg_write:.0f}ms, 背压等待合计: {stats.get('backpressure_wait_ms', 0):.0f}ms",
+    ]
+
+
+session_stats.register_formatter("artifacts", _format_artifact_stats)
@@ -0,0 +1,311 @@
+"""
+异步执行引擎
+基于 playwright.async_api，在后台线程运行事件循环并共享一个浏览器实例，
+同一进程内可以在 K 个独立上下文中并发执行 K 个 async 测试用例。
+并发执行的用例在 pytest 的 runtest 流程之外运行（pytest-timeout 不生效），
+每个用例按其 timeout 设置（标记、--timeout 或 ini）单独超时；失败截图只在执行时获取字节，
+回放结果时由 setup_test 交给 ArtifactWriter 写入 SCREENSHOTS_DIR。
+"""
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import pytest
+from loguru import logger
+
+from config.settings import Settings
+
+if TYPE_CHECKING:
+    # playwright.async_api 导入较慢，只在启动引擎时导入（没有 async 用例的运行不需要）
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+def is_async_item(item) -> bool:
+    """是否为 async def 定义的测试用例"""
+    return isinstance(item, pytest.Function) and inspect.iscoroutinefunction(item.obj)
+
+
+class AsyncEngine:
+    """异步执行引擎 - 每个进程一个"""
+
+    # async 测试可以直接使用的参数名
+    RESOURCE_NAMES = ("async_browser", "async_context", "async_page")
+
+    def __init__(
+        self,
+        browser_type: str = "chromium",
+        launch_options: Optional[Dict[str, Any]] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        permissions: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            browser_type: 浏览器类型 (chromium, firefox, webkit)
+            launch_options: 浏览器启动参数
+            context_options: 创建上下文的参数
+            permissions: 授予的权限
+        """
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+        self.permissions = permissions or []
+        self.browser: Optional["Browser"] = None
+        self._playwright = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-engine", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """提交协程到引擎事件循环，返回 Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """在引擎事件循环中执行协程并等待结果"""
+        return self.submit(coro).result(timeout)
+
+    def start(self) -> "AsyncEngine":
+        """启动 Playwright 和浏览器"""
+        if self.browser is None:
+            self.run(self._start())
+        return self
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+        self._playwright = await async_playwright().start()
+        launcher = getattr(self._playwright, self.browser_type, None)
+        if launcher is None:
+            raise ValueError(f"不支持的浏览器类型: {self.browser_type}")
+        logger.info(f"异步引擎启动浏览器: {self.browser_type}, 参数: {self.launch_options}")
+        self.browser = await launcher.launch(**self.launch_options)
+
+    async def new_context(self) -> "BrowserContext":
+        """创建新的浏览器上下文"""
+        context = await self.browser.new_context(**self.context_options)
+        if self.permissions:
+            await context.grant_permissions(self.permissions)
+        return context
+
+    @staticmethod
+    async def new_page(context: "BrowserContext") -> "Page":
+        """创建页面并设置默认超时"""
+        page = await context.new_page()
+        page.set_default_timeout(30000)
+        page.set_default_navigation_timeout(30000)
+        return page
+
+    @asynccontextmanager
+    async def test_resources(self):
+        """为单个测试创建独立的上下文和页面，结束后关闭"""
+        context = await self.new_context()
+        try:
+            page = await self.new_page(context)
+            yield {"async_browser": self.browser, "async_context": context, "async_page": page}
+        finally:
+            await context.close()
+
+    def close(self):
+        """关闭浏览器、Playwright 并停止事件循环"""
+        if self.browser is not None:
+            self.run(self._close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    async def _close(self):
+        await self.browser.close()
+        await self._playwright.stop()
+        self.browser = None
+        logger.info("异步引擎浏览器已关闭")
+
+
+class _ItemOutcome:
+    """并发执行的单个用例结果"""
+
+    def __init__(self, start: float, stop: float, error: Optional[BaseException] = None,
+                 screenshot: Optional[bytes] = None):
+        self.start = start
+        self.stop = stop
+        self.error = error
+        self.screenshot = screenshot
+
+
+# 并发执行完成、等待通过标准 runtest 流程上报的结果
+_outcome_key = pytest.StashKey[_ItemOutcome]()
+# 已回放的结果，用于修正报告中的执行耗时
+_replayed_key = pytest.StashKey[_ItemOutcome]()
+# 已回放结果的失败截图（setup_test 后置处理时提交写入）
+_screenshot_key = pytest.StashKey[bytes]()
+
+
+def ran_concurrently(item) -> bool:
+    """用例是否已在并发执行循环中执行完毕（等待回放结果）"""
+    return _outcome_key in item.stash
+
+
+def replay_outcome(item) -> bool:
+    """
+    在 pytest_pyfunc_call 中回放并发执行的结果（失败时重新抛出原异常）
+
+    Returns:
+        是否存在可回放的结果；不存在时（如失败重跑）应正常执行用例
+    """
+    outcome = item.stash.get(_outcome_key, None)
+    if outcome is None:
+        return False
+    del item.stash[_outcome_key]
+    item.stash[_replayed_key] = outcome
+    if outcome.screenshot is not None:
+        item.stash[_screenshot_key] = outcome.screenshot
+    if outcome.error is not None:
+        raise outcome.error
+    return True
+
+
+def replayed_duration(item) -> Optional[float]:
+    """已回放结果的实际执行耗时（秒）"""
+    outcome = item.stash.get(_replayed_key, None)
+    if outcome is None:
+        return None
+    del item.stash[_replayed_key]
+    return outcome.stop - outcome.start
+
+
+def replayed_screenshot(item) -> Optional[bytes]:
+    """已回放结果的失败截图字节（取出后移除）"""
+    data = item.stash.get(_screenshot_key, None)
+    if data is not None:
+        del item.stash[_screenshot_key]
+    return data
+
+
+def screenshot_options() -> Dict[str, Any]:
+    """失败截图参数（与同步 setup_test 一致）"""
+    options: Dict[str, Any] = {"full_page": True, "type": Settings.SCREENSHOT_TYPE}
+    if Settings.SCREENSHOT_TYPE == "jpeg":
+        options["quality"] = Settings.SCREENSHOT_QUALITY
+    return options
+
+
+def item_timeout(item) -> Optional[float]:
+    """
+    用例的超时时间（秒），与 pytest-timeout 的设置一致：timeout 标记、--timeout、ini 的 timeout
+
+    Returns:
+        超时时间，未设置或为 0 时返回 None
+    """
+    marker = item.get_closest_marker("timeout")
+    if marker is not None and (marker.args or "timeout" in marker.kwargs):
+        value = marker.args[0] if marker.args else marker.kwargs["timeout"]
+    else:
+        value = item.config.getoption("timeout", None)
+        if value is None:
+            try:
+                value = item.config.getini("timeout")
+            except ValueError:
+                value = None
+    try:
+        value = float(value) if value not in (None, "") else 0.0
+    except (TypeError, ValueError):
+        value = 0.0
+    return value if value > 0 else None
+
+
+async def _capture_screenshot(page: "Page") -> Optional[bytes]:
+    """获取失败截图字节（写盘由回放时的 ArtifactWriter 完成）"""
+    try:
+        return await page.screenshot(timeout=10000, **screenshot_options())
+    except Exception as e:
+        logger.warning(f"失败截图获取失败: {e}")
+        return None
+
+
+async def _run_item(engine: AsyncEngine, item, semaphore: asyncio.Semaphore) -> _ItemOutcome:
+    """在独立上下文中执行单个 async 用例（超过 item_timeout 时取消并记为失败）"""
+    # 每个用例在独立的任务中执行，日志上下文（nodeid）互不影响
+    with logger.contextualize(nodeid=item.nodeid):
+        async with semaphore:
+            start = time.time()
+            timeout = item_timeout(item)
+            screenshot = None
+            try:
+                async with engine.test_resources() as resources:
+                    params = getattr(item, "callspec", None)
+                    params = params.params if params else {}
+                    kwargs = {}
+                    for name in item._fixtureinfo.argnames:
+                        if name in params:
+                            kwargs[name] = params[name]
+                        elif name in resources:
+                            kwargs[name] = resources[name]
+                        else:
+                            raise pytest.UsageError(
+                                f"并发执行的 async 用例仅支持参数化参数和 {', '.join(AsyncEngine.RESOURCE_NAMES)}，"
+                                f"不支持 fixture: {name}"
+                            )
+                    try:
+                        try:
+                            await asyncio.wait_for(item.obj(**kwargs), timeout)
+                        except asyncio.TimeoutError:
+                            if timeout is None or time.time() - start < timeout:
+                                raise
+                            raise pytest.fail.Exception(f"async 用例执行超时: {timeout:g}s") from None
+                    except (Exception, pytest.fail.Exception):
+                        screenshot = await _capture_screenshot(resources["async_page"])
+                        raise
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                return _ItemOutcome(start, time.time(), e, screenshot)
+            return _ItemOutcome(start, time.time())
+
+
+def run_items_concurrently(session, items: List, engine: AsyncEngine, concurrency: int):
+    """
+    并发执行 async 用例，按完成顺序通过标准 runtest 流程上报结果
+    （报告、失败重跑等插件照常生效，pytest_pyfunc_call 中回放执行结果）
+
+    Args:
+        session: pytest 会话
+        items: async 用例列表
+        engine: 异步执行引擎
+        concurrency: 最大并发数
+    """
+    from _pytest.skipping import evaluate_skip_marks, evaluate_xfail_marks
+
+    hook = session.config.hook
+    pending = list(items)
+    futures = {}
+    for item in items:
+        xfailed = evaluate_xfail_marks(item)
+        if evaluate_skip_marks(item) or (xfailed and not xfailed.run):
+            continue
+        if not futures:
+            engine.start()
+            semaphore = engine.run(_make_semaphore(concurrency))
+        futures[engine.submit(_run_item(engine, item, semaphore))] = item
+
+    logger.info(f"并发执行 {len(futures)} 个 async 用例，并发数: {concurrency}")
+
+    def _protocol(item):
+        pending.remove(item)
+        hook.pytest_runtest_protocol(item=item, nextitem=pending[0] if pending else None)
+
+    # 跳过的用例直接走标准流程
+    for item in [item for item in items if item not in futures.values()]:
+        _protocol(item)
+
+    for future in concurrent.futures.as_completed(futures):
+        item = futures[future]
+        item.stash[_outcome_key] = future.result()
+        _protocol(item)
+        if session.shouldfail or session.shouldstop:
+            for other in futures:
+                other.cancel()
+            break
+
+
+async def _make_semaphore(concurrency: int) -> asyncio.Semaphore:
+    return asyncio.Semaphore(max(1, concurrency))
@@ -0,0 +1,171 @@
+"""
+等待工具类（异步版本，接口与 WaitUtils 一致）
+"""
+import asyncio
+import time
+from playwright.async_api import Page, Locator, TimeoutError as PlaywrightTimeoutError
+from loguru import logger
+from typing import Awaitable, Callable, Optional, Union
+
+from config.settings import Settings
+from utils import network_quiet
+from utils.wait_utils import MIN_INTERVAL_MS
+
+
+class AsyncWaitUtils:
+    """等待工具类（异步）"""
+    
+    def __init__(self, page: Page):
+        self.page = page
+        # 尽早开始跟踪请求，wait_for_network_quiet 才能看到之前发出的请求
+        network_quiet.track(page)
+    
+    async def wait_for_element(
+        self,
+        selector: str,
+        timeout: int = 30000,
+        state: str = "visible"
+    ) -> Locator:
+        """
+        等待元素出现
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间（毫秒）
+            state: 等待状态 (visible, hidden, attached, detached)
+            
+        Returns:
+            Locator对象
+        """
+        logger.debug(f"等待元素: {selector}, 状态: {state}, 超时: {timeout}ms")
+        locator = self.page.locator(selector)
+        await locator.wait_for(state=state, timeout=timeout)
+        return locator
+    
+    async def wait_for_url(
+        self,
+        url_pattern: str,
+        timeout: int = 30000
+    ):
+        """
+        等待URL匹配
+        
+        Args:
+            url_pattern: URL模式（支持通配符）
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug(f"等待URL: {url_pattern}, 超时: {timeout}ms")
+        await self.page.wait_for_url(url_pattern, timeout=timeout)
+    
+    async def wait_for_load_state(
+        self,
+        state: str = "load",
+        timeout: int = 30000
+    ):
+        """
+        等待页面加载状态
+        
+        Args:
+            state: 加载状态 (load, domcontentloaded, networkidle)
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug(f"等待页面加载状态: {state}, 超时: {timeout}ms")
+        await self.page.wait_for_load_state(state, timeout=timeout)
+    
+    async def wait_for_function(
+        self,
+        expression: str,
+        timeout: int = 30000
+    ):
+        """
+        等待JavaScript函数返回true
+        
+        Args:
+            expression: JavaScript表达式
+            timeout: 超时时间（毫秒）
+        """
+        logger.debug(f"等待函数: {expression}, 超时: {timeout}ms")
+        await self.page.wait_for_function(expression, timeout=timeout)
+    
+    async def wait_for_network_quiet(
+        self,
+        quiet_ms: Optional[int] = None,
+        timeout: int = 30000,
+        label: str = "wait_for_network_quiet",
+        raise_on_timeout: bool = True
+    ) -> bool:
+        """
+        等待网络静默（替代 networkidle）
+        
+        Args:
+            quiet_ms: 静默窗口（毫秒），默认 Settings.NETWORK_QUIET_MS
+            timeout: 超时时间（毫秒）
+            label: 统计中记录的调用方名称
+            raise_on_timeout: 超时时抛出 PlaywrightTimeoutError（默认），为 False 时返回 False
+            
+        Returns:
+            是否在超时前达到静默
+            
+        Raises:
+            PlaywrightTimeoutError: 超时前未达到静默（raise_on_timeout 为 True 时）
+        """
+        quiet_ms = Settings.NETWORK_QUIET_MS if quiet_ms is None else quiet_ms
+        tracker = network_quiet.track(self.page)
+        start = time.monotonic()
+        deadline = start + timeout / 1000
+        while True:
+            remaining = tracker.remaining_ms(quiet_ms, since=start)
+            if remaining == 0:
+                settled = time.monotonic()
+                elapsed = (settled - start) * 1000
+                logger.debug(f"网络静默，耗时: {elapsed:.0f}ms")
+                network_quiet.record_wait(label, elapsed, tracker.networkidle_estimate(start, settled))
+                return True
+            left = (deadline - time.monotonic()) * 1000
+            if left <= 0:
+                break
+            await asyncio.sleep(min(remaining if remaining is not None else min(quiet_ms, 100), left) / 1000)
+        
+        pending = tracker.pending(time.monotonic())
+        logger.warning(f"等待网络静默超时: {timeout}ms, 进行中的请求: {pending}")
+        network_quiet.record_wait(label, (time.monotonic() - start) * 1000, None)
+        if raise_on_timeout:
+            raise PlaywrightTimeoutError(f"等待网络静默超时: {timeout}ms（{label}），进行中的请求: {pending}")
+        return False
+    
+    async def wait_for_condition(
+        self,
+        condition: Callable[[], Union[bool, Awaitable[bool]]],
+        timeout: int = 30000,
+        interval: int = 500
+    ) -> bool:
+        """
+        等待自定义条件
+        
+        Args:
+            condition: 条件函数（普通函数或协程函数）
+            timeout: 超时时间（毫秒）
+            interval: 最大检查间隔（毫秒），从 10ms 开始每次翻倍直到该值
+            
+        Returns:
+            是否满足条件
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + timeout / 1000
+        delay = min(MIN_INTERVAL_MS, interval)
+        
+        while True:
+            result = condition()
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result:
+                logger.debug(f"条件满足，耗时: {(time.perf_counter() - start_time) * 1000:.0f}ms")
+                return True
+            remaining = (deadline - time.perf_counter()) * 1000
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining) / 1000)
+            delay = min(delay * 2, interval)
+        
+        logger.warning(f"等待条件超时: {timeout}ms")
+        return False
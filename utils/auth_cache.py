@@ -0,0 +1,130 @@
+"""
+登录态缓存工具
+按测试数据中的用户只登录一次，将 storage_state 持久化到磁盘并设置过期时间，
+同一 worker 内存命中、不同 worker / 多次运行之间通过磁盘文件共享。
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+from utils.file_lock import FileLock
+from utils.session_stats import session_stats
+
+
+class AuthStateCache:
+    """登录态（storage_state）缓存"""
+
+    def __init__(self, state_dir: Path, ttl: int = 3600):
+        """
+        Args:
+            state_dir: storage_state 文件保存目录
+            ttl: 登录态有效期（秒）
+        """
+        self.state_dir = Path(state_dir)
+        self.ttl = ttl
+        self._memory: Dict[str, str] = {}
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "logins": 0,
+            "login_time_ms": 0.0,
+        }
+
+    def state_path(self, user_key: str, credentials: Dict[str, Any]) -> Path:
+        """
+        计算用户登录态文件路径（凭据变化时文件名随之变化，旧文件自然失效）
+
+        Args:
+            user_key: 测试数据中的用户键（如 test_successful_login）
+            credentials: 用户凭据
+
+        Returns:
+            文件路径
+        """
+        digest = hashlib.sha1(
+            json.dumps(credentials, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:10]
+        safe_key = re.sub(r"[^\w.-]", "_", user_key)
+        return self.state_dir / f"{safe_key}-{digest}.json"
+
+    def is_fresh(self, path: Path) -> bool:
+        """检查登录态文件是否存在且未过期"""
+        try:
+            return time.time() - path.stat().st_mtime < self.ttl
+        except FileNotFoundError:
+            return False
+
+    def get_state(
+        self,
+        user_key: str,
+        credentials: Dict[str, Any],
+        login: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> str:
+        """
+        获取用户登录态文件，缓存缺失或过期时执行一次登录
+
+        Args:
+            user_key: 测试数据中的用户键
+            credentials: 用户凭据
+            login: 登录函数，接收凭据，返回 storage_state 字典
+
+        Returns:
+            storage_state 文件路径（可直接传给 browser.new_context(storage_state=...)）
+        """
+        path = self.state_path(user_key, credentials)
+        cached = self._memory.get(user_key)
+        if cached == str(path) and self.is_fresh(path):
+            self.stats["memory_hits"] += 1
+            return cached
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with FileLock(path.with_suffix(".lock")):
+            # 持锁后再检查一次，其他 worker 可能已经完成登录
+            if self.is_fresh(path):
+                self.stats["disk_hits"] += 1
+                logger.debug(f"复用磁盘登录态: {user_key} -> {path}")
+            else:
+                logger.info(f"登录态缺失或已过期，执行登录: {user_key}")
+                start = time.perf_counter()
+                state = login(credentials)
+                self.stats["logins"] += 1
+                self.stats["login_time_ms"] += (time.perf_counter() - start) * 1000
+
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                logger.info(f"登录态已保存: {path}")
+
+        self._memory[user_key] = str(path)
+        return str(path)
+
+    def invalidate(self, user_key: str):
+        """使指定用户的登录态失效（如服务端会话被注销）"""
+        cached = self._memory.pop(user_key, None)
+        if cached:
+            Path(cached).unlink(missing_ok=True)
+            logger.info(f"登录态已失效: {user_key}")
+
+    def close(self):
+        """登记会话统计"""
+        session_stats.record("auth_cache", self.stats)
+
+
+def _format_auth_stats(stats: Dict[str, Any]) -> List[str]:
+    """登录态缓存终端摘要"""
+    logins = stats.get("logins", 0)
+    avg_login = stats.get("login_time_ms", 0) / logins if logins else 0
+    return [
+        f"内存命中: {stats.get('memory_hits', 0)}, 磁盘命中: {stats.get('disk_hits', 0)}, "
+        f"实际登录: {logins}, 平均登录耗时: {avg_login:.0f}ms",
+    ]
+
+
+session_stats.register_formatter("auth_cache", _format_auth_stats)
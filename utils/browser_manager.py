@@ -1,9 +1,207 @@
 """
 浏览器管理工具类
 """
-from playwright.sync_api import Playwright, Browser
+import os
+import time
+from pathlib import Path
+from playwright.sync_api import Playwright, Browser, BrowserContext
 from loguru import logger
-from typing import Optional
+from typing import Any, Dict, List, Optional
+
+from utils.browser_server import process_tree_rss_mb, read_endpoints
+from utils.session_stats import session_stats
+
+
+class ContextPool:
+    """
+    BrowserContext 复用池
+
+    测试结束后不直接关闭上下文，而是清理 cookies、存储、权限和页面后放回池中，
+    供下一个测试复用；达到最大复用次数或无法保证隔离时回收（关闭）上下文。
+    """
+
+    # 清理当前页面所在源的 Web 存储
+    _CLEAR_STORAGE_SCRIPT = """() => {
+        try { window.localStorage.clear(); } catch (e) {}
+        try { window.sessionStorage.clear(); } catch (e) {}
+    }"""
+
+    def __init__(
+        self,
+        browser: Browser,
+        context_options: Optional[Dict[str, Any]] = None,
+        permissions: Optional[List[str]] = None,
+        max_size: int = 2,
+        max_uses: int = 50,
+    ):
+        """
+        Args:
+            browser: 浏览器实例
+            context_options: 创建上下文的参数（browser.new_context 的参数）
+            permissions: 每次创建/重置后授予的权限
+            max_size: 池中空闲上下文的上限
+            max_uses: 单个上下文的最大复用次数，超过后回收
+        """
+        self.browser = browser
+        self.context_options = context_options or {}
+        self.permissions = permissions or []
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._idle: List[BrowserContext] = []
+        self._uses: Dict[BrowserContext, int] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "resets": 0,
+            "recycled": 0,
+            "isolation_failures": 0,
+            "reset_time_ms": 0.0,
+            "max_reset_time_ms": 0.0,
+        }
+
+    def rebind(self, browser: Browser):
+        """浏览器重新连接后切换到新的浏览器实例，丢弃旧浏览器上的空闲上下文"""
+        self.browser = browser
+        self.stats["recycled"] += len(self._idle)
+        for context in self._idle:
+            self._uses.pop(context, None)
+        self._idle.clear()
+
+    def _create_context(self) -> BrowserContext:
+        """创建新的上下文"""
+        context = self.browser.new_context(**self.context_options)
+        if self.permissions:
+            context.grant_permissions(self.permissions)
+        self._uses[context] = 0
+        return context
+
+    def acquire(self) -> BrowserContext:
+        """
+        获取一个上下文（优先复用池中已预热的上下文）
+
+        Returns:
+            BrowserContext实例
+        """
+        if self._idle:
+            self.stats["hits"] += 1
+            context = self._idle.pop()
+            logger.debug(f"复用池命中，已使用 {self._uses[context]} 次")
+            return context
+        self.stats["misses"] += 1
+        logger.debug("复用池未命中，创建新的上下文")
+        return self._create_context()
+
+    def release(self, context: BrowserContext, reusable: bool = True):
+        """
+        归还上下文
+
+        Args:
+            context: 待归还的上下文
+            reusable: 是否允许复用（测试失败或修改了路由/初始化脚本等无法还原的状态时应传 False）
+        """
+        self._uses[context] = self._uses.get(context, 0) + 1
+        if not reusable or self._uses[context] >= self.max_uses or len(self._idle) >= self.max_size:
+            self._recycle(context)
+            return
+
+        if self._reset(context):
+            self._idle.append(context)
+        else:
+            self.stats["isolation_failures"] += 1
+            self._recycle(context)
+
+    def _reset(self, context: BrowserContext) -> bool:
+        """
+        重置上下文状态并校验隔离性
+
+        Returns:
+            重置后是否可以保证隔离
+        """
+        start = time.perf_counter()
+        try:
+            for page in list(context.pages):
+                try:
+                    page.evaluate(self._CLEAR_STORAGE_SCRIPT)
+                except Exception:
+                    pass
+                page.close()
+            context.clear_cookies()
+            context.clear_permissions()
+            if self.permissions:
+                context.grant_permissions(self.permissions)
+
+            # 其他源残留的 localStorage 或已注册的 Service Worker 无法清理，视为无法隔离
+            state = context.storage_state()
+            isolated = not state.get("cookies") and not any(
+                origin.get("localStorage") for origin in state.get("origins", [])
+            )
+            if isolated and getattr(context, "service_workers", None):
+                isolated = False
+        except Exception as e:
+            logger.warning(f"重置上下文失败，将回收: {e}")
+            isolated = False
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats["resets"] += 1
+        self.stats["reset_time_ms"] += elapsed
+        self.stats["max_reset_time_ms"] = max(self.stats["max_reset_time_ms"], elapsed)
+        return isolated
+
+    def _recycle(self, context: BrowserContext):
+        """关闭并丢弃上下文"""
+        self.stats["recycled"] += 1
+        self._uses.pop(context, None)
+        try:
+            context.close()
+        except Exception as e:
+            logger.warning(f"关闭上下文失败: {e}")
+
+    def close(self):
+        """关闭池中全部空闲上下文，并登记会话统计"""
+        while self._idle:
+            context = self._idle.pop()
+            self._uses.pop(context, None)
+            try:
+                context.close()
+            except Exception:
+                pass
+        session_stats.record("context_pool", self.stats)
+        logger.info(f"上下文复用池已关闭，统计: {self.stats}")
+
+
+def _format_pool_stats(stats: Dict[str, Any]) -> List[str]:
+    """上下文复用池终端摘要"""
+    total = stats.get("hits", 0) + stats.get("misses", 0)
+    resets = stats.get("resets", 0)
+    hit_rate = stats.get("hits", 0) / total * 100 if total else 0
+    avg_reset = stats.get("reset_time_ms", 0) / resets if resets else 0
+    return [
+        f"获取次数: {total}, 命中: {stats.get('hits', 0)}, 未命中: {stats.get('misses', 0)}, 命中率: {hit_rate:.1f}%",
+        f"重置次数: {resets}, 平均耗时: {avg_reset:.1f}ms, 最大耗时: {stats.get('max_reset_time_ms', 0):.1f}ms",
+        f"回收次数: {stats.get('recycled', 0)}, 隔离校验失败: {stats.get('isolation_failures', 0)}",
+    ]
+
+
+def _format_startup_stats(stats: Dict[str, Any]) -> List[str]:
+    """浏览器启动终端摘要"""
+    lines = []
+    for mode, label in (("launch", "独立启动"), ("connect", "连接共享服务")):
+        count = stats.get(f"{mode}_count", 0)
+        if count:
+            lines.append(
+                f"{label}: {count} 次, 平均耗时: {stats.get(f'{mode}_ms', 0) / count:.0f}ms, "
+                f"worker 进程树内存合计: {stats.get(f'{mode}_rss_mb', 0):.0f}MB"
+            )
+    if stats.get("servers"):
+        lines.append(
+            f"共享浏览器服务: {stats['servers']} 个, 启动耗时合计: {stats.get('server_startup_ms', 0):.0f}ms, "
+            f"内存合计: {stats.get('server_rss_mb', 0):.0f}MB, 重启次数: {stats.get('server_restarts', 0)}"
+        )
+    return lines
+
+
+session_stats.register_formatter("context_pool", _format_pool_stats)
+session_stats.register_formatter("browser_startup", _format_startup_stats)
 
 
 class BrowserManager:
@@ -12,6 +210,30 @@ class BrowserManager:
     def __init__(self, playwright: Playwright):
         self.playwright = playwright
         self._browser: Optional[Browser] = None
+        self._context_pool: Optional[ContextPool] = None
+        # 通过共享浏览器服务连接时记录连接信息，用于断线重连
+        self._remote: Optional[Dict[str, Any]] = None
+    
+    def _get_launcher(self, browser_type: str):
+        """获取浏览器引擎"""
+        browser_map = {
+            "chromium": self.playwright.chromium,
+            "firefox": self.playwright.firefox,
+            "webkit": self.playwright.webkit,
+        }
+        
+        if browser_type not in browser_map:
+            raise ValueError(f"不支持的浏览器类型: {browser_type}")
+        return browser_map[browser_type]
+    
+    def _record_startup(self, mode: str, elapsed_ms: float):
+        """登记浏览器启动/连接耗时和当前进程树内存"""
+        rss = process_tree_rss_mb(os.getpid())
+        session_stats.record("browser_startup", {
+            f"{mode}_count": 1,
+            f"{mode}_ms": elapsed_ms,
+            f"{mode}_rss_mb": rss or 0,
+        })
     
     def launch_browser(
         self,
@@ -34,17 +256,8 @@ class BrowserManager:
         Returns:
             Browser实例
         """
-        browser_map = {
-            "chromium": self.playwright.chromium,
-            "firefox": self.playwright.firefox,
-            "webkit": self.playwright.webkit,
-        }
-        
-        if browser_type not in browser_map:
-            raise ValueError(f"不支持的浏览器类型: {browser_type}")
-        
         #获取浏览器引擎
-        browser_launcher = browser_map[browser_type]
+        browser_launcher = self._get_launcher(browser_type)
         
         launch_options = {
             "headless": headless,
@@ -54,12 +267,121 @@ class BrowserManager:
         }
         
         logger.info(f"启动浏览器: {browser_type}, 参数: {launch_options}")
+        start = time.perf_counter()
         self._browser = browser_launcher.launch(**launch_options)
+        self._record_startup("launch", (time.perf_counter() - start) * 1000)
+        
+        return self._browser
+    
+    def connect_browser(
+        self,
+        endpoints_file: str,
+        worker_index: int = 0,
+        browser_type: str = "chromium",
+        slow_mo: int = 0,
+        timeout: int = 30000,
+    ) -> Browser:
+        """
+        连接共享浏览器服务（按 worker 序号分配到不同服务）
+        
+        Args:
+            endpoints_file: 服务端点列表文件
+            worker_index: worker 序号
+            browser_type: 浏览器类型，需与服务一致
+            slow_mo: 操作延迟（毫秒）
+            timeout: 连接超时时间（毫秒）
+            
+        Returns:
+            Browser实例
+        """
+        self._remote = {
+            "endpoints_file": Path(endpoints_file),
+            "worker_index": worker_index,
+            "browser_type": browser_type,
+            "slow_mo": slow_mo,
+            "timeout": timeout,
+        }
+        start = time.perf_counter()
+        self._browser = self._connect_remote()
+        self._record_startup("connect", (time.perf_counter() - start) * 1000)
+        return self._browser
+    
+    def _connect_remote(self) -> Browser:
+        """按端点文件连接服务；服务重启期间端点可能暂不可用，在超时时间内重试"""
+        remote = self._remote
+        launcher = self._get_launcher(remote["browser_type"])
+        deadline = time.time() + remote["timeout"] / 1000
+        while True:
+            endpoints = read_endpoints(remote["endpoints_file"])
+            endpoint = endpoints[remote["worker_index"] % len(endpoints)]
+            try:
+                logger.info(f"连接共享浏览器服务: {endpoint}")
+                return launcher.connect(endpoint, slow_mo=remote["slow_mo"], timeout=remote["timeout"])
+            except Exception as e:
+                if time.time() > deadline:
+                    raise
+                logger.warning(f"连接浏览器服务失败，稍后重试: {e}")
+                time.sleep(1)
+    
+    @property
+    def is_remote(self) -> bool:
+        """是否通过共享浏览器服务连接"""
+        return self._remote is not None
+    
+    def ensure_connected(self) -> Browser:
+        """
+        确保浏览器连接可用；共享服务崩溃重启后自动重连
         
+        Returns:
+            可用的Browser实例
+        """
+        if self._remote is not None and not self._browser.is_connected():
+            logger.warning("与浏览器服务的连接已断开，正在重连")
+            self._browser = self._connect_remote()
+            if self._context_pool:
+                self._context_pool.rebind(self._browser)
         return self._browser
     
+    def create_context_pool(
+        self,
+        context_options: Optional[Dict[str, Any]] = None,
+        permissions: Optional[List[str]] = None,
+        max_size: int = 2,
+        max_uses: int = 50,
+    ) -> ContextPool:
+        """
+        基于当前浏览器创建上下文复用池
+
+        Args:
+            context_options: 创建上下文的参数
+            permissions: 授予的权限
+            max_size: 池中空闲上下文的上限
+            max_uses: 单个上下文的最大复用次数
+
+        Returns:
+            ContextPool实例
+        """
+        if self._browser is None:
+            raise RuntimeError("请先调用 launch_browser 启动浏览器")
+        self._context_pool = ContextPool(
+            self._browser,
+            context_options=context_options,
+            permissions=permissions,
+            max_size=max_size,
+            max_uses=max_uses,
+        )
+        logger.info(f"创建上下文复用池: max_size={max_size}, max_uses={max_uses}")
+        return self._context_pool
+
+    def close_context_pool(self):
+        """关闭上下文复用池"""
+        if self._context_pool:
+            self._context_pool.close()
+            self._context_pool = None
+
     def close_browser(self):
         """关闭浏览器"""
+        self.close_context_pool()
         if self._browser:
             self._browser.close()
             self._browser = None
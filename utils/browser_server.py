@@ -0,0 +1,265 @@
+"""
+共享浏览器服务工具
+pytest-xdist 并行时由 controller 启动一个或多个浏览器服务（Playwright launchServer），
+各 worker 通过 websocket 端点连接，避免每个 worker 各自启动一个浏览器进程。
+"""
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """
+    统计进程及其全部子进程的常驻内存（仅 Linux，读取 /proc）
+
+    Args:
+        pid: 根进程ID
+
+    Returns:
+        内存占用（MB），无法统计时返回 None
+    """
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+        child_pid = int(entry.name)
+        children.setdefault(int(fields.get("PPid", "0").strip()), []).append(child_pid)
+        rss_kb[child_pid] = int(fields.get("VmRSS", "0 kB").split()[0])
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_kb.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 1024
+
+
+def process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    """
+    统计进程及其全部子进程累计占用的 CPU 时间（用户态 + 内核态，含已回收子进程，仅 Linux）
+
+    Args:
+        pid: 根进程ID
+
+    Returns:
+        CPU 时间（秒），无法统计时返回 None
+    """
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+
+    ticks_per_second = os.sysconf("SC_CLK_TCK")
+    children: Dict[int, List[int]] = {}
+    ticks: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # 进程名可能包含空格和括号，从最后一个右括号之后开始解析
+        fields = stat[stat.rfind(")") + 2:].split()
+        child_pid = int(entry.name)
+        children.setdefault(int(fields[1]), []).append(child_pid)
+        # utime, stime, cutime, cstime
+        ticks[child_pid] = sum(int(value) for value in fields[11:15])
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += ticks.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / ticks_per_second
+
+
+class BrowserServer:
+    """单个浏览器服务进程（通过 Playwright 驱动的 launch-server 命令启动）"""
+
+    def __init__(self, browser_type: str = "chromium", launch_options: Optional[Dict[str, Any]] = None,
+                 startup_timeout: int = 60):
+        """
+        Args:
+            browser_type: 浏览器类型 (chromium, firefox, webkit)
+            launch_options: launchServer 参数（headless、args、timeout 等）
+            startup_timeout: 等待服务输出端点的超时时间（秒）
+        """
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.ws_endpoint: Optional[str] = None
+        self.startup_ms = 0.0
+
+    def start(self) -> str:
+        """
+        启动浏览器服务
+
+        Returns:
+            websocket 端点
+        """
+        from playwright._impl._driver import compute_driver_executable, get_driver_env
+
+        config_fd, config_path = tempfile.mkstemp(prefix="pw-server-", suffix=".json")
+        with os.fdopen(config_fd, "w", encoding="utf-8") as f:
+            json.dump(self.launch_options, f)
+
+        # 错误输出写入临时文件，避免管道写满阻塞服务进程
+        stderr_file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+
+        start = time.perf_counter()
+        node, cli = compute_driver_executable()
+        self.process = subprocess.Popen(
+            [node, cli, "launch-server", "--browser", self.browser_type, "--config", config_path],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            env=get_driver_env(),
+            text=True,
+        )
+
+        # 后台读取首行输出，避免 readline 阻塞超时控制
+        lines: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(target=lambda: lines.put(self.process.stdout.readline()), daemon=True).start()
+        try:
+            endpoint = lines.get(timeout=self.startup_timeout).strip()
+        except queue.Empty:
+            endpoint = ""
+        finally:
+            os.unlink(config_path)
+
+        if not endpoint.startswith("ws"):
+            self.stop()
+            stderr_file.seek(0)
+            output = stderr_file.read().strip().splitlines()
+            stderr_file.close()
+            error = next((line for line in output if line.startswith("Error")), " ".join(output[-1:]))
+            raise RuntimeError(f"浏览器服务启动失败: {self.browser_type}, 错误: {error}")
+        stderr_file.close()
+
+        self.ws_endpoint = endpoint
+        self.startup_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"浏览器服务已启动: {endpoint}, 耗时: {self.startup_ms:.0f}ms")
+        return endpoint
+
+    def is_alive(self) -> bool:
+        """服务进程是否存活"""
+        return self.process is not None and self.process.poll() is None
+
+    def rss_mb(self) -> Optional[float]:
+        """服务进程树的内存占用（MB）"""
+        return process_tree_rss_mb(self.process.pid) if self.is_alive() else None
+
+    def stop(self):
+        """停止浏览器服务"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        self.ws_endpoint = None
+
+
+class BrowserServerPool:
+    """浏览器服务组 - 由 xdist controller 管理，崩溃的服务会被自动重启"""
+
+    def __init__(self, browser_type: str, launch_options: Dict[str, Any], size: int,
+                 endpoints_file: Path, check_interval: float = 2.0):
+        """
+        Args:
+            browser_type: 浏览器类型
+            launch_options: launchServer 参数
+            size: 服务数量
+            endpoints_file: 端点列表文件（worker 从中读取连接地址）
+            check_interval: 存活检查间隔（秒）
+        """
+        self.servers = [BrowserServer(browser_type, launch_options) for _ in range(max(1, size))]
+        self.endpoints_file = Path(endpoints_file)
+        self.check_interval = check_interval
+        self.restarts = 0
+        self._stop_event = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动全部服务并开始存活监控"""
+        for server in self.servers:
+            server.start()
+        self._write_endpoints()
+        self._monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+        self._monitor_thread.start()
+
+    def _write_endpoints(self):
+        """原子写入端点列表文件"""
+        self.endpoints_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.endpoints_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"endpoints": [server.ws_endpoint for server in self.servers]}, f)
+        os.replace(tmp_path, self.endpoints_file)
+
+    def _monitor(self):
+        """定期检查服务存活，崩溃时重启并更新端点文件"""
+        while not self._stop_event.wait(self.check_interval):
+            with self._lock:
+                restarted = False
+                for index, server in enumerate(self.servers):
+                    if self._stop_event.is_set() or server.is_alive():
+                        continue
+                    logger.warning(f"浏览器服务 #{index} 已退出，正在重启")
+                    try:
+                        server.stop()
+                        server.start()
+                        self.restarts += 1
+                        restarted = True
+                    except Exception as e:
+                        logger.error(f"重启浏览器服务 #{index} 失败: {e}")
+                if restarted:
+                    self._write_endpoints()
+
+    def stats(self) -> Dict[str, Any]:
+        """服务组统计（启动耗时、内存、重启次数）"""
+        rss = [server.rss_mb() for server in self.servers]
+        return {
+            "servers": len(self.servers),
+            "server_startup_ms": sum(server.startup_ms for server in self.servers),
+            "server_rss_mb": sum(value for value in rss if value is not None),
+            "server_restarts": self.restarts,
+        }
+
+    def stop(self):
+        """停止监控和全部服务"""
+        self._stop_event.set()
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout=self.check_interval + 1)
+        with self._lock:
+            for server in self.servers:
+                server.stop()
+        self.endpoints_file.unlink(missing_ok=True)
+        logger.info("浏览器服务已全部停止")
+
+
+def read_endpoints(endpoints_file: Path) -> List[str]:
+    """读取端点列表文件"""
+    with open(endpoints_file, "r", encoding="utf-8") as f:
+        return json.load(f)["endpoints"]
@@ -1,13 +1,81 @@
 """
 数据加载工具类
+解析结果按文件路径缓存在进程内，文件的修改时间或大小变化后重新解析；
+YAML 优先使用 libyaml 的 CSafeLoader，pandas 只在读取 Excel 时导入。
 """
-import yaml
+import copy
 import json
-import pandas as pd
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import yaml
 from loguru import logger
-from openpyxl import load_workbook
+
+# libyaml 不可用时退回纯 Python 实现（解析结果一致）
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class _ParsedFileCache:
+    """
+    进程级解析结果缓存
+    键为 (绝对路径, 附加参数)，值为 (文件签名, 解析结果)；签名为 (mtime_ns, size)，每次读取只需一次 stat
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, Any], Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path, parser: Callable[[str], Any], variant: Any = None) -> Any:
+        """
+        获取解析结果（调用方不得修改返回的对象）
+
+        Args:
+            file_path: 文件路径
+            parser: 解析函数，接收路径返回数据
+            variant: 区分同一文件的不同解析方式（如 Excel 工作表名）
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (path, variant)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            data = parser(path)
+            self._entries[key] = (signature, data)
+            self.misses += 1
+            return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _ParsedFileCache()
+
+
+def _parse_yaml(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    logger.debug(f"成功加载YAML文件: {path}")
+    return data or {}
+
+
+def _parse_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    logger.debug(f"成功加载JSON文件: {path}")
+    return data
 
 
 class DataLoader:
@@ -22,13 +90,10 @@ class DataLoader:
             file_path: YAML文件路径
             
         Returns:
-            字典数据
+            字典数据（副本，可以修改）
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-            logger.debug(f"成功加载YAML文件: {file_path}")
-            return data or {}
+            return copy.deepcopy(_cache.get(file_path, _parse_yaml))
         except Exception as e:
             logger.error(f"加载YAML文件失败: {file_path}, 错误: {e}")
             raise
@@ -42,13 +107,10 @@ class DataLoader:
             file_path: JSON文件路径
             
         Returns:
-            字典数据
+            字典数据（副本，可以修改）
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            logger.debug(f"成功加载JSON文件: {file_path}")
-            return data
+            return copy.deepcopy(_cache.get(file_path, _parse_json))
         except Exception as e:
             logger.error(f"加载JSON文件失败: {file_path}, 错误: {e}")
             raise
@@ -63,17 +125,37 @@ class DataLoader:
             sheet_name: 工作表名称，默认为第一个工作表
             
         Returns:
-            字典列表
+            字典列表（副本，可以修改）
         """
+        def parse(path: str) -> List[Dict[str, Any]]:
+            # pandas（及其依赖的 openpyxl）导入耗时较长，只在读取 Excel 时导入
+            import pandas as pd
+            # sheet_name=None 时 pandas 返回所有工作表，这里与文档一致读取第一个
+            df = pd.read_excel(path, sheet_name=0 if sheet_name is None else sheet_name)
+            logger.debug(f"成功加载Excel文件: {path}, 工作表: {sheet_name}")
+            return df.to_dict("records")
+        
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-            data = df.to_dict("records")
-            logger.debug(f"成功加载Excel文件: {file_path}, 工作表: {sheet_name}")
-            return data
+            return copy.deepcopy(_cache.get(file_path, parse, variant=("excel", sheet_name)))
         except Exception as e:
             logger.error(f"加载Excel文件失败: {file_path}, 错误: {e}")
             raise
     
+    @staticmethod
+    def iter_rows(file_path: str, sheet_name: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐行读取大数据文件（.xlsx 只读模式、.csv、.jsonl），不加载整个文件、不缓存
+        
+        Args:
+            file_path: 数据文件路径
+            sheet_name: xlsx 工作表名称，默认为第一个工作表
+            
+        Returns:
+            每行数据字典的迭代器
+        """
+        from utils.datasets import iter_rows
+        return iter_rows(file_path, sheet_name)
+    
     @staticmethod
     def get_test_data(test_name: str, data_file: str = None) -> Dict[str, Any]:
         """
@@ -91,6 +173,15 @@ class DataLoader:
         if data_file is None:
             data_file = Settings.TEST_DATA_FILE
         
-        data = DataLoader.load_yaml(data_file)
-        return data.get(test_name, {})
-
+        try:
+            # 解析后的顶层字典即按测试名称的索引，只复制命中的一项
+            data = _cache.get(data_file, _parse_yaml)
+        except Exception as e:
+            logger.error(f"加载YAML文件失败: {data_file}, 错误: {e}")
+            raise
+        return copy.deepcopy(data.get(test_name, {}))
+    
+    @staticmethod
+    def clear_cache():
+        """清空解析结果缓存（文件变化会自动重新解析，一般无需调用）"""
+        _cache.clear()
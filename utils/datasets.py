@@ -0,0 +1,280 @@
+"""
+流式数据集
+按行惰性读取 xlsx（openpyxl 只读模式）、CSV 和 JSONL 数据文件，用于大数据量的数据驱动测试：
+参数化时只保存每行的测试 ID 和文件偏移，行内容在测试运行时按偏移单独读取，
+每个 xdist worker 只解析自己执行的行，不会在内存中保留完整数据集。
+xlsx 没有按行随机读取的能力，首次使用时流式转换为 JSONL 缓存（按文件签名失效）。
+行偏移索引和测试 ID 也缓存在磁盘上，多个 worker 通过文件锁共用一次扫描结果。
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.file_lock import FileLock
+
+SUPPORTED_SUFFIXES = (".xlsx", ".csv", ".jsonl")
+# 索引格式版本（计入缓存键，解析方式变化后旧索引自动失效）
+INDEX_VERSION = 2
+
+
+def iter_rows(path, sheet: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取数据文件（不加载整个文件）
+
+    Args:
+        path: 数据文件路径（.xlsx、.csv、.jsonl）
+        sheet: xlsx 工作表名称，默认第一个工作表
+
+    Yields:
+        每行数据的字典（xlsx 和 CSV 以首行为列名）
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+    elif suffix == ".xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            rows = worksheet.iter_rows(values_only=True)
+            header = [str(name) if name is not None else f"column{i}" for i, name in enumerate(next(rows, ()))]
+            for values in rows:
+                if any(value is not None for value in values):
+                    yield dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"不支持的数据文件格式: {path}（支持 {', '.join(SUPPORTED_SUFFIXES)}）")
+
+
+def _csv_record_offsets(path: Path) -> Iterator[int]:
+    """
+    CSV 每条记录的起始字节偏移（跳过空行，与 csv.DictReader 一致），最后返回文件末尾
+    记录边界由 csv 模块自身的解析状态决定（引号内的换行、未加引号字段中的引号与 DictReader 相同）：
+    csv.reader 逐行拉取输入，每返回一条记录时已读取的字节数即为下一条记录的起始偏移
+    """
+    with open(path, "rb") as f:
+        if f.read(3) != b"\xef\xbb\xbf":
+            f.seek(0)
+        consumed = f.tell()
+
+        def lines() -> Iterator[str]:
+            nonlocal consumed
+            for line in f:
+                consumed += len(line)
+                yield line.decode("utf-8")
+
+        start = consumed
+        for record in csv.reader(lines()):
+            if record:
+                yield start
+            start = consumed
+        yield consumed
+
+
+def _jsonl_offsets(path: Path) -> Iterator[int]:
+    """JSONL 每个非空行的起始字节偏移，最后返回文件末尾"""
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                yield offset
+            offset += len(line)
+        yield offset
+
+
+class DatasetRow(Mapping):
+    """
+    数据集中的一行（参数化的参数值）
+    只保存行号，首次读取字段时才从文件中解析该行
+    """
+
+    __slots__ = ("dataset", "index", "_data")
+
+    def __init__(self, dataset: "Dataset", index: int):
+        self.dataset = dataset
+        self.index = index
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self.dataset.row(self.index)
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"DatasetRow({self.dataset.path.name}#{self.index})"
+
+
+class Dataset:
+    """
+    按行随机读取的数据集（行偏移索引）
+
+    Example:
+        dataset = Dataset("data/users.csv", id_field="username")
+        len(dataset), dataset.ids()[0], dataset.row(0)
+    """
+
+    def __init__(self, path, sheet: Optional[str] = None, id_field: Optional[str] = None, cache_dir=None):
+        """
+        Args:
+            path: 数据文件路径（.xlsx、.csv、.jsonl）
+            sheet: xlsx 工作表名称，默认第一个工作表
+            id_field: 作为测试 ID 的列名，默认使用 row<行号>
+            cache_dir: 索引和 xlsx 转换结果的缓存目录，默认 Settings.CACHE_DIR/datasets
+        """
+        self.path = Path(path)
+        if self.path.suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"不支持的数据文件格式: {self.path}（支持 {', '.join(SUPPORTED_SUFFIXES)}）")
+        self.sheet = sheet
+        self.id_field = id_field
+        if cache_dir is None:
+            from config.settings import Settings
+            cache_dir = Settings.CACHE_DIR / "datasets"
+        self.cache_dir = Path(cache_dir)
+        self._source: Optional[Path] = None
+        self._header: Optional[List[str]] = None
+        self._offsets: Optional[array] = None
+        self._ids: Optional[List[str]] = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """顺序读取全部行（不建立索引）"""
+        return iter_rows(self.path, self.sheet)
+
+    def __len__(self) -> int:
+        self._ensure_index()
+        return len(self._offsets) - 1
+
+    def _cache_key(self) -> str:
+        stat = os.stat(self.path)
+        raw = f"{INDEX_VERSION}|{self.path.resolve()}|{self.sheet}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _ensure_index(self):
+        if self._offsets is not None:
+            return
+        key = self._cache_key()
+        meta_file = self.cache_dir / f"{key}.meta.json"
+        offsets_file = self.cache_dir / f"{key}.offsets"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 多个 worker 同时收集时只有一个进程扫描文件，其他进程等待后读取缓存
+        with FileLock(self.cache_dir / f"{key}.lock"):
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                offsets = array("q")
+                with open(offsets_file, "rb") as f:
+                    offsets.frombytes(f.read())
+            except (FileNotFoundError, ValueError):
+                meta, offsets = self._build_index(key)
+                # 偏移以二进制保存，加载时不产生逐个整数对象
+                self._write_atomic(offsets_file, offsets.tobytes())
+                self._write_atomic(meta_file, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            self._source = Path(meta["source"])
+            self._header = meta["header"]
+            self._offsets = offsets
+            if self.id_field:
+                # 同一文件可按不同的列生成 ID，每列单独缓存
+                field_hash = hashlib.sha1(self.id_field.encode("utf-8")).hexdigest()[:8]
+                ids_file = self.cache_dir / f"{key}.ids-{field_hash}.json"
+                try:
+                    with open(ids_file, "r", encoding="utf-8") as f:
+                        self._ids = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    self._ids = self._scan_ids(self._source)
+                    self._write_atomic(ids_file, json.dumps(self._ids, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _build_index(self, key: str) -> Tuple[Dict[str, Any], array]:
+        """扫描数据文件，记录每行偏移和列名（xlsx 先转换为 JSONL）"""
+        source, header = self.path, None
+        if self.path.suffix.lower() == ".xlsx":
+            source = self.cache_dir / f"{key}.jsonl"
+            with open(source, "w", encoding="utf-8") as f:
+                for row in iter_rows(self.path, self.sheet):
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        if source.suffix.lower() == ".csv":
+            offsets = array("q", _csv_record_offsets(source))
+            # 首条记录为列名
+            if len(offsets) > 1:
+                header = self._parse_csv(source, offsets[0], offsets[1])
+                del offsets[0]
+            else:
+                header = []
+        else:
+            offsets = array("q", _jsonl_offsets(source))
+        logger.debug(f"数据集索引: {self.path}, {len(offsets) - 1} 行")
+        return {"source": str(source), "header": header}, offsets
+
+    def _scan_ids(self, source: Path) -> List[str]:
+        """按 id_field 列生成每行的测试 ID，空值使用 row<行号>"""
+        ids = []
+        for i, row in enumerate(iter_rows(source)):
+            value = row.get(self.id_field)
+            ids.append(f"row{i}" if value is None or value == "" else str(value))
+        return ids
+
+    @staticmethod
+    def _parse_csv(path: Path, start: int, end: int) -> List[str]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            text = f.read(end - start).decode("utf-8")
+        return next(csv.reader(io.StringIO(text, newline="")), [])
+
+    def ids(self) -> List[str]:
+        """每行的测试 ID（id_field 列的值，未指定时为 row<行号>）"""
+        self._ensure_index()
+        if self._ids is None:
+            self._ids = [f"row{i}" for i in range(len(self))]
+        return self._ids
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """按行号读取一行"""
+        self._ensure_index()
+        start, end = self._offsets[index], self._offsets[index + 1]
+        if self._header is not None:
+            # 与 csv.DictReader 一致：缺少的列为 None，多出的值放在键 None 下
+            values = self._parse_csv(self._source, start, end)
+            row = dict(zip(self._header, values))
+            if len(values) < len(self._header):
+                row.update((name, None) for name in self._header[len(values):])
+            elif len(values) > len(self._header):
+                row[None] = values[len(self._header):]
+            return row
+        with open(self._source, "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+    def params(self) -> List[DatasetRow]:
+        """参数化用的惰性行对象"""
+        return [DatasetRow(self, index) for index in range(len(self))]
@@ -0,0 +1,169 @@
+"""
+批量 DOM 操作工具
+在一次 page.evaluate 中完成多个字段的填充、勾选、选择或读取：
+脚本在浏览器内等待全部字段可见（或超时），然后逐个操作并触发 input/change 事件，返回每个字段的结果或错误。
+只支持 CSS 和 XPath 选择器，Playwright 专有的选择器（text=、>> 链、:has-text() 等）由调用方逐个操作。
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.sync_api import Page
+
+# 其他选择器引擎前缀（text=、id=、data-testid= 等）
+_ENGINE_PREFIX = re.compile(r"^[a-zA-Z_-]+=")
+
+_BATCH_SCRIPT = """
+async ({fields, timeout}) => {
+    const resolve = (field) => {
+        if (field.kind === "xpath") {
+            const snapshot = document.evaluate(field.selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        }
+        return Array.from(document.querySelectorAll(field.selector));
+    };
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== "hidden";
+    };
+    const inspect = (field) => {
+        let nodes;
+        try {
+            nodes = resolve(field);
+        } catch (e) {
+            return {unsupported: true};
+        }
+        if (!nodes.length) return {error: "未找到元素"};
+        if (nodes.length > 1) return {error: `选择器匹配到 ${nodes.length} 个元素`};
+        const el = nodes[0];
+        if (!visible(el)) return {el, error: "元素不可见"};
+        if (field.op !== "read" && el.disabled) return {el, error: "元素已禁用"};
+        if (field.op === "fill" && el.readOnly) return {el, error: "元素只读"};
+        return {el};
+    };
+    // 等待全部字段就绪（浏览器内轮询，不额外往返），超时后按当前状态报告
+    const deadline = performance.now() + timeout;
+    let states = fields.map(inspect);
+    while (states.some((state) => state.error) && performance.now() < deadline) {
+        await new Promise((done) => setTimeout(done, 50));
+        states = fields.map(inspect);
+    }
+
+    const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+    // 通过原型上的 setter 赋值，React 等框架才能感知 value 变化
+    const setValue = (el, value) => {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, "value").set.call(el, value);
+    };
+    const select = (el, value) => {
+        const values = Array.isArray(value) ? value : [value];
+        const options = Array.from(el.options);
+        const missing = values.filter((v) => !options.some((o) => o.value === v || o.label === v));
+        if (missing.length) return {error: `选项不存在: ${missing.join(", ")}`};
+        if (!el.multiple && values.length > 1) return {error: "单选下拉框不能选择多个选项"};
+        for (const option of options) option.selected = values.includes(option.value) || values.includes(option.label);
+        fire(el, "input");
+        fire(el, "change");
+        return {};
+    };
+    const apply = (field, el) => {
+        const isSelect = el instanceof HTMLSelectElement;
+        const isToggle = el instanceof HTMLInputElement && ["checkbox", "radio"].includes(el.type);
+        if (field.op === "read") {
+            if (isToggle) return {value: String(el.checked)};
+            if (isSelect || el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement) return {value: el.value};
+            return {value: el.innerText};
+        }
+        if (field.op === "check") {
+            if (!isToggle) return {error: "元素不是复选框或单选框"};
+            // click 会按浏览器默认行为触发 click/input/change 事件
+            if (el.checked !== field.value) el.click();
+            if (el.checked !== field.value) return {error: "勾选状态未改变（可能被页面脚本阻止）"};
+            return {};
+        }
+        if (isSelect) return select(el, field.value);
+        if (Array.isArray(field.value)) return {error: "只有下拉框可以选择多个值"};
+        if (isToggle) return {error: "复选框或单选框请传入 True/False"};
+        el.focus();
+        if (el.isContentEditable) {
+            el.textContent = field.value;
+        } else if (el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement) {
+            setValue(el, field.value);
+        } else {
+            return {error: "元素不可填充"};
+        }
+        fire(el, "input");
+        fire(el, "change");
+        return {};
+    };
+    return fields.map((field, i) => {
+        const state = states[i];
+        if (state.unsupported || state.error) return {unsupported: state.unsupported, error: state.error};
+        try {
+            return apply(field, state.el);
+        } catch (e) {
+            return {error: String(e.message || e)};
+        }
+    });
+}
+"""
+
+
+# 读取单个元素（与批量脚本的读取规则一致）
+READ_ELEMENT_SCRIPT = """
+(el) => {
+    if (el instanceof HTMLInputElement && ["checkbox", "radio"].includes(el.type)) return String(el.checked);
+    if (el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement || el instanceof HTMLSelectElement) {
+        return el.value;
+    }
+    return el.innerText;
+}
+"""
+
+
+class BatchError(AssertionError):
+    """批量操作中有字段失败（errors 为 {字段: 错误信息}）"""
+
+    def __init__(self, action: str, errors: Dict[Any, str]):
+        self.errors = errors
+        lines = "\n".join(f"  {key}: {error}" for key, error in errors.items())
+        super().__init__(f"{action} 有 {len(errors)} 个字段失败:\n{lines}")
+
+
+def selector_kind(selector: Any) -> Optional[Tuple[str, str]]:
+    """
+    判断选择器能否在浏览器内直接解析
+
+    Returns:
+        ("css" | "xpath", 选择器)，Locator 或 Playwright 专有选择器返回 None
+    """
+    if not isinstance(selector, str) or ">>" in selector:
+        return None
+    if selector.startswith("css="):
+        return "css", selector[4:]
+    if selector.startswith("xpath="):
+        return "xpath", selector[6:]
+    # 与 Playwright 一致：以 // 或 .. 开头视为 XPath
+    if selector.startswith(("//", "(//", "..")):
+        return "xpath", selector
+    if _ENGINE_PREFIX.match(selector):
+        return None
+    return "css", selector
+
+
+def run_batch(page: Page, fields: List[Dict[str, Any]], timeout: int) -> List[Dict[str, Any]]:
+    """
+    在一次 evaluate 中执行批量操作
+
+    Args:
+        page: 页面
+        fields: [{"kind", "selector", "op": "fill" | "check" | "read", "value"}]
+        timeout: 等待字段就绪的超时时间（毫秒）
+
+    Returns:
+        与 fields 一一对应的结果: {"value"}（读取）、{"error"} 或 {"unsupported": True}（需逐个操作）
+    """
+    if not fields:
+        return []
+    return page.evaluate(_BATCH_SCRIPT, {"fields": fields, "timeout": timeout})
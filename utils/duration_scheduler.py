@@ -0,0 +1,281 @@
+"""
+按耗时调度的 xdist 调度器
+根据历史耗时（.cache/test_durations.json，首次使用时从 reports/report.json 导入）
+把测试按预计耗时从长到短分配给空闲的 worker（LPT 贪心），
+并尽量把共享昂贵 fixture（同一登录用户的 storage_state、同名 HAR 存档）的测试分到同一个 worker：
+分组按预计耗时切块，每块不超过平均每个 worker 的负载，大分组不会让单个 worker 串行执行。
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from xdist.scheduler import LoadScopeScheduling
+
+from utils.session_stats import session_stats
+
+
+def fixture_group(item) -> Optional[str]:
+    """
+    计算测试的昂贵 fixture 分组键
+
+    Returns:
+        auth:<用户> 或 har:<存档名>，没有共享 fixture 时返回 None
+    """
+    marker = item.get_closest_marker("auth_user")
+    callspec = getattr(item, "callspec", None)
+    if marker is not None and marker.args:
+        return f"auth:{marker.args[0]}"
+    if callspec is not None and "auth_user" in callspec.params:
+        return f"auth:{callspec.params['auth_user']}"
+    marker = item.get_closest_marker("har")
+    if marker is not None and marker.args:
+        return f"har:{marker.args[0]}"
+    return None
+
+
+class DurationStore:
+    """测试耗时记录（指数加权平均），跨运行持久化"""
+
+    def __init__(self, path: Path, alpha: float = 0.5):
+        """
+        Args:
+            path: 记录文件路径
+            alpha: 新耗时的权重
+        """
+        self.path = Path(path)
+        self.alpha = alpha
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._observed: Dict[str, float] = {}
+        self._groups: Dict[str, Optional[str]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def seed_from_json_report(self, report_file: Path) -> int:
+        """
+        记录为空时从 pytest-json-report 报告导入各阶段耗时
+
+        Returns:
+            导入的测试数
+        """
+        if self._entries:
+            return 0
+        try:
+            with open(report_file, "r", encoding="utf-8") as f:
+                tests = json.load(f).get("tests", [])
+        except (FileNotFoundError, ValueError):
+            return 0
+        for test in tests:
+            duration = sum(test.get(when, {}).get("duration", 0) for when in ("setup", "call", "teardown"))
+            self._entries[test["nodeid"]] = {"duration": duration, "group": None}
+        return len(tests)
+
+    def estimate(self, nodeid: str) -> Optional[float]:
+        entry = self._entries.get(nodeid)
+        return entry["duration"] if entry else None
+
+    def group(self, nodeid: str) -> Optional[str]:
+        entry = self._entries.get(nodeid)
+        return entry.get("group") if entry else None
+
+    def default_estimate(self) -> float:
+        """没有记录的测试按已记录测试的平均耗时估算"""
+        durations = [entry["duration"] for entry in self._entries.values()]
+        return sum(durations) / len(durations) if durations else 1.0
+
+    def observe(self, report):
+        """累计本次运行的耗时（含 setup/teardown 和重跑）和分组键（来自 user_properties）"""
+        self._observed[report.nodeid] = self._observed.get(report.nodeid, 0.0) + report.duration
+        for name, value in report.user_properties:
+            if name == "fixture_group":
+                self._groups[report.nodeid] = value
+
+    def save(self):
+        """合并本次运行的耗时并持久化"""
+        if not self._observed:
+            return
+        for nodeid, duration in self._observed.items():
+            entry = self._entries.get(nodeid)
+            if entry is not None:
+                duration = self.alpha * duration + (1 - self.alpha) * entry["duration"]
+            self._entries[nodeid] = {"duration": round(duration, 3), "group": self._groups.get(nodeid)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._observed.clear()
+
+
+def build_work_units(collection: List[str], store: DurationStore, workers: int) -> "OrderedDict[str, Dict[str, bool]]":
+    """
+    构造工作单元，按预计耗时从长到短排列
+
+    没有分组的测试单独成为一个单元；同一分组的测试按收集顺序切块，
+    每块预计耗时不超过 max(总耗时 / worker 数, 最长的单个测试)。
+
+    Args:
+        collection: 收集到的 nodeid
+        store: 耗时记录
+        workers: worker 数
+
+    Returns:
+        单元名 -> {nodeid: False}（LoadScopeScheduling 的 workqueue 格式）
+    """
+    default = store.default_estimate()
+    estimates = {
+        nodeid: store.estimate(nodeid) if store.estimate(nodeid) is not None else default
+        for nodeid in collection
+    }
+    total = sum(estimates.values())
+    limit = max(total / max(workers, 1), max(estimates.values(), default=0.0))
+
+    units: Dict[str, Dict[str, bool]] = {}
+    groups: Dict[str, List[str]] = {}
+    for nodeid in collection:
+        group = store.group(nodeid)
+        if group:
+            groups.setdefault(group, []).append(nodeid)
+        else:
+            units[nodeid] = {nodeid: False}
+    for group, nodeids in groups.items():
+        chunk: List[str] = []
+        chunk_duration = 0.0
+        index = 0
+        for nodeid in nodeids:
+            if chunk and chunk_duration + estimates[nodeid] > limit:
+                units[f"group:{group}#{index}"] = dict.fromkeys(chunk, False)
+                index += 1
+                chunk, chunk_duration = [], 0.0
+            chunk.append(nodeid)
+            chunk_duration += estimates[nodeid]
+        units[f"group:{group}#{index}"] = dict.fromkeys(chunk, False)
+
+    return OrderedDict(sorted(
+        units.items(), key=lambda item: sum(estimates[nodeid] for nodeid in item[1]), reverse=True
+    ))
+
+
+class DurationScheduling(LoadScopeScheduling):
+    """
+    按耗时调度：每个工作单元是一个测试，或共享同一昂贵 fixture 的一组测试（的一块，见 build_work_units）；
+    单元按预计耗时从长到短排队，worker 只预取一个单元，空闲时领取下一个最长的单元。
+    """
+
+    def __init__(self, config, store: DurationStore, log=None):
+        super().__init__(config, log)
+        self.store = store
+        # nodeid -> 工作单元名（mark_test_complete 通过 _split_scope 查找）
+        self._unit_of: Dict[str, str] = {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        return self._unit_of.get(nodeid, nodeid)
+
+    def _reschedule(self, node):
+        if node.shutting_down:
+            return
+        if not self.workqueue:
+            node.shutdown()
+            return
+        # 只保留一个排队单元，长单元不会被提前分给已有积压的 worker
+        if self._pending_of(self.assigned_work[node]) > 1:
+            return
+        self._assign_work_unit(node)
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self._reschedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(next(iter(self.registered_collections.values())))
+        if not self.collection:
+            return
+
+        self.workqueue = build_work_units(self.collection, self.store, len(self.nodes))
+        self._unit_of = {nodeid: unit for unit, work in self.workqueue.items() for nodeid in work}
+
+        extra_nodes = len(self.nodes) - len(self.workqueue)
+        for _ in range(max(0, extra_nodes)):
+            unused_node, _assigned = self.assigned_work.popitem()
+            unused_node.shutdown()
+
+        for node in self.nodes:
+            self._assign_work_unit(node)
+        for node in self.nodes:
+            self._reschedule(node)
+        if not self.workqueue:
+            for node in self.nodes:
+                node.shutdown()
+
+
+class ScheduleRecorder:
+    """记录一次并行运行的完成时间（makespan）和 worker 空闲情况，用于对比调度方式"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        # 从第一个测试开始执行时计时，不含 worker 启动和收集耗时
+        self.start: Optional[float] = None
+        self.busy: Dict[str, float] = {}
+        self.finished: Dict[str, float] = {}
+        self.longest = 0.0
+
+    def observe(self, report):
+        """累计 worker 的忙碌时间（xdist controller 收到的报告带有 node 属性）"""
+        node = getattr(report, "node", None)
+        if node is None:
+            return
+        worker = node.gateway.id
+        now = time.time()
+        if self.start is None or now - report.duration < self.start:
+            self.start = now - report.duration
+        self.busy[worker] = self.busy.get(worker, 0.0) + report.duration
+        self.finished[worker] = now
+        if report.when == "call":
+            self.longest = max(self.longest, report.duration)
+
+    def finish(self, output_file: Path) -> Optional[Dict[str, Any]]:
+        """计算并保存调度统计"""
+        if not self.finished:
+            return None
+        makespan = max(self.finished.values()) - self.start
+        workers = len(self.busy)
+        total = sum(self.busy.values())
+        result = {
+            "mode": self.mode,
+            "workers": workers,
+            "makespan_s": round(makespan, 2),
+            "busy_s": round(total, 2),
+            "idle_pct": f"{(1 - total / (makespan * workers)) * 100:.1f}" if makespan > 0 else "0.0",
+            # 理论下限：平均负载和最长单个测试中的较大者
+            "lower_bound_s": round(max(total / workers, self.longest), 2),
+            "tail_s": round(max(self.finished.values()) - min(self.finished.values()), 2),
+        }
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        session_stats.record("scheduling", {key: str(value) for key, value in result.items()})
+        return result
+
+
+def _format_schedule_stats(stats: Dict[str, Any]) -> List[str]:
+    """调度终端摘要"""
+    return [
+        f"调度: {stats.get('mode')}, worker: {stats.get('workers')}, 完成时间: {stats.get('makespan_s')}s "
+        f"(理论下限 {stats.get('lower_bound_s')}s), worker 空闲: {stats.get('idle_pct')}%, "
+        f"最早与最晚结束的 worker 相差: {stats.get('tail_s')}s",
+    ]
+
+
+session_stats.register_formatter("scheduling", _format_schedule_stats)
@@ -0,0 +1,47 @@
+"""
+跨进程文件锁
+xdist worker 之间互斥访问共享文件（登录态缓存、HAR 存档合并、数据集索引、测试影响映射等）。
+"""
+import os
+import time
+from pathlib import Path
+
+
+class FileLock:
+    """基于 O_EXCL 的跨进程文件锁（兼容 Windows）"""
+
+    def __init__(self, path: Path, timeout: float = 120, stale: float = 300):
+        """
+        Args:
+            path: 锁文件路径
+            timeout: 获取锁的超时时间（秒）
+            stale: 锁文件超过该时间（秒）视为残留锁并清理
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale = stale
+
+    def __enter__(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale:
+                        self.path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"获取文件锁超时: {self.path}")
+                time.sleep(0.1)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
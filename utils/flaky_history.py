@@ -0,0 +1,208 @@
+"""
+测试结果历史库
+以 SQLite 记录每次运行中每个测试（按 nodeid）的结果、重跑、耗时和错误签名，
+据此决定重跑策略：有不稳定历史的测试才重跑，确定性失败的测试不重跑、立即失败。
+每个测试只保留最近 window 次运行的记录（写入结果的进程在关闭时删除更早的记录）。
+"""
+import hashlib
+import re
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from utils.session_stats import session_stats
+
+# 计算错误签名前去掉的易变内容：内存地址、数字、引号中的值
+_VOLATILE = re.compile(r"0x[0-9a-f]+|\d+(\.\d+)?|'[^']*'|\"[^\"]*\"", re.IGNORECASE)
+
+# 每个测试的运行按开始时间从新到旧编号（recent = 1 为最近一次运行）
+_RANKED_RUNS = (
+    "WITH runs AS ("
+    "SELECT nodeid, run_id, MIN(created) AS started FROM results {where} GROUP BY nodeid, run_id"
+    "), ranked AS ("
+    "SELECT nodeid, run_id, started, "
+    "ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY started DESC) AS recent FROM runs"
+    ") "
+)
+
+
+def error_signature(longrepr: str) -> Optional[str]:
+    """
+    计算错误签名：取最后一行 "E   ..." 错误信息（没有时取最后一行），去掉易变内容后哈希
+
+    Returns:
+        10 位签名，没有错误信息时返回 None
+    """
+    lines = [line.strip() for line in longrepr.splitlines() if line.strip()]
+    if not lines:
+        return None
+    error_lines = [line for line in lines if line.startswith("E ")]
+    message = (error_lines[0] if error_lines else lines[-1])[:300]
+    return hashlib.sha1(_VOLATILE.sub("#", message).encode("utf-8")).hexdigest()[:10]
+
+
+class FlakyHistory:
+    """测试结果历史库"""
+
+    # 重跑策略
+    FLAKY = "flaky"  # 有不稳定历史：重跑
+    NEW = "new"  # 历史不足：少量重跑，用于发现不稳定
+    STABLE = "stable"  # 历史稳定：不重跑
+    DETERMINISTIC = "deterministic"  # 最近连续以相同错误失败：不重跑
+
+    def __init__(self, db_path: Path, window: int = 20, min_runs: int = 3):
+        """
+        Args:
+            db_path: SQLite 数据库路径
+            window: 计算不稳定率时统计最近的运行次数
+            min_runs: 历史运行少于该次数的测试视为新测试
+        """
+        self.db_path = Path(db_path)
+        self.window = window
+        self.min_runs = min_runs
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # WAL 模式允许 worker 读取策略的同时 controller 写入结果
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "run_id TEXT, nodeid TEXT, phase TEXT, attempt INTEGER, outcome TEXT, "
+            "duration REAL, signature TEXT, message TEXT, created REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_nodeid ON results(nodeid, created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_run ON results(nodeid, run_id)")
+        self.stats: Dict[str, Any] = {"recorded": 0, "flaky_this_run": {}}
+
+    def record(self, report):
+        """
+        记录一个阶段的报告（call 阶段，以及失败或跳过的 setup/teardown 阶段）
+
+        Args:
+            report: pytest TestReport（重跑中间结果的 outcome 为 rerun，attempt 取自 report.rerun）
+        """
+        if report.when != "call" and report.outcome == "passed":
+            return
+        longrepr = report.longreprtext if report.outcome in ("failed", "rerun") else ""
+        attempt = getattr(report, "rerun", 0)
+        message = next(
+            (line.strip() for line in longrepr.splitlines() if line.strip().startswith("E ")), longrepr[-300:]
+        )
+        self._conn.execute(
+            "INSERT INTO results (run_id, nodeid, phase, attempt, outcome, duration, signature, message, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.run_id, report.nodeid, report.when, attempt, report.outcome, report.duration,
+             error_signature(longrepr), message[:300], time.time()),
+        )
+        self.stats["recorded"] += 1
+        # 重跑后通过：本次运行中表现出不稳定
+        if report.when == "call" and report.outcome == "passed" and attempt > 0:
+            self.stats["flaky_this_run"][report.nodeid] = str(attempt)
+
+    def _runs(self, nodeid: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """按测试汇总最近 window 次运行：每次运行的最终结果、是否重跑后通过和失败签名"""
+        where, params = ("WHERE nodeid = ?", (nodeid,)) if nodeid is not None else ("", ())
+        query = _RANKED_RUNS.format(where=where) + (
+            "SELECT r.nodeid, r.run_id, r.attempt, r.outcome, r.signature, r.message, r.duration "
+            "FROM results r JOIN ranked k ON r.nodeid = k.nodeid AND r.run_id = k.run_id "
+            "WHERE k.recent <= ? ORDER BY k.started, r.created"
+        )
+        params += (self.window,)
+
+        runs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for node, run_id, attempt, outcome, signature, message, duration in self._conn.execute(query, params):
+            run = runs.setdefault(node, {}).setdefault(
+                run_id, {"outcome": "passed", "reruns": 0, "signature": None, "message": "", "duration": 0.0}
+            )
+            run["duration"] += duration or 0
+            if outcome == "rerun":
+                run["reruns"] = max(run["reruns"], attempt + 1)
+                run["signature"], run["message"] = signature, message
+            elif outcome in ("failed", "skipped"):
+                run["outcome"] = outcome
+                if outcome == "failed":
+                    run["signature"], run["message"] = signature, message
+        # 字典保持插入顺序，即按时间排序
+        return {node: list(node_runs.values()) for node, node_runs in runs.items()}
+
+    def summarize(self, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """汇总单个测试的历史运行"""
+        executed = [run for run in runs if run["outcome"] != "skipped"]
+        failed = [run for run in executed if run["outcome"] == "failed"]
+        # 重跑后通过，或不同运行间有通过也有失败
+        flaky = [run for run in executed if run["outcome"] == "passed" and run["reruns"]]
+        mixed = bool(failed) and len(failed) < len(executed)
+        last = executed[-self.min_runs:]
+        deterministic = (
+            len(last) == self.min_runs
+            and all(run["outcome"] == "failed" for run in last)
+            and len({run["signature"] for run in last}) == 1
+        )
+        if len(executed) < self.min_runs and not flaky:
+            policy = self.NEW
+        elif deterministic:
+            policy = self.DETERMINISTIC
+        elif flaky or mixed:
+            policy = self.FLAKY
+        else:
+            policy = self.STABLE
+        return {
+            "runs": len(executed),
+            "failed": len(failed),
+            "flaky": len(flaky),
+            "flake_rate": (len(flaky) + (len(failed) if mixed else 0)) / len(executed) if executed else 0.0,
+            "avg_duration": sum(run["duration"] for run in executed) / len(executed) if executed else 0.0,
+            "last_error": failed[-1]["message"] if failed else "",
+            "policy": policy,
+        }
+
+    def policies(self) -> Dict[str, str]:
+        """全部有历史的测试的重跑策略（没有历史的测试为 NEW）"""
+        return {node: self.summarize(runs)["policy"] for node, runs in self._runs().items()}
+
+    def report(self) -> List[Dict[str, Any]]:
+        """不稳定率报告，按不稳定率和失败次数降序"""
+        rows = [dict(self.summarize(runs), nodeid=node) for node, runs in self._runs().items()]
+        return sorted(rows, key=lambda row: (row["flake_rate"], row["failed"]), reverse=True)
+
+    def prune(self) -> int:
+        """
+        删除每个测试最近 window 次运行之前的记录
+
+        Returns:
+            删除的记录数
+        """
+        cursor = self._conn.execute(
+            "DELETE FROM results WHERE rowid IN ("
+            + _RANKED_RUNS.format(where="")
+            + "SELECT r.rowid FROM results r JOIN ranked k ON r.nodeid = k.nodeid AND r.run_id = k.run_id "
+            "WHERE k.recent > ?)",
+            (self.window,),
+        )
+        return cursor.rowcount
+
+    def close(self):
+        """删除窗口之外的旧记录（仅写入了结果的进程），关闭数据库并登记会话统计"""
+        if self.stats["recorded"]:
+            try:
+                self.prune()
+            except sqlite3.Error as e:
+                logger.warning(f"清理测试结果历史失败: {e}")
+        self._conn.close()
+        if self.stats["recorded"]:
+            session_stats.record("flaky_history", self.stats)
+
+
+def _format_flaky_stats(stats: Dict[str, Any]) -> List[str]:
+    """结果历史终端摘要"""
+    flaky = stats.get("flaky_this_run", {})
+    lines = [f"已记录结果: {stats.get('recorded', 0)}, 本次重跑后通过（不稳定）: {len(flaky)}"]
+    lines.extend(f"  {nodeid}: 第 {attempt} 次重跑通过" for nodeid, attempt in sorted(flaky.items()))
+    return lines
+
+
+session_stats.register_formatter("flaky_history", _format_flaky_stats)
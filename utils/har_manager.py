@@ -0,0 +1,258 @@
+"""
+HAR 录制/回放工具
+record 模式把每个测试（或通过 @pytest.mark.har("名称") 共享的）网络请求录制为 HAR 存档，
+replay 模式从存档回放全部请求而不访问网络，未命中的请求按配置的策略处理。
+共享存档由每个测试各自录制的分片（<名称>.parts/）在会话结束时加锁合并，多个测试和 xdist worker 互不覆盖。
+"""
+import json
+import os
+import re
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+from playwright.sync_api import BrowserContext, Route
+
+from utils.file_lock import FileLock
+from utils.session_stats import session_stats
+
+
+class HarSession:
+    """单个上下文的 HAR 录制/回放状态"""
+
+    def __init__(self, mode: str, path: Path, not_found: str = "abort", part: Optional[Path] = None):
+        self.mode = mode
+        self.path = path
+        self.not_found = not_found
+        # 共享存档录制时本测试的分片（上下文关闭后写入临时文件，finish 时改名）
+        self.part = part
+        self.unmatched: List[str] = []
+
+    def on_unmatched(self, route: Route):
+        """回放时 HAR 路由未命中而回退的请求：记录后按策略放行到网络或中止"""
+        self.unmatched.append(route.request.url)
+        if self.not_found == "fallback":
+            route.fallback()
+        else:
+            route.abort()
+
+
+def _har_member(archive: zipfile.ZipFile) -> str:
+    return next(name for name in archive.namelist() if name.endswith(".har"))
+
+
+def merge_archives(parts: Iterable[Path], output: Path) -> int:
+    """
+    合并多个 HAR zip 存档（按分片修改时间顺序，相同请求以后录制的为准）
+
+    Args:
+        parts: 分片存档
+        output: 合并后的存档
+
+    Returns:
+        合并后的请求条目数
+    """
+    entries: Dict[tuple, Dict[str, Any]] = {}
+    pages: Dict[str, Dict[str, Any]] = {}
+    log: Dict[str, Any] = {}
+    tmp_output = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    written: Set[str] = set()
+    with zipfile.ZipFile(tmp_output, "w", zipfile.ZIP_DEFLATED) as merged:
+        for part in sorted(parts, key=lambda path: path.stat().st_mtime_ns):
+            try:
+                archive = zipfile.ZipFile(part)
+            except (zipfile.BadZipFile, OSError) as e:
+                logger.warning(f"HAR 分片无法读取，跳过: {part}, {e}")
+                continue
+            with archive:
+                har_name = _har_member(archive)
+                har = json.loads(archive.read(har_name))
+                log = log or {key: value for key, value in har["log"].items() if key not in ("entries", "pages")}
+                for page in har["log"].get("pages", []):
+                    pages[page["id"]] = page
+                for entry in har["log"].get("entries", []):
+                    request = entry["request"]
+                    key = (request["method"], request["url"], (request.get("postData") or {}).get("text"))
+                    entries.pop(key, None)
+                    entries[key] = entry
+                # 响应内容按 sha1 命名，同名即同内容
+                for name in archive.namelist():
+                    if name != har_name and name not in written:
+                        merged.writestr(name, archive.read(name))
+                        written.add(name)
+        log["entries"] = list(entries.values())
+        if pages:
+            log["pages"] = list(pages.values())
+        merged.writestr("har.har", json.dumps({"log": log}, ensure_ascii=False))
+    os.replace(tmp_output, output)
+    return len(entries)
+
+
+class HarManager:
+    """HAR 存档管理器"""
+
+    MODES = ("off", "record", "replay")
+    NOT_FOUND_POLICIES = ("abort", "fallback", "error")
+
+    def __init__(
+        self,
+        mode: str,
+        har_dir: Path,
+        not_found: str = "abort",
+        max_age_days: int = 30,
+        url_filter: Optional[str] = None,
+    ):
+        """
+        Args:
+            mode: off / record / replay
+            har_dir: 存档目录
+            not_found: 回放时未命中请求的处理策略
+                abort: 中止请求（完全离线）
+                fallback: 放行到网络
+                error: 中止请求，并在测试结束时报错
+            max_age_days: 存档超过该天数视为过期并提示重新录制
+            url_filter: 只录制/回放匹配该通配符的请求，为空时处理全部请求
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的 HAR 模式: {mode}，可选: {', '.join(self.MODES)}")
+        if not_found not in self.NOT_FOUND_POLICIES:
+            raise ValueError(f"不支持的未命中策略: {not_found}，可选: {', '.join(self.NOT_FOUND_POLICIES)}")
+        self.mode = mode
+        self.har_dir = Path(har_dir)
+        self.not_found = not_found
+        self.max_age_days = max_age_days
+        self.url_filter = url_filter
+        self.stats: Dict[str, Any] = {"recorded": 0, "replayed": 0, "unmatched": 0, "missing": 0, "stale": {}}
+        # 本进程录制过分片的共享存档
+        self._shared_archives: Set[Path] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def archive_path(self, nodeid: str, name: Optional[str] = None) -> Path:
+        """
+        计算存档路径
+
+        Args:
+            nodeid: 测试 nodeid
+            name: 共享存档名称（如按页面对象命名），为空时每个测试一个存档
+
+        Returns:
+            存档路径（.zip 格式，响应内容以附件形式保存）
+        """
+        safe_key = re.sub(r"[^\w.-]+", "_", name or nodeid).strip("_")
+        return self.har_dir / f"{safe_key}.har.zip"
+
+    def attach(self, context: BrowserContext, nodeid: str, name: Optional[str] = None) -> Optional[HarSession]:
+        """
+        在上下文上启用录制或回放
+
+        Returns:
+            HarSession，需在测试结束后传给 finish；未启用或回放存档缺失且允许联网时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        path = self.archive_path(nodeid, name)
+        options = {"url": self.url_filter} if self.url_filter else {}
+        if self.mode == "record":
+            part = None
+            target = path
+            if name:
+                # 共享存档：每个测试录制到自己的分片，会话结束时合并（直接录制到同一文件时后关闭的上下文会覆盖之前的内容）
+                part = self.part_dir(path) / self.archive_path(nodeid).name
+                target = self._recording_path(part)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # update=True 时在上下文关闭时写入存档
+            context.route_from_har(target, update=True, update_mode="minimal", **options)
+            logger.debug(f"HAR 录制: {target}")
+            return HarSession(self.mode, path, part=part)
+
+        if not path.exists():
+            self.stats["missing"] += 1
+            if self.not_found == "fallback":
+                logger.warning(f"HAR 存档不存在，使用网络: {path}")
+                return None
+            raise FileNotFoundError(f"HAR 存档不存在: {path}，请先使用 --har-mode=record 录制")
+
+        age_days = (time.time() - path.stat().st_mtime) / 86400
+        if age_days > self.max_age_days:
+            # 以字符串保存，合并多个 worker 的统计时不会被累加
+            self.stats["stale"][path.name] = f"{age_days:.1f}"
+            logger.warning(f"HAR 存档已过期（{age_days:.0f} 天），建议重新录制: {path}")
+
+        session = HarSession(self.mode, path, self.not_found)
+        # 后注册的路由先执行：HAR 路由未命中时回退到这里，只有这些请求计为未命中
+        context.route(self.url_filter or "**/*", session.on_unmatched)
+        context.route_from_har(path, not_found="fallback", **options)
+        logger.debug(f"HAR 回放: {path}")
+        return session
+
+    @staticmethod
+    def part_dir(path: Path) -> Path:
+        """共享存档的分片目录"""
+        return path.with_name(path.name[:-len(".har.zip")] + ".parts")
+
+    @staticmethod
+    def _recording_path(part: Path) -> Path:
+        """录制中的分片（仍以 .zip 结尾，Playwright 按扩展名选择 zip 格式；以 . 开头，合并时跳过）"""
+        return part.with_name(f".{os.getpid()}-{part.name}")
+
+    def finish(self, session: Optional[HarSession]):
+        """
+        测试结束后统计；未命中策略为 error 时存在未命中请求会抛出异常（需在上下文关闭后调用）
+        """
+        if session is None:
+            return
+        if session.mode == "record":
+            if session.part is not None:
+                recorded = self._recording_path(session.part)
+                if recorded.exists():
+                    os.replace(recorded, session.part)
+                    self._shared_archives.add(session.path)
+            self.stats["recorded"] += 1
+            return
+
+        self.stats["replayed"] += 1
+        self.stats["unmatched"] += len(session.unmatched)
+        if session.unmatched:
+            logger.warning(f"HAR 回放未命中 {len(session.unmatched)} 个请求: {session.unmatched[:5]}")
+            if self.not_found == "error":
+                raise AssertionError(
+                    f"HAR 存档 {session.path.name} 未包含以下请求，请重新录制: {session.unmatched[:5]}"
+                )
+
+    def merge_shared(self):
+        """把分片合并为共享存档（文件锁串行，最后结束的 worker 合并结果包含全部分片）"""
+        for path in sorted(self._shared_archives):
+            with FileLock(path.with_name(path.name + ".lock")):
+                parts = [part for part in self.part_dir(path).glob("*.har.zip") if not part.name.startswith(".")]
+                count = merge_archives(parts, path)
+            logger.info(f"HAR 共享存档已合并: {path}（{len(parts)} 个分片，{count} 个请求）")
+        self._shared_archives.clear()
+
+    def close(self):
+        """合并共享存档并登记会话统计"""
+        if self.mode == "record":
+            self.merge_shared()
+        if self.enabled:
+            session_stats.record("har", self.stats)
+
+
+def _format_har_stats(stats: Dict[str, Any]) -> List[str]:
+    """HAR 终端摘要"""
+    lines = [
+        f"录制: {stats.get('recorded', 0)}, 回放: {stats.get('replayed', 0)}, "
+        f"回放未命中请求: {stats.get('unmatched', 0)}, 缺失存档: {stats.get('missing', 0)}"
+    ]
+    stale = stats.get("stale", {})
+    if stale:
+        lines.append(f"过期存档 {len(stale)} 个（建议重新录制）:")
+        lines.extend(f"  {name}: {days} 天" for name, days in sorted(stale.items()))
+    return lines
+
+
+session_stats.register_formatter("har", _format_har_stats)
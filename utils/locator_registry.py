@@ -0,0 +1,77 @@
+"""
+声明式定位器注册
+页面对象在类属性中声明定位器规格，首次访问时按页面对象实例解析为 Locator 并缓存到实例上，
+之后的访问是普通的实例属性读取，不再经过描述符。
+Locator 本身是惰性的，每次操作时才在页面中查找元素，因此缓存在页面跳转或 DOM 更新后仍然有效。
+"""
+from typing import Any, Dict, Tuple
+
+
+class Loc:
+    """
+    定位器规格（非数据描述符，与 functools.cached_property 的缓存方式相同）
+
+    Example:
+        class LoginPage(BasePage):
+            username = Loc.label("Username")
+            submit = Loc.role("button", name="Sign in")
+
+        login_page.submit.click()
+    """
+
+    __slots__ = ("method", "args", "kwargs", "name")
+
+    def __init__(self, method: str, *args: Any, **kwargs: Any):
+        """
+        Args:
+            method: Page 上创建 Locator 的方法名（locator、get_by_role、get_by_text 等）
+            *args: 方法的位置参数
+            **kwargs: 方法的关键字参数
+        """
+        self.method = method
+        self.args: Tuple[Any, ...] = args
+        self.kwargs: Dict[str, Any] = kwargs
+        self.name = None
+
+    @classmethod
+    def css(cls, selector: str) -> "Loc":
+        return cls("locator", selector)
+
+    @classmethod
+    def role(cls, role: str, **kwargs: Any) -> "Loc":
+        return cls("get_by_role", role, **kwargs)
+
+    @classmethod
+    def text(cls, text: str, exact: bool = False) -> "Loc":
+        return cls("get_by_text", text, exact=exact)
+
+    @classmethod
+    def label(cls, text: str, exact: bool = False) -> "Loc":
+        return cls("get_by_label", text, exact=exact)
+
+    @classmethod
+    def placeholder(cls, text: str, exact: bool = False) -> "Loc":
+        return cls("get_by_placeholder", text, exact=exact)
+
+    @classmethod
+    def test_id(cls, test_id: str) -> "Loc":
+        return cls("get_by_test_id", test_id)
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def resolve(self, page):
+        """在页面上创建 Locator"""
+        return getattr(page, self.method)(*self.args, **self.kwargs)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        locator = self.resolve(instance.page)
+        # 写入实例字典后，同名属性直接从实例读取
+        instance.__dict__[self.name] = locator
+        return locator
+
+    def __repr__(self) -> str:
+        params = [repr(arg) for arg in self.args] + [f"{key}={value!r}" for key, value in self.kwargs.items()]
+        return f"Loc.{self.method}({', '.join(params)})"
@@ -1,17 +1,130 @@
 """
 日志配置工具
+LOG_FORMAT=text：按天轮转的文本日志 logs/test_YYYYMMDD.log（同步写入）。
+LOG_FORMAT=json：每个进程（xdist worker）一个 JSON lines 文件 logs/json/<运行 ID>/<worker>.jsonl，
+调用方只把日志记录放入队列，序列化和写盘由后台线程完成；每行带测试 nodeid 和页面操作字段，
+会话结束后由 controller 按时间合并为 merged.jsonl。
+低于 LOG_LEVEL（及控制台 INFO）的日志在 loguru 入口直接返回，使用 logger.debug("...{target}", target=...)
+而不是 f-string 时不会格式化消息。
 """
+import heapq
+import json
+import os
+import queue
+import shutil
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 from loguru import logger
 from datetime import datetime
 
+from utils.action_timing import describe
 
-def setup_logger():
-    """配置日志系统"""
+# 合并后的文件名（合并时跳过）
+MERGED_FILE = "merged.jsonl"
+# JSON 日志按运行 ID 分目录，保留天数
+JSON_RETENTION_DAYS = 30
+
+_json_sink: Optional["JsonLinesSink"] = None
+
+
+class JsonLinesSink:
+    """
+    基于队列的非阻塞 JSON lines 文件 sink
+    loguru 的 enqueue=True 会在调用线程 pickle 整条记录并写入管道（比同步写文件更慢），
+    这里在进程内队列中传递记录，后台线程完成 JSON 序列化和写盘，队列空时刷新文件。
+    """
+
+    def __init__(self, path, worker: str):
+        self.path = Path(path)
+        self.worker = worker
+        self.written = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{worker}", daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        """loguru 调用（调用线程只入队）"""
+        self._queue.put(message.record)
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """等待此前入队的日志全部写入文件"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self):
+        """logger.remove() 时调用：写完剩余日志后结束后台线程"""
+        self._queue.put(None)
+        self._thread.join(5.0)
+
+    def _serialize(self, record) -> str:
+        entry = {
+            "time": record["time"].isoformat(timespec="microseconds"),
+            "level": record["level"].name,
+            "worker": self.worker,
+            "message": record["message"],
+            "location": f"{record['name']}:{record['function']}:{record['line']}",
+        }
+        for key, value in record["extra"].items():
+            entry[key] = value if value is None or isinstance(value, (str, int, float, bool)) else describe(value)
+        if record["exception"] is not None:
+            type_, value, _ = record["exception"]
+            entry["exception"] = f"{getattr(type_, '__name__', type_)}: {value}"
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+    def _run(self):
+        file = None
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                if isinstance(record, threading.Event):
+                    if file is not None:
+                        file.flush()
+                    record.set()
+                    continue
+                try:
+                    line = self._serialize(record)
+                except Exception as e:
+                    line = json.dumps({"time": record["time"].isoformat(timespec="microseconds"), "level": "ERROR",
+                                       "worker": self.worker, "message": f"日志序列化失败: {e}"}, ensure_ascii=False)
+                if file is None:
+                    # 第一条日志写入时才创建目录和文件
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    file = open(self.path, "a", encoding="utf-8")
+                file.write(line + "\n")
+                self.written += 1
+                if self._queue.empty():
+                    file.flush()
+        finally:
+            if file is not None:
+                file.close()
+
+
+def json_log_dir(run_id: str) -> Path:
+    """运行 ID 对应的 JSON 日志目录"""
+    from config.settings import Settings
+    return Settings.LOGS_DIR / "json" / run_id
+
+
+def setup_logger(run_id: Optional[str] = None, worker: Optional[str] = None):
+    """
+    配置日志系统
+
+    Args:
+        run_id: 运行 ID（JSON 日志目录名，xdist worker 使用 controller 的 ID），默认当前时间
+        worker: 进程标识（xdist worker ID），默认读取 PYTEST_XDIST_WORKER，未并行时为 main
+    """
+    from config.settings import Settings
+    global _json_sink
     # 移除默认处理器
     logger.remove()
-    
+    _json_sink = None
+
     # 控制台输出 - 彩色格式
     logger.add(
         sys.stdout,
@@ -19,21 +132,77 @@ def setup_logger():
         level="INFO",
         colorize=True,
     )
-    
-    # 文件输出 - 详细格式
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    log_file = log_dir / f"test_{datetime.now().strftime('%Y%m%d')}.log"
+
+    if Settings.LOG_FORMAT == "json":
+        worker = worker or os.environ.get("PYTEST_XDIST_WORKER") or "main"
+        run_dir = json_log_dir(run_id or datetime.now().strftime("%Y%m%d_%H%M%S"))
+        _json_sink = JsonLinesSink(run_dir / f"{worker}.jsonl", worker)
+        logger.add(_json_sink, format="{message}", level=Settings.LOG_LEVEL, catch=True)
+        return
+
+    # 文件输出 - 详细格式（delay: 第一条日志写入时才创建目录和文件）
+    log_file = Path("logs") / f"test_{datetime.now().strftime('%Y%m%d')}.log"
     logger.add(
         log_file,
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="DEBUG",
+        level=Settings.LOG_LEVEL,
         rotation="00:00",  # 每天午夜轮转
         retention="30 days",  # 保留30天
         compression="zip",  # 压缩旧日志
         encoding="utf-8",
+        delay=True,
     )
-    
-    logger.info("日志系统初始化完成")
+
+
+def drain_logger(timeout: float = 5.0):
+    """等待 JSON 日志写入文件（xdist worker 在会话结束、controller 合并之前调用）"""
+    if _json_sink is not None:
+        _json_sink.drain(timeout)
+
+
+def _timed_lines(path: Path, index: int) -> Iterator[Tuple[str, int, str]]:
+    """逐行读取日志文件，返回 (时间, 文件序号, 行)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line).get("time", ""), index, line if line.endswith("\n") else line + "\n"
+
+
+def merge_logs(run_dir, output=None) -> Optional[Path]:
+    """
+    按时间合并各进程的 JSON lines 日志
+    每个文件由单个后台线程按入队顺序写入，基本按时间有序，这里逐行归并，不整体加载
+
+    Args:
+        run_dir: 运行 ID 对应的日志目录
+        output: 输出文件，默认 run_dir/merged.jsonl
+
+    Returns:
+        合并后的文件路径，没有日志时返回 None
+    """
+    run_dir = Path(run_dir)
+    files: List[Path] = sorted(path for path in run_dir.glob("*.jsonl") if path.name != MERGED_FILE)
+    if not files:
+        return None
+    output = Path(output) if output else run_dir / MERGED_FILE
+    # ISO 时间带相同时区偏移，按字符串比较即按时间排序
+    streams = [_timed_lines(path, index) for index, path in enumerate(files)]
+    tmp_output = output.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_output, "w", encoding="utf-8") as f:
+        for _, _, line in heapq.merge(*streams):
+            f.write(line)
+    os.replace(tmp_output, output)
+    return output
+
+
+def prune_logs(retention_days: int = JSON_RETENTION_DAYS):
+    """删除超过保留天数的 JSON 日志目录"""
+    from config.settings import Settings
+    root = Settings.LOGS_DIR / "json"
+    if not root.is_dir():
+        return
+    deadline = time.time() - retention_days * 86400
+    for run_dir in root.iterdir():
+        if run_dir.is_dir() and run_dir.stat().st_mtime < deadline:
+            shutil.rmtree(run_dir, ignore_errors=True)
 
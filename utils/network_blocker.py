@@ -0,0 +1,166 @@
+"""
+网络请求拦截工具
+按 Settings.BLOCK_PROFILES 中的配置，通过 context.route 拦截断言用不到的资源
+（图片、字体、统计脚本等），并统计每个测试拦截的请求数和节省的字节数。
+"""
+import json
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from playwright.sync_api import BrowserContext, Route, Response
+
+from utils.session_stats import session_stats
+
+
+class ResourceSizeTable:
+    """
+    资源大小表 - 记录已观察到的响应大小（content-length），
+    用于估算被拦截请求节省的字节数，跨运行持久化。
+    被拦截的请求不会产生响应，因此每个上下文（无论是否启用拦截）都要注册观察，
+    不拦截的运行中学到的大小供之后拦截时估算。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._sizes: Dict[str, int] = {}
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._sizes = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, url: str) -> Optional[int]:
+        return self._sizes.get(url)
+
+    def observe(self, response: Response):
+        """记录响应大小（只读取响应头，不产生额外的驱动往返；主文档不会被拦截，不记录）"""
+        if response.request.resource_type == "document":
+            return
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and self._sizes.get(response.url) != int(length):
+            self._sizes[response.url] = int(length)
+            self._dirty = True
+
+    def attach(self, context: BrowserContext):
+        """在上下文上观察响应大小"""
+        context.on("response", self.observe)
+
+    def detach(self, context: BrowserContext):
+        """停止观察（复用上下文前必须调用）"""
+        context.remove_listener("response", self.observe)
+
+    def save(self):
+        """持久化（合并其他 worker 已写入的数据）"""
+        if not self._dirty:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                merged = json.load(f)
+        except (FileNotFoundError, ValueError):
+            merged = {}
+        merged.update(self._sizes)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+class NetworkBlocker:
+    """按拦截配置拦截请求"""
+
+    def __init__(self, name: str, profile: Dict[str, Any], size_table: Optional[ResourceSizeTable] = None):
+        """
+        Args:
+            name: 配置名称
+            profile: 拦截配置
+                resource_types: 拦截的资源类型（image, media, font, stylesheet, script 等）
+                deny: 拦截的URL通配符列表（fnmatch 语法）
+                allow: 始终放行的URL通配符列表，优先级高于 resource_types 和 deny
+            size_table: 资源大小表，用于估算节省的字节数
+        """
+        self.name = name
+        self.resource_types = set(profile.get("resource_types", []))
+        self.deny: List[str] = profile.get("deny", [])
+        self.allow: List[str] = profile.get("allow", [])
+        self.size_table = size_table
+        self._context: Optional[BrowserContext] = None
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.unknown_size = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.deny)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """判断请求是否需要拦截（主文档请求始终放行）"""
+        if resource_type == "document":
+            return False
+        if any(fnmatch(url, pattern) for pattern in self.allow):
+            return False
+        return resource_type in self.resource_types or any(fnmatch(url, pattern) for pattern in self.deny)
+
+    def _handle(self, route: Route):
+        request = route.request
+        if not self.should_block(request.url, request.resource_type):
+            # 交给其他路由处理器（如 HAR 回放、响应缓存）或正常发出
+            route.fallback()
+            return
+        self.blocked += 1
+        size = self.size_table.get(request.url) if self.size_table else None
+        if size is None:
+            self.unknown_size += 1
+        else:
+            self.bytes_saved += size
+        route.abort("blockedbyclient")
+
+    def attach(self, context: BrowserContext):
+        """在上下文上注册拦截路由"""
+        if not self.enabled:
+            return
+        self._context = context
+        context.route("**/*", self._handle)
+        logger.debug(f"启用请求拦截配置: {self.name}")
+
+    def detach(self) -> Dict[str, int]:
+        """
+        移除拦截路由（复用上下文前必须调用）
+
+        Returns:
+            本次测试的拦截统计
+        """
+        if self._context is not None:
+            self._context.unroute("**/*", self._handle)
+            self._context = None
+        return {"blocked": self.blocked, "bytes_saved": self.bytes_saved, "unknown_size": self.unknown_size}
+
+
+def record_blocking_stats(nodeid: str, stats: Dict[str, int]):
+    """登记单个测试的拦截统计"""
+    session_stats.record("network_blocking", {
+        "blocked": stats["blocked"],
+        "bytes_saved": stats["bytes_saved"],
+        "unknown_size": stats["unknown_size"],
+        "tests": {nodeid: {"blocked": stats["blocked"], "bytes_saved": stats["bytes_saved"]}},
+    })
+
+
+def _format_blocking_stats(stats: Dict[str, Any]) -> List[str]:
+    """请求拦截终端摘要"""
+    lines = [
+        f"拦截请求: {stats.get('blocked', 0)}, 节省字节(估算): {stats.get('bytes_saved', 0) / 1024:.1f}KB, "
+        f"大小未知: {stats.get('unknown_size', 0)}"
+    ]
+    tests = sorted(stats.get("tests", {}).items(), key=lambda kv: kv[1].get("blocked", 0), reverse=True)
+    for nodeid, test_stats in tests[:10]:
+        lines.append(f"  {nodeid}: 拦截 {test_stats['blocked']} 个, 节省 {test_stats['bytes_saved'] / 1024:.1f}KB")
+    return lines
+
+
+session_stats.register_formatter("network_blocking", _format_blocking_stats)
@@ -0,0 +1,164 @@
+"""
+网络静默等待
+按页面跟踪进行中的请求，忽略配置的 URL 通配符和资源类型（统计信标、长轮询、WebSocket 等），
+相关请求全部结束且持续静默 quiet_ms 后视为页面稳定。
+与 networkidle（所有连接静默 500ms）相比，不会被后台请求拖住，静默窗口也可以调小。
+
+跟踪器只记录状态，等待循环在 WaitUtils / AsyncWaitUtils 中分别实现（同步和异步 API 的事件对象接口一致）。
+"""
+import time
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, List, Optional
+from weakref import WeakKeyDictionary
+
+from config.settings import Settings
+from utils.session_stats import session_stats
+
+# networkidle 的静默窗口（Playwright 固定值），用于估算节省的时间
+NETWORKIDLE_MS = 500
+
+_trackers: "WeakKeyDictionary[Any, NetworkQuietTracker]" = WeakKeyDictionary()
+
+
+class NetworkQuietTracker:
+    """单个页面的进行中请求跟踪"""
+
+    def __init__(
+        self,
+        ignore_urls: Iterable[str] = (),
+        ignore_types: Iterable[str] = (),
+        long_request_ms: int = 0
+    ):
+        """
+        Args:
+            ignore_urls: 忽略的 URL 通配符
+            ignore_types: 忽略的资源类型（websocket、eventsource、media 等）
+            long_request_ms: 进行中超过该时长的请求视为长轮询，不再阻塞等待（0 表示不限）
+        """
+        self.ignore_urls = list(ignore_urls)
+        self.ignore_types = set(ignore_types)
+        self.long_request_ms = long_request_ms
+        # 相关请求 -> 开始时间
+        self._pending: Dict[Any, float] = {}
+        # 所有请求（含忽略的），用于估算 networkidle 的返回时间
+        self._all_pending = 0
+        self.last_activity = time.monotonic()
+        self.last_any_activity = self.last_activity
+
+    def attach(self, page):
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+        return self
+
+    def _ignored(self, request) -> bool:
+        if request.resource_type in self.ignore_types:
+            return True
+        url = request.url
+        return any(fnmatch(url, pattern) for pattern in self.ignore_urls)
+
+    def _on_request(self, request):
+        now = time.monotonic()
+        self._all_pending += 1
+        self.last_any_activity = now
+        if not self._ignored(request):
+            self._pending[request] = now
+            self.last_activity = now
+
+    def _on_done(self, request):
+        now = time.monotonic()
+        self._all_pending = max(self._all_pending - 1, 0)
+        self.last_any_activity = now
+        if self._pending.pop(request, None) is not None:
+            self.last_activity = now
+
+    def pending(self, now: float) -> int:
+        """阻塞等待的进行中请求数（不含超过 long_request_ms 的长请求）"""
+        if not self.long_request_ms:
+            return len(self._pending)
+        limit = self.long_request_ms / 1000
+        return sum(1 for started in self._pending.values() if now - started < limit)
+
+    def remaining_ms(self, quiet_ms: int, since: Optional[float] = None) -> Optional[float]:
+        """
+        距离页面稳定还需等待的时间
+
+        Args:
+            quiet_ms: 静默窗口（毫秒）
+            since: 等待开始时间（time.monotonic），静默至少从该时间算起
+
+        Returns:
+            还需等待的毫秒数，0 表示已稳定，None 表示仍有进行中的请求
+        """
+        now = time.monotonic()
+        if self.pending(now):
+            return None
+        quiet_since = self.last_activity if since is None else max(self.last_activity, since)
+        return max(quiet_ms - (now - quiet_since) * 1000, 0)
+
+    def networkidle_estimate(self, start: float, settled: float) -> Dict[str, Any]:
+        """
+        估算 networkidle 在同一时刻的最早返回时间（下限）
+
+        Returns:
+            {"ms": 从 start 起的估算耗时, "background": 是否仍有被忽略的请求在进行（networkidle 可能等到超时）}
+        """
+        if self._all_pending:
+            return {"ms": (settled - start) * 1000 + NETWORKIDLE_MS, "background": True}
+        idle_at = max(self.last_any_activity, start) + NETWORKIDLE_MS / 1000
+        return {"ms": (max(idle_at, settled) - start) * 1000, "background": False}
+
+
+def track(page) -> NetworkQuietTracker:
+    """
+    获取页面的跟踪器，首次调用时按 Settings 创建并监听请求事件
+    跟踪从首次调用开始，之前发出的请求不计入，因此 page fixture 创建页面后立即调用
+    """
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = NetworkQuietTracker(
+            Settings.NETWORK_QUIET_IGNORE, Settings.NETWORK_QUIET_IGNORE_TYPES, Settings.NETWORK_QUIET_LONG_REQUEST_MS
+        ).attach(page)
+        _trackers[page] = tracker
+    return tracker
+
+
+def record_wait(label: str, elapsed_ms: float, estimate: Optional[Dict[str, Any]]):
+    """
+    记录一次静默等待
+
+    Args:
+        label: 调用方（如 "IndexPage.click_big_page_link"）
+        elapsed_ms: 实际等待耗时
+        estimate: networkidle_estimate 的结果，超时为 None
+    """
+    entry: Dict[str, Any] = {"waits": 1, "elapsed_ms": elapsed_ms}
+    if estimate is None:
+        # 超时的等待 networkidle 同样等不到，按相同耗时计
+        entry["timeouts"] = 1
+        entry["networkidle_ms"] = elapsed_ms
+    else:
+        entry["networkidle_ms"] = estimate["ms"]
+        entry["background"] = int(estimate["background"])
+    session_stats.record("network_quiet", {"total": entry, "labels": {label: dict(entry)}})
+
+
+def _format_quiet_stats(stats: Dict[str, Any]) -> List[str]:
+    """网络静默等待终端摘要"""
+
+    def line(name: str, entry: Dict[str, Any]) -> str:
+        waits = entry.get("waits", 0)
+        elapsed, idle = entry.get("elapsed_ms", 0), entry.get("networkidle_ms", 0)
+        return (
+            f"{name}: {waits} 次（超时 {entry.get('timeouts', 0)}）, 耗时 {elapsed:.0f}ms, "
+            f"networkidle 估算至少 {idle:.0f}ms, 节省至少 {max(idle - elapsed, 0):.0f}ms, "
+            f"后台请求未结束 {entry.get('background', 0)} 次"
+        )
+
+    lines = [line("合计", stats.get("total", {}))]
+    for label, entry in sorted(stats.get("labels", {}).items()):
+        lines.append("  " + line(label, entry))
+    return lines
+
+
+session_stats.register_formatter("network_quiet", _format_quiet_stats)
@@ -0,0 +1,245 @@
+"""
+导航性能采集工具
+页面对象每次导航（BasePage.navigate）和点击跳转（如 IndexPage.click_big_page_link）后，
+从浏览器读取 Navigation Timing、Paint Timing、LCP/CLS、传输大小和请求数，
+追加写入每次运行一个的 JSONL 文件，并按页面对象的 PERF_BUDGET 检查性能预算。
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import Page
+
+from utils.session_stats import session_stats
+
+# 预算超出时的处理方式
+BUDGET_MODES = ("off", "warn", "fail")
+
+# 页面初始化脚本：默认的资源时序缓冲只有 250 条，资源多的页面会丢失请求
+INIT_SCRIPT = "performance.setResourceTimingBufferSize(5000);"
+
+# 读取性能数据（LCP、CLS 只能通过 buffered PerformanceObserver 获取，缓冲条目异步投递，等一个任务后读取）
+_COLLECT_SCRIPT = """
+() => new Promise((resolve) => {
+    const nav = performance.getEntriesByType("navigation")[0];
+    const paint = {};
+    for (const entry of performance.getEntriesByType("paint")) paint[entry.name] = entry.startTime;
+    const resources = performance.getEntriesByType("resource");
+    const supported = PerformanceObserver.supportedEntryTypes || [];
+    let lcp = null;
+    let cls = 0;
+    const handlers = {
+        "largest-contentful-paint": (entry) => { lcp = entry.renderTime || entry.startTime; },
+        "layout-shift": (entry) => { if (!entry.hadRecentInput) cls += entry.value; },
+    };
+    const observers = [];
+    for (const [type, handle] of Object.entries(handlers)) {
+        if (!supported.includes(type)) continue;
+        const observer = new PerformanceObserver((list) => list.getEntries().forEach(handle));
+        observer.observe({type, buffered: true});
+        observers.push([observer, handle]);
+    }
+    setTimeout(() => {
+        for (const [observer, handle] of observers) {
+            observer.takeRecords().forEach(handle);
+            observer.disconnect();
+        }
+        const ms = (value) => (value === undefined || value === null || value <= 0) ? null : Math.round(value);
+        const resourceTypes = {};
+        let transfer = nav ? nav.transferSize : 0;
+        for (const entry of resources) {
+            transfer += entry.transferSize || 0;
+            resourceTypes[entry.initiatorType] = (resourceTypes[entry.initiatorType] || 0) + 1;
+        }
+        resolve({
+            url: location.href,
+            navigation_type: nav ? nav.type : null,
+            dns_ms: nav ? Math.round(nav.domainLookupEnd - nav.domainLookupStart) : null,
+            connect_ms: nav ? Math.round(nav.connectEnd - nav.connectStart) : null,
+            ttfb_ms: nav ? ms(nav.responseStart) : null,
+            dom_content_loaded_ms: nav ? ms(nav.domContentLoadedEventEnd) : null,
+            load_ms: nav ? ms(nav.loadEventEnd || nav.loadEventStart) : null,
+            first_paint_ms: ms(paint["first-paint"]),
+            fcp_ms: ms(paint["first-contentful-paint"]),
+            lcp_ms: ms(lcp),
+            cls: Math.round(cls * 1000) / 1000,
+            requests: resources.length + (nav ? 1 : 0),
+            transfer_kb: Math.round(transfer / 1024),
+            document_kb: nav ? Math.round(nav.transferSize / 1024) : null,
+            resource_types: resourceTypes,
+        });
+    }, 0);
+})
+"""
+
+
+def check_budget(metrics: Dict[str, Any], budget: Optional[Dict[str, float]]) -> List[str]:
+    """
+    检查性能预算
+
+    Args:
+        metrics: 采集到的性能数据
+        budget: {指标名: 上限}，如 {"load_ms": 5000, "lcp_ms": 2500, "cls": 0.1}
+
+    Returns:
+        超出预算的说明列表（浏览器不支持、未采集到的指标不检查）
+    """
+    violations = []
+    for name, limit in (budget or {}).items():
+        value = metrics.get(name)
+        if isinstance(value, (int, float)) and value > limit:
+            violations.append(f"{name}={value} > {limit}")
+    return violations
+
+
+class PerfStore:
+    """每次运行一个的 JSONL 性能记录文件（xdist worker 以追加方式写入同一文件，每条记录一次写入）"""
+
+    def __init__(self, path: Path, run_id: str):
+        """
+        Args:
+            path: JSONL 文件路径
+            run_id: 运行 ID，写入每条记录
+        """
+        self.path = Path(path)
+        self.run_id = run_id
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]):
+        """追加一条记录"""
+        line = json.dumps(dict(record, run_id=self.run_id), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class PerfCollector:
+    """单个测试的导航性能记录和预算检查结果"""
+
+    def __init__(self, nodeid: str, store: PerfStore, budget_mode: str = "warn"):
+        """
+        Args:
+            nodeid: 测试 nodeid
+            store: 性能记录文件
+            budget_mode: 预算超出时的处理方式（off 不检查, warn 记录警告, fail 测试失败）
+        """
+        self.nodeid = nodeid
+        self.store = store
+        self.budget_mode = budget_mode
+        self.records: List[Dict[str, Any]] = []
+        self.violations: List[str] = []
+
+
+_current: Optional[PerfCollector] = None
+
+
+def begin_test(collector: PerfCollector):
+    """开始测试：设置当前测试的性能采集器"""
+    global _current
+    _current = collector
+
+
+def current_violations() -> List[str]:
+    """当前测试超出性能预算的说明（用于 fail 模式下把通过的测试标记为失败）"""
+    return list(_current.violations) if _current is not None else []
+
+
+def end_test() -> Optional[PerfCollector]:
+    """结束测试：登记性能统计并返回本测试的采集器"""
+    global _current
+    collector, _current = _current, None
+    if collector is None or not collector.records:
+        return collector
+    labels: Dict[str, Dict[str, Any]] = {}
+    for record in collector.records:
+        stats = labels.setdefault(record["label"], {"count": 0, "load_ms": 0, "max_lcp_ms": 0, "max_cls": 0.0})
+        stats["count"] += 1
+        stats["load_ms"] += record.get("load_ms") or 0
+        stats["max_lcp_ms"] = max(stats["max_lcp_ms"], record.get("lcp_ms") or 0)
+        stats["max_cls"] = max(stats["max_cls"], record.get("cls") or 0.0)
+    session_stats.record("perf", {
+        "navigations": len(collector.records),
+        "budget_violations": len(collector.violations),
+        "labels": labels,
+        "violations": {collector.nodeid: "; ".join(collector.violations)} if collector.violations else {},
+        "store": str(collector.store.path),
+    })
+    return collector
+
+
+def measure(page: Page, label: str, budget: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+    """
+    采集当前页面的导航性能并检查预算（未启用性能采集时直接返回）
+
+    Args:
+        page: 页面
+        label: 记录名称（页面对象和操作，如 IndexPage.navigate）
+        budget: 性能预算
+
+    Returns:
+        采集到的性能数据
+    """
+    collector = _current
+    if collector is None:
+        return None
+    start = time.perf_counter()
+    try:
+        metrics = page.evaluate(_COLLECT_SCRIPT)
+    except PlaywrightError as e:
+        logger.warning(f"性能数据采集失败: {label}: {str(e).splitlines()[0]}")
+        return None
+    violations = check_budget(metrics, budget) if collector.budget_mode != "off" else []
+    record = {
+        "nodeid": collector.nodeid,
+        "label": label,
+        "timestamp": round(time.time(), 3),
+        **metrics,
+        "budget": budget or {},
+        "budget_violations": violations,
+        "collect_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    collector.records.append(record)
+    collector.store.append(record)
+    if violations:
+        collector.violations.extend(f"{label}: {violation}" for violation in violations)
+        logger.warning(f"性能预算超出: {label}（{metrics.get('url')}）: {', '.join(violations)}")
+    else:
+        logger.debug(
+            f"导航性能: {label} load={metrics.get('load_ms')}ms lcp={metrics.get('lcp_ms')}ms "
+            f"cls={metrics.get('cls')} 请求={metrics.get('requests')} 传输={metrics.get('transfer_kb')}KB"
+        )
+    return record
+
+
+def _format_perf_stats(stats: Dict[str, Any]) -> List[str]:
+    """导航性能终端摘要"""
+    lines = [
+        f"导航: {stats.get('navigations', 0)}, 超出预算: {stats.get('budget_violations', 0)}, "
+        f"记录文件: {stats.get('store')}",
+    ]
+    for label, label_stats in sorted(stats.get("labels", {}).items()):
+        count = label_stats.get("count", 0) or 1
+        lines.append(
+            f"  {label}: {label_stats.get('count', 0)} 次, 平均 load {label_stats.get('load_ms', 0) / count:.0f}ms, "
+            f"最大 LCP {label_stats.get('max_lcp_ms', 0)}ms, 最大 CLS {label_stats.get('max_cls', 0)}"
+        )
+    for nodeid, violations in sorted(stats.get("violations", {}).items()):
+        lines.append(f"  超出预算 {nodeid}: {violations}")
+    return lines
+
+
+session_stats.register_formatter("perf", _format_perf_stats)
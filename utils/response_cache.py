@@ -0,0 +1,285 @@
+"""
+HTTP 响应缓存工具
+通过 context.route 缓存可缓存的 GET 响应（脚本、样式、图片、字体等静态资源），
+以 SQLite 保存在磁盘上，所有上下文和 xdist worker 共享，按总大小做 LRU 淘汰。
+有效期按响应头（Cache-Control 的 s-maxage/max-age、Expires，减去 Age）计算，
+没有显式有效期时按 Last-Modified 启发式估算（距今时间的 10%），均不超过配置的 ttl；
+private、no-cache、no-store 的响应不缓存（缓存在多个上下文间共享，相当于共享缓存）。
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from playwright.sync_api import BrowserContext, Route
+from playwright.sync_api import Error as PlaywrightError
+
+from utils.session_stats import session_stats
+
+# 回放时由 Playwright 重新计算或已解码，不能原样返回的响应头
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+# 数据库结构版本（不一致时重建缓存）
+_SCHEMA_VERSION = 2
+# 命中时的 last_access 更新累计到该数量后批量写入（写入缓存、移除路由和关闭时也会写入）
+_ACCESS_FLUSH_SIZE = 100
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float, max_ttl: float) -> float:
+    """
+    按响应头计算剩余有效期（秒），不可缓存时返回 0
+
+    Args:
+        headers: 响应头（小写名称）
+        now: 当前时间戳
+        max_ttl: 有效期上限
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('" ') or None
+    if {"no-store", "no-cache", "private"} & set(directives) or "set-cookie" in headers:
+        return 0
+    lifetime = None
+    for name in ("s-maxage", "max-age"):
+        value = directives.get(name)
+        if value is not None:
+            lifetime = int(value) if value.isdigit() else 0
+            break
+    date = _http_date(headers.get("date")) or now
+    if lifetime is None and "expires" in headers:
+        expires = _http_date(headers["expires"])
+        lifetime = max(0.0, expires - date) if expires is not None else 0
+    if lifetime is None:
+        last_modified = _http_date(headers.get("last-modified"))
+        lifetime = max(0.0, (date - last_modified) * 0.1) if last_modified is not None else 0
+    age = headers.get("age", "")
+    if age.isdigit():
+        lifetime -= int(age)
+    return max(0.0, min(lifetime, max_ttl))
+
+
+class ResponseCache:
+    """磁盘 LRU 响应缓存"""
+
+    def __init__(self, db_path: Path, max_bytes: int, ttl: int = 86400,
+                 resource_types: Optional[List[str]] = None):
+        """
+        Args:
+            db_path: SQLite 数据库路径
+            max_bytes: 缓存总大小上限（字节）
+            ttl: 缓存有效期上限（秒），实际有效期按响应头计算
+            resource_types: 缓存的资源类型
+        """
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.resource_types = set(resource_types or ["script", "stylesheet", "image", "font"])
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_served": 0, "fetch_errors": 0}
+        self._contexts: List[BrowserContext] = []
+        # 命中后待写入的 last_access
+        self._accessed: Dict[str, float] = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # WAL 模式允许多个 worker 并发读写；timeout 处理写锁竞争
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DROP TABLE IF EXISTS entries")
+            self._conn.execute("DROP TABLE IF EXISTS vary")
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn.execute("COMMIT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB, "
+            "size INTEGER, expires REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vary (url TEXT PRIMARY KEY, headers TEXT)")
+
+    def _vary_headers(self, url: str) -> List[str]:
+        row = self._conn.execute("SELECT headers FROM vary WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    @staticmethod
+    def _key(url: str, vary: List[str], request_headers: Dict[str, str]) -> str:
+        """缓存键：URL + Vary 响应头声明的请求头取值"""
+        parts = [url] + [f"{name}={request_headers.get(name, '')}" for name in vary]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, url: str, request_headers: Dict[str, str]) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        查询缓存
+
+        Returns:
+            (状态码, 响应头, 响应体)，未命中或已过期时返回 None
+        """
+        key = self._key(url, self._vary_headers(url), request_headers)
+        row = self._conn.execute(
+            "SELECT status, headers, body, expires FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now > row[3]:
+            return None
+        # 命中路径上不写数据库，last_access 批量更新
+        self._accessed[key] = now
+        if len(self._accessed) >= _ACCESS_FLUSH_SIZE:
+            self.flush_access()
+        return row[0], json.loads(row[1]), row[2]
+
+    def _write_access(self):
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def flush_access(self):
+        """批量写入命中后的 last_access（LRU 淘汰依据）"""
+        if not self._accessed:
+            return
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_access()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"更新响应缓存访问时间失败: {e}")
+
+    def put(self, url: str, request_headers: Dict[str, str], status: int, headers: Dict[str, str], body: bytes,
+            lifetime: Optional[float] = None):
+        """
+        写入缓存并按需淘汰最久未使用的条目
+
+        Args:
+            lifetime: 有效期（秒），默认按响应头计算，不可缓存时不写入
+        """
+        now = time.time()
+        if lifetime is None:
+            lifetime = freshness_lifetime({name.lower(): value for name, value in headers.items()}, now, self.ttl)
+        if lifetime <= 0:
+            return
+        vary = sorted(
+            name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()
+        )
+        if "*" in vary:
+            return
+        stored_headers = {name: value for name, value in headers.items() if name.lower() not in _DROP_HEADERS}
+        key = self._key(url, vary, request_headers)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 淘汰前先写入累计的访问时间
+            self._write_access()
+            self._conn.execute("INSERT OR REPLACE INTO vary (url, headers) VALUES (?, ?)", (url, json.dumps(vary)))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, url, status, headers, body, size, expires, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(stored_headers), body, len(body), now + lifetime, now),
+            )
+            self._evict()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.stats["stores"] += 1
+
+    def _evict(self):
+        """总大小超过上限时按 last_access 淘汰"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _cacheable(self, route: Route) -> bool:
+        request = route.request
+        return request.method == "GET" and request.resource_type in self.resource_types
+
+    def _handle(self, route: Route):
+        if not self._cacheable(route):
+            route.fallback()
+            return
+
+        request = route.request
+        request_headers = request.headers
+        cached = self.get(request.url, request_headers)
+        if cached is not None:
+            status, headers, body = cached
+            self.stats["hits"] += 1
+            self.stats["bytes_served"] += len(body)
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        self.stats["misses"] += 1
+        try:
+            response = route.fetch()
+        except PlaywrightError as e:
+            # 网络错误或超时：交还给后续路由和浏览器自行请求（由浏览器报告真实的失败），避免请求一直挂起
+            self.stats["fetch_errors"] += 1
+            logger.debug(f"响应缓存获取失败，回退: {request.url}, {e}")
+            route.fallback()
+            return
+        headers = response.headers
+        if response.status == 200:
+            lifetime = freshness_lifetime(headers, time.time(), self.ttl)
+            if lifetime > 0:
+                try:
+                    self.put(request.url, request_headers, response.status, headers, response.body(), lifetime)
+                except (sqlite3.Error, PlaywrightError) as e:
+                    logger.warning(f"写入响应缓存失败: {e}")
+        route.fulfill(response=response)
+
+    def attach(self, context: BrowserContext):
+        """在上下文上启用响应缓存"""
+        context.route("**/*", self._handle)
+        self._contexts.append(context)
+
+    def detach(self, context: BrowserContext):
+        """移除响应缓存路由（复用上下文前必须调用）"""
+        if context in self._contexts:
+            context.unroute("**/*", self._handle)
+            self._contexts.remove(context)
+        self.flush_access()
+
+    def close(self):
+        """关闭数据库并登记会话统计"""
+        self.flush_access()
+        self._conn.close()
+        session_stats.record("response_cache", self.stats)
+
+
+def _format_cache_stats(stats: Dict[str, Any]) -> List[str]:
+    """响应缓存终端摘要"""
+    total = stats.get("hits", 0) + stats.get("misses", 0)
+    hit_rate = stats.get("hits", 0) / total * 100 if total else 0
+    return [
+        f"请求: {total}, 命中: {stats.get('hits', 0)}, 命中率: {hit_rate:.1f}%, "
+        f"缓存提供: {stats.get('bytes_served', 0) / 1024 / 1024:.2f}MB",
+        f"写入: {stats.get('stores', 0)}, 淘汰: {stats.get('evictions', 0)}, 获取失败回退: {stats.get('fetch_errors', 0)}",
+    ]
+
+
+session_stats.register_formatter("response_cache", _format_cache_stats)
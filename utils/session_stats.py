@@ -0,0 +1,88 @@
+"""
+会话级统计汇总工具
+各功能模块在会话结束前登记统计数据，conftest 在终端摘要中统一输出；
+pytest-xdist 并行时 worker 通过 workeroutput 回传，由 controller 合并。
+"""
+import json
+from typing import Any, Callable, Dict, List
+
+
+class SessionStats:
+    """会话统计汇总器"""
+
+    def __init__(self):
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self._formatters: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {}
+
+    @staticmethod
+    def _merge_into(target: Dict[str, Any], source: Dict[str, Any]):
+        """
+        合并统计数据：数值累加，max_ 前缀取最大值，字典递归合并，其他类型直接覆盖
+
+        Args:
+            target: 合并目标
+            source: 待合并数据
+        """
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(value, dict):
+                target[key] = current if isinstance(current, dict) else {}
+                SessionStats._merge_into(target[key], value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and isinstance(current, (int, float)) and not isinstance(current, bool):
+                target[key] = max(current, value) if key.startswith("max_") else current + value
+            else:
+                target[key] = value
+
+    def record(self, section: str, stats: Dict[str, Any]):
+        """
+        登记一组统计数据（同名分组会被合并）
+
+        Args:
+            section: 分组名称
+            stats: 统计数据字典（值需可 JSON 序列化）
+        """
+        self._merge_into(self._sections.setdefault(section, {}), stats)
+
+    def get(self, section: str) -> Dict[str, Any]:
+        """获取指定分组的统计数据"""
+        return self._sections.get(section, {})
+
+    def register_formatter(self, section: str, formatter: Callable[[Dict[str, Any]], List[str]]):
+        """
+        注册分组的摘要格式化函数
+
+        Args:
+            section: 分组名称
+            formatter: 接收统计字典、返回输出行列表的函数
+        """
+        self._formatters[section] = formatter
+
+    def dumps(self) -> str:
+        """序列化全部统计数据（用于 xdist workeroutput）"""
+        return json.dumps(self._sections, ensure_ascii=False)
+
+    def loads(self, data: str):
+        """合并来自其他进程的序列化统计数据"""
+        for section, stats in json.loads(data).items():
+            self.record(section, stats)
+
+    def summary_lines(self) -> Dict[str, List[str]]:
+        """
+        生成终端摘要
+
+        Returns:
+            {分组名称: 输出行列表}
+        """
+        summary = {}
+        for section, stats in self._sections.items():
+            formatter = self._formatters.get(section)
+            if formatter:
+                summary[section] = formatter(stats)
+            else:
+                summary[section] = [f"{key}: {value}" for key, value in stats.items()]
+        return summary
+
+
+# 进程内全局实例
+session_stats = SessionStats()
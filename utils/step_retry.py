@@ -0,0 +1,197 @@
+"""
+步骤级重试工具
+页面操作（点击、填充、导航、读取文本）和等待遇到可归类的瞬时错误时，在当前步骤内退避重试，
+而不是让 pytest-rerunfailures 新建上下文、重新导航后重跑整个测试。
+每个测试有独立的重试预算，每次重试都会记录并汇总到终端摘要。
+"""
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from loguru import logger
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils.session_stats import session_stats
+
+T = TypeVar("T")
+
+# 瞬时错误分类（按错误信息匹配，小写）
+TRANSIENT_ERRORS: Dict[str, Sequence[str]] = {
+    # 元素在定位和操作之间被重新渲染
+    "detached": ("element is not attached to the dom", "element was detached", "node is detached"),
+    # 页面在读取或等待过程中发生跳转
+    "navigation": (
+        "execution context was destroyed",
+        "frame was detached",
+        "interrupted by another navigation",
+    ),
+    # 导航请求的连接被重置等网络抖动
+    "network": (
+        "net::err_connection_reset",
+        "net::err_connection_closed",
+        "net::err_network_changed",
+        "net::err_empty_response",
+        "net::err_http2_protocol_error",
+    ),
+}
+
+# 各类步骤允许重试的错误分类：
+# 点击/填充只重试动作执行前的错误，跳转类错误可能发生在点击生效之后，重试会重复操作
+ACTION_KINDS = ("detached",)
+NAVIGATE_KINDS = ("network", "navigation")
+READ_KINDS = ("detached", "navigation")
+
+
+def classify(error: BaseException, kinds: Sequence[str]) -> Optional[str]:
+    """
+    判断错误是否为允许重试的瞬时错误
+
+    Args:
+        error: 异常
+        kinds: 允许重试的错误分类
+
+    Returns:
+        错误分类，不可重试时返回 None（超时属于确定性失败，不重试）
+    """
+    if not isinstance(error, PlaywrightError) or isinstance(error, PlaywrightTimeoutError):
+        return None
+    message = str(error).lower()
+    for kind in kinds:
+        if any(pattern in message for pattern in TRANSIENT_ERRORS[kind]):
+            return kind
+    return None
+
+
+class RetryBudget:
+    """单个测试的步骤重试预算和重试记录"""
+
+    def __init__(self, nodeid: str, limit: int = 5, max_attempts: int = 3,
+                 backoff_ms: int = 200, max_backoff_ms: int = 2000):
+        """
+        Args:
+            nodeid: 测试 nodeid
+            limit: 整个测试最多重试的次数
+            max_attempts: 单个步骤最多尝试的次数（含第一次）
+            backoff_ms: 退避基础时间（毫秒），每次重试翻倍
+            max_backoff_ms: 退避上限（毫秒）
+        """
+        self.nodeid = nodeid
+        self.limit = limit
+        self.max_attempts = max_attempts
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.records: List[Dict[str, Any]] = []
+        self.recovered = 0
+        self.failed = 0
+        self.exhausted = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.limit - len(self.records)
+
+    def backoff(self, attempt: int) -> float:
+        """指数退避加随机抖动（毫秒）"""
+        delay = min(self.max_backoff_ms, self.backoff_ms * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+
+_current: Optional[RetryBudget] = None
+
+
+def begin_test(budget: RetryBudget):
+    """开始测试：设置当前测试的重试预算"""
+    global _current
+    _current = budget
+
+
+def end_test() -> Optional[RetryBudget]:
+    """结束测试：登记重试统计并返回本测试的预算"""
+    global _current
+    budget, _current = _current, None
+    if budget is None or not budget.records:
+        return budget
+    kinds: Dict[str, int] = {}
+    actions: Dict[str, int] = {}
+    for record in budget.records:
+        kinds[record["kind"]] = kinds.get(record["kind"], 0) + 1
+        actions[record["action"]] = actions.get(record["action"], 0) + 1
+    session_stats.record("step_retry", {
+        "retries": len(budget.records),
+        "recovered": budget.recovered,
+        "failed": budget.failed,
+        "budget_exhausted": budget.exhausted,
+        "kinds": kinds,
+        "actions": actions,
+        "tests": {budget.nodeid: len(budget.records)},
+    })
+    return budget
+
+
+def run_step(action: str, target: Any, func: Callable[[], T], kinds: Sequence[str]) -> T:
+    """
+    执行一个步骤，瞬时错误时在预算内退避重试
+
+    Args:
+        action: 步骤名称（click、fill、navigate 等）
+        target: 操作对象（选择器、Locator 或 URL），用于日志
+        func: 步骤函数
+        kinds: 允许重试的错误分类
+
+    Returns:
+        步骤函数的返回值
+    """
+    budget = _current
+    if budget is None:
+        return func()
+
+    attempt = 1
+    while True:
+        try:
+            result = func()
+        except PlaywrightError as e:
+            kind = classify(e, kinds)
+            if kind is None:
+                if attempt > 1:
+                    budget.failed += 1
+                raise
+            if attempt >= budget.max_attempts or budget.remaining <= 0:
+                if budget.remaining <= 0:
+                    budget.exhausted += 1
+                budget.failed += 1
+                raise
+            delay = budget.backoff(attempt)
+            budget.records.append({
+                "action": action,
+                "target": str(target),
+                "kind": kind,
+                "attempt": attempt,
+                "delay_ms": round(delay),
+                "error": str(e).splitlines()[0],
+            })
+            logger.warning(
+                f"步骤重试: {action} {target}（{kind}，第 {attempt} 次失败，{delay:.0f}ms 后重试）: "
+                f"{str(e).splitlines()[0]}"
+            )
+            time.sleep(delay / 1000)
+            attempt += 1
+            continue
+        if attempt > 1:
+            budget.recovered += 1
+        return result
+
+
+def _format_retry_stats(stats: Dict[str, Any]) -> List[str]:
+    """步骤重试终端摘要"""
+    lines = [
+        f"重试: {stats.get('retries', 0)}, 重试后成功的步骤: {stats.get('recovered', 0)}, "
+        f"重试后仍失败: {stats.get('failed', 0)}, 预算耗尽: {stats.get('budget_exhausted', 0)}",
+        "按错误分类: " + ", ".join(f"{kind} {count}" for kind, count in sorted(stats.get("kinds", {}).items())),
+        "按步骤: " + ", ".join(f"{action} {count}" for action, count in sorted(stats.get("actions", {}).items())),
+    ]
+    tests = sorted(stats.get("tests", {}).items(), key=lambda kv: kv[1], reverse=True)
+    lines.extend(f"  {nodeid}: {count} 次" for nodeid, count in tests[:10])
+    return lines
+
+
+session_stats.register_formatter("step_retry", _format_retry_stats)
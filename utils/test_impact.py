@@ -0,0 +1,367 @@
+"""
+测试影响分析工具
+依赖图由两部分组成：
+1. 静态导入分析：解析 tests/、pages/、utils/、config/ 下的模块导入关系，按文件 mtime 和大小增量更新；
+2. 运行时记录：设置 IMPACT_RECORD=true 运行测试时，记录每个测试实际调用到的 pages/、utils/ 模块
+   和通过 DataLoader.get_test_data 读取的测试数据键；session 等非函数级 fixture 调用到的模块记为共享模块。
+   async 用例在异步引擎线程中执行，不在记录范围内，只保存按静态分析选择的占位记录。
+选择测试时，根据自某个 git 引用以来变更的文件，只运行受影响的测试。
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import yaml
+
+from utils.file_lock import FileLock
+
+# 项目模块目录（运行时只记录这些目录下的模块）
+SOURCE_DIRS = ("pages", "utils", "config")
+TEST_DIRS = ("tests",)
+# 变更后需要运行全部测试的文件
+GLOBAL_FILES = ("conftest.py", "pytest.ini", "requirements.txt")
+# 配置通过类属性读取（没有函数调用，运行时记录不到），conftest 导入的配置模块变更时仍运行全部测试
+UNRECORDED_DIRS = ("config",)
+
+
+def file_signature(path: Path) -> List[int]:
+    """文件签名（mtime 和大小），用于增量更新和判断运行时记录是否过期"""
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ImpactMap:
+    """测试依赖图（缓存在 JSON 文件中）"""
+
+    VERSION = 2
+
+    def __init__(self, root: Path, map_file: Path):
+        """
+        Args:
+            root: 项目根目录
+            map_file: 依赖图缓存文件
+        """
+        self.root = Path(root)
+        self.map_file = Path(map_file)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.runtime: Dict[str, Dict[str, Any]] = {}
+        # 非函数级 fixture（只在第一个测试中建立）调用到的模块，变更后影响全部测试
+        self.shared: Set[str] = set()
+        try:
+            with open(self.map_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.files = data.get("files", {})
+                self.runtime = data.get("runtime", {})
+                self.shared = set(data.get("shared", []))
+        except (FileNotFoundError, ValueError):
+            pass
+        self._closures: Dict[str, Set[str]] = {}
+
+    # ==================== 静态导入分析 ====================
+
+    def _module_file(self, module: str) -> Optional[str]:
+        """模块名转换为项目内的相对路径，非项目模块返回 None"""
+        path = module.replace(".", "/")
+        for candidate in (f"{path}.py", f"{path}/__init__.py"):
+            if (self.root / candidate).is_file():
+                return candidate
+        return None
+
+    def _parse(self, rel: str) -> Dict[str, Any]:
+        """解析单个文件的项目内导入和字符串常量（conftest.py 只取模块顶层导入，函数内的延迟导入由运行时记录）"""
+        tree = ast.parse((self.root / rel).read_text(encoding="utf-8"), filename=rel)
+        package = rel.rsplit("/", 1)[0].replace("/", ".") if "/" in rel else ""
+        nodes = tree.body if rel == "conftest.py" else ast.walk(tree)
+
+        modules: Set[str] = set()
+        strings: Set[str] = set()
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parts = package.split(".") if package else []
+                    parts = parts[:len(parts) - node.level + 1]
+                    base = ".".join(parts + ([base] if base else []))
+                modules.add(base)
+                # from utils import step_retry 导入的是子模块
+                modules.update(f"{base}.{alias.name}" for alias in node.names)
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str) and len(node.value) < 100:
+                strings.add(node.value)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # 测试数据默认按测试函数名读取（DataLoader.get_test_data）
+                strings.add(node.name)
+
+        imports = sorted({path for path in map(self._module_file, modules) if path and path != rel})
+        return {"imports": imports, "strings": sorted(strings)}
+
+    def _source_files(self) -> List[str]:
+        files = ["conftest.py"] if (self.root / "conftest.py").is_file() else []
+        for directory in SOURCE_DIRS + TEST_DIRS:
+            files.extend(
+                path.relative_to(self.root).as_posix() for path in (self.root / directory).rglob("*.py")
+            )
+        return files
+
+    def refresh(self) -> int:
+        """
+        增量更新静态依赖：只重新解析 mtime 或大小变化的文件
+
+        Returns:
+            重新解析的文件数
+        """
+        current = set(self._source_files())
+        parsed = 0
+        for rel in current:
+            signature = file_signature(self.root / rel)
+            entry = self.files.get(rel)
+            if entry is not None and entry["signature"] == signature:
+                continue
+            try:
+                self.files[rel] = dict(self._parse(rel), signature=signature)
+            except SyntaxError:
+                self.files[rel] = {"imports": [], "strings": [], "signature": signature}
+            parsed += 1
+        for rel in set(self.files) - current:
+            del self.files[rel]
+        if parsed:
+            self._closures.clear()
+        return parsed
+
+    def closure(self, rel: str) -> Set[str]:
+        """文件及其直接和间接导入的全部项目模块"""
+        if rel in self._closures:
+            return self._closures[rel]
+        result: Set[str] = set()
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            if current in result:
+                continue
+            result.add(current)
+            stack.extend(self.files.get(current, {}).get("imports", []))
+        self._closures[rel] = result
+        return result
+
+    def global_files(self) -> Set[str]:
+        """
+        变更后影响全部测试的文件：全局配置文件，以及 conftest.py 导入的模块中运行时记录无法细化的部分
+        （没有运行时记录、共享模块、配置模块）；其余 conftest 导入的模块按各测试的运行时记录选择
+        """
+        fixture_modules = self.closure("conftest.py") - set(GLOBAL_FILES)
+        if not self.runtime:
+            return set(GLOBAL_FILES) | fixture_modules
+        return set(GLOBAL_FILES) | {
+            rel for rel in fixture_modules if rel in self.shared or rel.startswith(UNRECORDED_DIRS)
+        }
+
+    # ==================== 运行时记录 ====================
+
+    def _lock(self) -> FileLock:
+        self.map_file.parent.mkdir(parents=True, exist_ok=True)
+        return FileLock(self.map_file.with_suffix(".lock"))
+
+    def merge_runtime(self, records: Dict[str, Dict[str, Any]], shared: Iterable[str] = ()):
+        """
+        合并运行时记录（多个 xdist worker 通过文件锁串行写入）
+
+        Args:
+            records: nodeid -> 运行时记录
+            shared: 非函数级 fixture 调用到的模块
+        """
+        with self._lock():
+            try:
+                with open(self.map_file, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("version") == self.VERSION:
+                    self.runtime = dict(stored.get("runtime", {}), **self.runtime)
+                    self.shared |= set(stored.get("shared", []))
+            except (FileNotFoundError, ValueError):
+                pass
+            self.runtime.update(records)
+            self.shared |= set(shared)
+            self.save(locked=True)
+
+    def save(self, locked: bool = False):
+        """保存依赖图"""
+        if not locked:
+            with self._lock():
+                return self.save(locked=True)
+        tmp_path = self.map_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.VERSION, "files": self.files, "runtime": self.runtime, "shared": sorted(self.shared),
+            }, f)
+        os.replace(tmp_path, self.map_file)
+
+    # ==================== 选择测试 ====================
+
+    def select(self, changed: Iterable[str], changed_data: Dict[str, Optional[Set[str]]]) -> Tuple[bool, List[str]]:
+        """
+        计算受影响的测试
+
+        Args:
+            changed: 变更文件（相对项目根目录）
+            changed_data: 变更的数据文件 -> 变更的顶层键（无法比较时为 None，表示引用该文件名的测试全部受影响）
+
+        Returns:
+            (是否需要运行全部测试, 测试文件或 nodeid 列表)
+        """
+        changed = set(changed)
+        if changed & self.global_files():
+            return True, []
+        # 按运行时记录细化的 conftest 导入模块：没有记录（或只有静态占位记录）的测试无法细化，一律选中
+        fixture_changed = bool(changed & self.closure("conftest.py"))
+
+        changed_keys: Set[str] = set()
+        changed_names: Set[str] = set()
+        for path, keys in changed_data.items():
+            if keys is None:
+                changed_names.add(Path(path).name)
+            else:
+                changed_keys |= keys
+
+        test_files = sorted(
+            rel for rel in self.files
+            if rel.startswith(TEST_DIRS) and ("/test_" in f"/{rel}" or rel.endswith("_test.py"))
+        )
+        targets: List[str] = []
+        for test_file in test_files:
+            if test_file in changed:
+                targets.append(test_file)
+                continue
+            entry = self.files[test_file]
+            static_hit = bool(changed & self.closure(test_file)) or bool(
+                changed_names & set(entry["strings"]) or changed_keys & set(entry["strings"])
+            )
+            recorded = {
+                nodeid: record for nodeid, record in self.runtime.items()
+                if nodeid.startswith(f"{test_file}::") and record.get("signature") == entry["signature"]
+            }
+            if not recorded:
+                if static_hit or fixture_changed:
+                    targets.append(test_file)
+                continue
+            # 有运行时记录时按测试细化：只选择实际调用了变更模块或读取了变更数据键的测试；
+            # 静态占位记录（async 用例）按静态分析选择
+            selected = [
+                nodeid for nodeid, record in recorded.items()
+                if (static_hit or fixture_changed if record.get("static") else (
+                    changed & set(record["modules"]) or changed_keys & set(record["data_keys"])
+                ))
+                or nodeid.split("::")[-1].split("[")[0] in changed_keys
+            ]
+            targets.extend(sorted(selected))
+        return False, targets
+
+
+class RuntimeRecorder:
+    """
+    记录单个测试执行期间调用到的项目模块和读取的测试数据键（sys.setprofile，只覆盖当前线程）
+    shared() 块内（非函数级 fixture 的建立）调用到的模块记入 shared，不计入当前测试
+    """
+
+    def __init__(self, root: Path):
+        self.root = str(Path(root).resolve()) + os.sep
+        self.shared: Set[str] = set()
+        self._relpaths: Dict[str, Optional[str]] = {}
+        self._modules: Set[str] = set()
+        self._target: Set[str] = self._modules
+        self._data_keys: Set[str] = set()
+        self._data_code = None
+        self._previous = None
+
+    def _relpath(self, filename: str) -> Optional[str]:
+        rel = self._relpaths.get(filename, False)
+        if rel is False:
+            rel = None
+            if filename.startswith(self.root):
+                candidate = filename[len(self.root):].replace(os.sep, "/")
+                if candidate.startswith(SOURCE_DIRS):
+                    rel = candidate
+            self._relpaths[filename] = rel
+        return rel
+
+    def _profile(self, frame, event, arg):
+        if event != "call":
+            return
+        code = frame.f_code
+        rel = self._relpath(code.co_filename)
+        if rel is None:
+            return
+        self._target.add(rel)
+        if code is self._data_code:
+            key = frame.f_locals.get("test_name")
+            if isinstance(key, str):
+                self._data_keys.add(key)
+
+    def start(self):
+        if self._data_code is None:
+            from utils.data_loader import DataLoader
+            self._data_code = DataLoader.get_test_data.__code__
+        self._modules, self._data_keys = set(), set()
+        self._target = self._modules
+        self._previous = sys.getprofile()
+        sys.setprofile(self._profile)
+
+    def stop(self) -> Dict[str, List[str]]:
+        sys.setprofile(self._previous)
+        return {"modules": sorted(self._modules), "data_keys": sorted(self._data_keys)}
+
+    @contextmanager
+    def shared_scope(self):
+        """块内调用到的模块记为共享模块（用于 session、package、module、class 级 fixture 的建立）"""
+        previous, self._target = self._target, self.shared
+        try:
+            yield
+        finally:
+            self._target = previous
+
+    @staticmethod
+    def static_record() -> Dict[str, Any]:
+        """无法记录的测试（async 用例在异步引擎线程执行）的占位记录：选择时按静态分析"""
+        return {"static": True, "modules": [], "data_keys": []}
+
+
+def changed_files(root: Path, ref: str) -> List[str]:
+    """自 git 引用以来变更的文件（含未提交和未跟踪的文件）"""
+    diff = subprocess.run(
+        ["git", "diff", "--name-only", ref], cwd=root, capture_output=True, text=True, check=True
+    ).stdout.split()
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"], cwd=root, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return sorted(set(diff) | set(untracked))
+
+
+def changed_data_keys(root: Path, ref: str, rel: str) -> Optional[Set[str]]:
+    """
+    比较 YAML 数据文件在 git 引用和工作区中的顶层键
+
+    Returns:
+        值发生变化的顶层键，无法比较（非 YAML、解析失败）时返回 None
+    """
+    if not rel.endswith((".yaml", ".yml")):
+        return None
+    try:
+        old_text = subprocess.run(
+            ["git", "show", f"{ref}:{rel}"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        old = yaml.safe_load(old_text) or {}
+    except subprocess.CalledProcessError:
+        old = {}
+    path = Path(root) / rel
+    try:
+        new = (yaml.safe_load(path.read_text(encoding="utf-8")) or {}) if path.exists() else {}
+    except yaml.YAMLError:
+        return None
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
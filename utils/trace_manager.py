@@ -0,0 +1,151 @@
+"""
+Trace 录制工具
+支持 off / on / retain-on-failure / on-first-retry 四种模式。
+每个上下文只启动一次 tracing，每个测试录制一个 chunk，复用的上下文无需重启 tracing；
+不需要保留的 chunk 直接丢弃，不做序列化。
+开启 CPU 统计时按模式记录每个测试期间本进程树（驱动和本地浏览器）的 CPU 时间，
+用同一批测试分别以不同模式运行，对比平均值即可得到各模式的开销。
+"""
+import os
+import tempfile
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from playwright.sync_api import BrowserContext
+
+from utils.artifact_writer import ArtifactWriter
+from utils.browser_server import process_tree_cpu_seconds
+from utils.session_stats import session_stats
+
+
+class TraceManager:
+    """Trace 录制管理器"""
+
+    MODES = ("off", "on", "retain-on-failure", "on-first-retry")
+
+    def __init__(
+        self,
+        mode: str,
+        output_dir: Path,
+        artifact_writer: ArtifactWriter,
+        screenshots: bool = True,
+        snapshots: bool = True,
+        sources: bool = True,
+        measure_cpu: bool = True,
+    ):
+        """
+        Args:
+            mode: 录制模式
+                off: 不录制
+                on: 每个测试都保存 Trace
+                retain-on-failure: 每个测试都录制，仅保存失败测试的 Trace
+                on-first-retry: 仅在失败重跑的第一次重试时录制并保存
+            output_dir: Trace 保存目录
+            artifact_writer: 产物后台写入器
+            screenshots: 是否录制截图
+            snapshots: 是否录制 DOM 快照
+            sources: 是否录制源码
+            measure_cpu: 是否统计每个测试期间进程树的 CPU 时间（每个测试读取两次 /proc）
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的 Trace 模式: {mode}，可选: {', '.join(self.MODES)}")
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.artifact_writer = artifact_writer
+        self.start_options = {"screenshots": screenshots, "snapshots": snapshots, "sources": sources}
+        self.measure_cpu = measure_cpu
+        self._started: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+        self.stats = {
+            "tests": 0, "recorded": 0, "saved": 0, "discarded": 0,
+            "trace_ms": 0.0, "bytes": 0, "cpu_s": 0.0,
+        }
+
+    def should_record(self, item) -> bool:
+        """当前测试是否需要录制（on-first-retry 依赖 pytest-rerunfailures 的 execution_count）"""
+        if self.mode in ("on", "retain-on-failure"):
+            return True
+        if self.mode == "on-first-retry":
+            return getattr(item, "execution_count", 1) == 2
+        return False
+
+    def begin(self, context: BrowserContext, item) -> Dict[str, Any]:
+        """
+        测试开始：按需开始录制当前测试的 chunk
+
+        Returns:
+            录制状态，需在测试结束后传给 end
+        """
+        state: Dict[str, Any] = {"recording": False, "cpu": None}
+        if self.measure_cpu:
+            state["cpu"] = process_tree_cpu_seconds(os.getpid())
+        if not self.should_record(item):
+            return state
+        start = time.perf_counter()
+        if context not in self._started:
+            context.tracing.start(**self.start_options)
+            self._started.add(context)
+        context.tracing.start_chunk(title=item.nodeid)
+        self.stats["trace_ms"] += (time.perf_counter() - start) * 1000
+        self.stats["recorded"] += 1
+        state["recording"] = True
+        return state
+
+    def end(self, state: Dict[str, Any], context: BrowserContext, item, failed: bool) -> Optional[Path]:
+        """
+        测试结束：需要保留时把 chunk 写入临时文件并交给后台移动，否则直接丢弃
+
+        Returns:
+            Trace 保存路径，未保存时返回 None
+        """
+        self.stats["tests"] += 1
+        trace_path = None
+        if state["recording"]:
+            keep = self.mode in ("on", "on-first-retry") or failed
+            start = time.perf_counter()
+            if keep:
+                fd, tmp_path = tempfile.mkstemp(prefix="trace-", suffix=".zip")
+                os.close(fd)
+                context.tracing.stop_chunk(path=tmp_path)
+                self.stats["saved"] += 1
+                self.stats["bytes"] += os.path.getsize(tmp_path)
+                execution_count = getattr(item, "execution_count", 1)
+                suffix = f"-retry{execution_count - 1}" if execution_count > 1 else ""
+                trace_path = self.output_dir / f"trace-{item.name}{suffix}.zip"
+                self.artifact_writer.submit_file(item.nodeid, "trace", tmp_path, trace_path)
+                logger.info(f"Trace 已提交保存: {trace_path}")
+            else:
+                context.tracing.stop_chunk()
+                self.stats["discarded"] += 1
+            self.stats["trace_ms"] += (time.perf_counter() - start) * 1000
+        if state["cpu"] is not None:
+            cpu = process_tree_cpu_seconds(os.getpid())
+            if cpu is not None:
+                self.stats["cpu_s"] += cpu - state["cpu"]
+        return trace_path
+
+    def close(self):
+        """登记会话统计（off 模式也登记，作为对比基线）"""
+        if self.stats["tests"]:
+            session_stats.record("tracing", {self.mode: self.stats})
+
+
+def _format_trace_stats(stats: Dict[str, Any]) -> List[str]:
+    """Trace 终端摘要（按模式输出每测试平均 CPU、Trace 调用耗时和磁盘占用）"""
+    lines = []
+    for mode, mode_stats in stats.items():
+        tests = mode_stats.get("tests", 0)
+        recorded = mode_stats.get("recorded", 0)
+        avg_cpu = mode_stats.get("cpu_s", 0) / tests * 1000 if tests else 0
+        avg_ms = mode_stats.get("trace_ms", 0) / recorded if recorded else 0
+        lines.append(
+            f"{mode}: 测试 {tests}, 录制 {recorded}, 保存 {mode_stats.get('saved', 0)}, "
+            f"丢弃 {mode_stats.get('discarded', 0)}, 每测试平均 CPU {avg_cpu:.0f}ms, "
+            f"每次录制 Trace 调用耗时 {avg_ms:.0f}ms, 磁盘 {mode_stats.get('bytes', 0) / 1024 / 1024:.2f}MB"
+        )
+    return lines
+
+
+session_stats.register_formatter("tracing", _format_trace_stats)
@@ -0,0 +1,138 @@
+"""
+视频录制工具
+支持 off / on / retain-on-failure 三种模式，以较低分辨率录制每个测试的上下文。
+通过用例的视频在上下文关闭后直接删除，不移动到产物目录、不进入索引；
+失败用例的视频交给后台写入器保存，并在 HTML/JSON 报告中给出链接。
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from loguru import logger
+from playwright.sync_api import BrowserContext, Video
+
+from utils.artifact_writer import ArtifactWriter
+from utils.session_stats import session_stats
+
+
+class VideoManager:
+    """视频录制管理器"""
+
+    MODES = ("off", "on", "retain-on-failure")
+
+    def __init__(self, mode: str, output_dir: Path, artifact_writer: ArtifactWriter,
+                 width: int = 640, height: int = 360):
+        """
+        Args:
+            mode: 录制模式
+                off: 不录制
+                on: 保存全部视频
+                retain-on-failure: 只保存失败用例的视频
+            output_dir: 视频保存目录
+            artifact_writer: 产物后台写入器
+            width: 录制宽度（像素）
+            height: 录制高度（像素）
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的视频模式: {mode}，可选: {', '.join(self.MODES)}")
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.artifact_writer = artifact_writer
+        self.size = {"width": width, "height": height}
+        self._record_dir = None
+        self.stats = {
+            "tests": 0, "close_ms": 0.0, "saved": 0, "discarded": 0,
+            "bytes_saved": 0, "bytes_discarded": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def context_options(self) -> Dict[str, Any]:
+        """创建上下文时追加的录制参数（录制到临时目录，未启用时为空）"""
+        if not self.enabled:
+            return {}
+        if self._record_dir is None:
+            self._record_dir = tempfile.mkdtemp(prefix="pw-videos-")
+        return {"record_video_dir": self._record_dir, "record_video_size": self.size}
+
+    @staticmethod
+    def watch(context: BrowserContext) -> List[Video]:
+        """收集上下文中每个页面的视频（包括测试中途关闭的页面）"""
+        videos: List[Video] = []
+        context.on("page", lambda page: videos.append(page.video) if page.video else None)
+        return videos
+
+    def close_context(self, context: BrowserContext, videos: List[Video], item, failed: bool,
+                      remote: bool = False) -> List[Path]:
+        """
+        关闭上下文（视频在关闭时完成写入），按模式保存或删除视频
+
+        Args:
+            context: 浏览器上下文
+            videos: watch 返回的视频列表
+            item: 测试项
+            failed: 测试是否失败
+            remote: 是否连接的远程浏览器服务（视频在服务端，需要 save_as 取回）
+
+        Returns:
+            保存的视频路径
+        """
+        start = time.perf_counter()
+        context.close()
+        self.stats["close_ms"] += (time.perf_counter() - start) * 1000
+        self.stats["tests"] += 1
+
+        saved: List[Path] = []
+        keep = self.mode == "on" or failed
+        for index, video in enumerate(videos):
+            try:
+                if not keep:
+                    if not remote:
+                        self.stats["bytes_discarded"] += os.path.getsize(video.path())
+                    video.delete()
+                    self.stats["discarded"] += 1
+                    continue
+                if remote:
+                    fd, src = tempfile.mkstemp(prefix="video-", suffix=".webm")
+                    os.close(fd)
+                    video.save_as(src)
+                    video.delete()
+                else:
+                    src = video.path()
+                suffix = f"-{index}" if index else ""
+                path = self.output_dir / f"video-{item.name}{suffix}.webm"
+                self.stats["bytes_saved"] += os.path.getsize(src)
+                self.artifact_writer.submit_file(item.nodeid, "video", src, path)
+                self.stats["saved"] += 1
+                saved.append(path)
+            except Exception as e:
+                logger.warning(f"处理测试视频失败: {e}")
+        if saved:
+            logger.info(f"视频已提交保存: {', '.join(str(path) for path in saved)}")
+        return saved
+
+    def close(self):
+        """登记会话统计（off 模式也登记关闭耗时，作为对比基线）"""
+        if self.stats["tests"]:
+            session_stats.record("video", {self.mode: self.stats})
+
+
+def _format_video_stats(stats: Dict[str, Any]) -> List[str]:
+    """视频终端摘要（按模式输出每测试关闭上下文耗时和磁盘占用）"""
+    lines = []
+    for mode, mode_stats in stats.items():
+        tests = mode_stats.get("tests", 0)
+        avg_close = mode_stats.get("close_ms", 0) / tests if tests else 0
+        lines.append(
+            f"{mode}: 测试 {tests}, 每测试平均关闭上下文耗时 {avg_close:.0f}ms, "
+            f"保存 {mode_stats.get('saved', 0)} 个 {mode_stats.get('bytes_saved', 0) / 1024 / 1024:.2f}MB, "
+            f"丢弃 {mode_stats.get('discarded', 0)} 个 {mode_stats.get('bytes_discarded', 0) / 1024 / 1024:.2f}MB"
+        )
+    return lines
+
+
+session_stats.register_formatter("video", _format_video_stats)
@@ -1,9 +1,96 @@
 """
 等待工具类
+条件等待由事件驱动：页面内条件在 MutationObserver 回调或每帧（requestAnimationFrame）中检查，
+页面事件（request、response、console 等）直接等待事件本身，
+Python 条件按指数退避检查并通过 page.wait_for_timeout 让出，期间 Playwright 事件照常分发。
 """
-from playwright.sync_api import Page, Locator
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from playwright.sync_api import Page, Locator, TimeoutError as PlaywrightTimeoutError
 from loguru import logger
-from typing import Callable, Optional
+
+from config.settings import Settings
+from utils import network_quiet
+from utils.session_stats import session_stats
+from utils.step_retry import NAVIGATE_KINDS, READ_KINDS, run_step
+
+# 改动前 wait_for_condition 的固定轮询间隔，用于估算事件驱动等待节省的时间
+LEGACY_INTERVAL_MS = 500
+# Python 条件的首次检查间隔（毫秒），之后每次翻倍直到 interval
+MIN_INTERVAL_MS = 10
+# raf 检查间隔（一帧）：少于一帧内满足的等待只能是首次检查就满足
+FRAME_MS = 1000 / 60
+
+# 页面内条件：先检查一次（满足时返回 "initial"），不满足时在每次 DOM 变化后重新检查（满足时返回 "mutation"），
+# 超时返回 false
+# 条件表达式直接拼入脚本（与 wait_for_function 一样是页面函数），条件抛出的异常原样返回给调用方
+_MUTATION_WAIT_SCRIPT = """
+async ({{arg, timeout}}) => {{
+    const predicate = ({expression});
+    if (predicate(arg)) return "initial";
+    return await new Promise((resolve, reject) => {{
+        let finished = false;
+        const finish = (callback, value) => {{
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            callback(value);
+        }};
+        const check = () => {{
+            try {{
+                if (predicate(arg)) finish(resolve, "mutation");
+            }} catch (e) {{
+                finish(reject, e);
+            }}
+        }};
+        const observer = new MutationObserver(check);
+        const timer = setTimeout(() => finish(resolve, false), timeout);
+        observer.observe(document, {{subtree: true, childList: true, attributes: true, characterData: true}});
+    }});
+}}
+"""
+
+# 事件驱动等待的统计（本进程累计，会话结束时 flush 到会话统计）
+_stats: Dict[str, Any] = {}
+
+
+def _record_wait(mode: str, elapsed_ms: float, satisfied: bool, checks: int = 0, first_check: bool = False):
+    """
+    记录一次等待
+
+    Args:
+        mode: 等待方式（mutation、raf、event、python）
+        elapsed_ms: 实际等待耗时
+        satisfied: 条件是否满足（超时的等待不计算节省时间）
+        checks: Python 条件的检查次数
+        first_check: 条件在首次检查时已满足（固定间隔轮询同样立即返回，不计算节省时间）
+    """
+    entry = _stats.setdefault(mode, {"waits": 0, "timeouts": 0, "elapsed_ms": 0.0,
+                                       "polling_estimate_ms": 0.0, "checks": 0})
+    entry["waits"] += 1
+    entry["elapsed_ms"] += elapsed_ms
+    entry["checks"] += checks
+    if satisfied and (first_check or checks == 1):
+        entry["polling_estimate_ms"] += elapsed_ms
+    elif satisfied:
+        # 固定间隔轮询要等到条件满足后的下一个检查点才能返回
+        entry["polling_estimate_ms"] += math.ceil(elapsed_ms / LEGACY_INTERVAL_MS) * LEGACY_INTERVAL_MS
+    else:
+        entry["timeouts"] += 1
+        entry["polling_estimate_ms"] += elapsed_ms
+
+
+def flush():
+    """把本进程累计的等待统计登记到会话统计（可重复调用，已登记的数据不会重复计入）"""
+    global _stats
+    if not _stats:
+        return
+    stats, _stats = _stats, {}
+    session_stats.record("wait_condition", {"modes": stats})
 
 
 class WaitUtils:
@@ -11,12 +98,15 @@ class WaitUtils:
     
     def __init__(self, page: Page):
         self.page = page
+        # 尽早开始跟踪请求，wait_for_network_quiet 才能看到之前发出的请求
+        network_quiet.track(page)
     
     def wait_for_element(
         self,
         selector: str,
         timeout: int = 30000,
-        state: str = "visible"
+        state: str = "visible",
+        retry: bool = True
     ) -> Locator:
         """
         等待元素出现
@@ -25,13 +115,17 @@ class WaitUtils:
             selector: 元素选择器
             timeout: 超时时间（毫秒）
             state: 等待状态 (visible, hidden, attached, detached)
+            retry: 瞬时错误是否在本步骤内重试；已在外层步骤（run_step）中调用时传 False，避免重试嵌套
             
         Returns:
             Locator对象
         """
         logger.debug(f"等待元素: {selector}, 状态: {state}, 超时: {timeout}ms")
         locator = self.page.locator(selector)
-        locator.wait_for(state=state, timeout=timeout)
+        if not retry:
+            locator.wait_for(state=state, timeout=timeout)
+            return locator
+        run_step("wait_for_element", selector, lambda: locator.wait_for(state=state, timeout=timeout), READ_KINDS)
         return locator
     
     def wait_for_url(
@@ -47,7 +141,9 @@ class WaitUtils:
             timeout: 超时时间（毫秒）
         """
         logger.debug(f"等待URL: {url_pattern}, 超时: {timeout}ms")
-        self.page.wait_for_url(url_pattern, timeout=timeout)
+        run_step(
+            "wait_for_url", url_pattern, lambda: self.page.wait_for_url(url_pattern, timeout=timeout), NAVIGATE_KINDS
+        )
     
     def wait_for_load_state(
         self,
@@ -62,7 +158,9 @@ class WaitUtils:
             timeout: 超时时间（毫秒）
         """
         logger.debug(f"等待页面加载状态: {state}, 超时: {timeout}ms")
-        self.page.wait_for_load_state(state, timeout=timeout)
+        run_step(
+            "wait_for_load_state", state, lambda: self.page.wait_for_load_state(state, timeout=timeout), NAVIGATE_KINDS
+        )
     
     def wait_for_function(
         self,
@@ -77,11 +175,63 @@ class WaitUtils:
             timeout: 超时时间（毫秒）
         """
         logger.debug(f"等待函数: {expression}, 超时: {timeout}ms")
-        self.page.wait_for_function(expression, timeout=timeout)
+        run_step(
+            "wait_for_function", expression, lambda: self.page.wait_for_function(expression, timeout=timeout), READ_KINDS
+        )
+    
+    def wait_for_network_quiet(
+        self,
+        quiet_ms: Optional[int] = None,
+        timeout: int = 30000,
+        label: str = "wait_for_network_quiet",
+        raise_on_timeout: bool = True
+    ) -> bool:
+        """
+        等待网络静默（替代 networkidle）
+        
+        忽略 Settings 中配置的 URL 通配符、资源类型和长请求，其余请求全部结束并静默 quiet_ms 后返回。
+        请求从页面首次被跟踪时开始计入（page fixture 和 BasePage 创建时即开始跟踪）。
+        
+        Args:
+            quiet_ms: 静默窗口（毫秒），默认 Settings.NETWORK_QUIET_MS
+            timeout: 超时时间（毫秒）
+            label: 统计中记录的调用方名称
+            raise_on_timeout: 超时时抛出 PlaywrightTimeoutError（默认），为 False 时返回 False
+            
+        Returns:
+            是否在超时前达到静默
+            
+        Raises:
+            PlaywrightTimeoutError: 超时前未达到静默（raise_on_timeout 为 True 时）
+        """
+        quiet_ms = Settings.NETWORK_QUIET_MS if quiet_ms is None else quiet_ms
+        tracker = network_quiet.track(self.page)
+        start = time.monotonic()
+        deadline = start + timeout / 1000
+        while True:
+            remaining = tracker.remaining_ms(quiet_ms, since=start)
+            if remaining == 0:
+                settled = time.monotonic()
+                elapsed = (settled - start) * 1000
+                logger.debug(f"网络静默，耗时: {elapsed:.0f}ms")
+                network_quiet.record_wait(label, elapsed, tracker.networkidle_estimate(start, settled))
+                return True
+            left = (deadline - time.monotonic()) * 1000
+            if left <= 0:
+                break
+            # 仍有请求时按较短间隔检查；wait_for_timeout 期间请求事件照常分发
+            self.page.wait_for_timeout(min(remaining if remaining is not None else min(quiet_ms, 100), left))
+        
+        pending = tracker.pending(time.monotonic())
+        logger.warning(f"等待网络静默超时: {timeout}ms, 进行中的请求: {pending}")
+        network_quiet.record_wait(label, (time.monotonic() - start) * 1000, None)
+        if raise_on_timeout:
+            raise PlaywrightTimeoutError(f"等待网络静默超时: {timeout}ms（{label}），进行中的请求: {pending}")
+        return False
     
     def wait_for_condition(
         self,
-        condition: Callable[[], bool],
+        condition: Union[str, Callable[[], bool]],
         timeout: int = 30000,
         interval: int = 500
     ) -> bool:
@@ -89,22 +239,152 @@ class WaitUtils:
         等待自定义条件
         
         Args:
-            condition: 条件函数
+            condition: 条件函数；传入 JavaScript 函数字符串时在页面内由 DOM 变化驱动检查（见 wait_for_page_condition）
             timeout: 超时时间（毫秒）
-            interval: 检查间隔（毫秒）
+            interval: 最大检查间隔（毫秒），从 10ms 开始每次翻倍直到该值
             
         Returns:
             是否满足条件
         """
-        import time
-        start_time = time.time()
+        if isinstance(condition, str):
+            return self.wait_for_page_condition(condition, timeout=timeout)
+        start_time = time.perf_counter()
+        deadline = start_time + timeout / 1000
+        delay = min(MIN_INTERVAL_MS, interval)
+        checks = 0
         
-        while (time.time() - start_time) * 1000 < timeout:
+        while True:
+            checks += 1
             if condition():
-                logger.debug(f"条件满足，耗时: {(time.time() - start_time) * 1000:.0f}ms")
+                elapsed = (time.perf_counter() - start_time) * 1000
+                logger.debug(f"条件满足，耗时: {elapsed:.0f}ms，检查 {checks} 次")
+                _record_wait("python", elapsed, True, checks)
                 return True
-            time.sleep(interval / 1000)
+            remaining = (deadline - time.perf_counter()) * 1000
+            if remaining <= 0:
+                break
+            # 通过 Playwright 等待而不是 time.sleep，等待期间页面事件和路由回调照常处理
+            self.page.wait_for_timeout(min(delay, remaining))
+            delay = min(delay * 2, interval)
         
         logger.warning(f"等待条件超时: {timeout}ms")
+        _record_wait("python", (time.perf_counter() - start_time) * 1000, False, checks)
         return False
+    
+    def wait_for_page_condition(
+        self,
+        expression: str,
+        arg: Any = None,
+        timeout: int = 30000,
+        trigger: str = "mutation"
+    ) -> bool:
+        """
+        等待页面内条件（不在 Python 端轮询）
+        
+        Args:
+            expression: JavaScript 函数，接收 arg，返回真值表示条件满足，例如 "() => document.querySelectorAll('li').length > 3"
+            arg: 传给条件函数的参数（需可序列化）
+            timeout: 超时时间（毫秒）
+            trigger: 检查时机；mutation 在每次 DOM 变化后检查，
+                     raf 每帧检查（条件依赖 DOM 之外的状态时使用，如 window 变量、滚动位置）
+            
+        Returns:
+            是否满足条件
+        """
+        if trigger not in ("mutation", "raf"):
+            raise ValueError(f"不支持的检查时机: {trigger}")
+        logger.debug(f"等待页面条件（{trigger}）: {expression}, 超时: {timeout}ms")
+        start_time = time.perf_counter()
+        if trigger == "mutation":
+            script = _MUTATION_WAIT_SCRIPT.format(expression=expression)
+            result = run_step(
+                "wait_for_page_condition", expression,
+                lambda: self.page.evaluate(script, {"arg": arg, "timeout": timeout}), READ_KINDS
+            )
+            satisfied = bool(result)
+            first_check = result == "initial"
+        else:
+            try:
+                run_step(
+                    "wait_for_page_condition", expression,
+                    lambda: self.page.wait_for_function(expression, arg=arg, polling="raf", timeout=timeout),
+                    READ_KINDS
+                )
+                satisfied = True
+            except PlaywrightTimeoutError:
+                satisfied = False
+        elapsed = (time.perf_counter() - start_time) * 1000
+        if trigger == "raf":
+            first_check = satisfied and elapsed < FRAME_MS
+        _record_wait(trigger, elapsed, satisfied, first_check=first_check)
+        if satisfied:
+            logger.debug(f"页面条件满足，耗时: {elapsed:.0f}ms")
+        else:
+            logger.warning(f"等待页面条件超时: {timeout}ms")
+        return satisfied
+    
+    def wait_for_event(
+        self,
+        event: str,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        timeout: int = 30000
+    ) -> Any:
+        """
+        等待页面事件（request、response、console、dialog 等）
+        
+        事件由触发它的操作之前开始监听才不会错过，先操作再等待的场景请使用 expect_event。
+        
+        Args:
+            event: 事件名称
+            predicate: 事件过滤函数，接收事件对象
+            timeout: 超时时间（毫秒）
+            
+        Returns:
+            事件对象（Request、Response、ConsoleMessage 等）
+        """
+        logger.debug(f"等待页面事件: {event}, 超时: {timeout}ms")
+        start_time = time.perf_counter()
+        try:
+            value = self.page.wait_for_event(event, predicate=predicate, timeout=timeout)
+        except PlaywrightTimeoutError:
+            _record_wait("event", (time.perf_counter() - start_time) * 1000, False)
+            raise
+        _record_wait("event", (time.perf_counter() - start_time) * 1000, True)
+        return value
+    
+    @contextmanager
+    def expect_event(
+        self,
+        event: str,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        timeout: int = 30000
+    ):
+        """
+        在执行操作前开始监听页面事件
+        
+        Example:
+            with wait_utils.expect_event("response", lambda r: "/api/list" in r.url) as info:
+                page.click("#refresh")
+            response = info.value
+        """
+        with self.page.expect_event(event, predicate=predicate, timeout=timeout) as info:
+            yield info
+
+
+def _format_wait_stats(stats: Dict[str, Any]) -> List[str]:
+    """事件驱动等待终端摘要"""
+    lines = []
+    total_saved = 0.0
+    for mode, entry in sorted(stats.get("modes", {}).items()):
+        saved = entry.get("polling_estimate_ms", 0) - entry.get("elapsed_ms", 0)
+        total_saved += saved
+        checks = f", 检查 {entry.get('checks', 0)} 次" if mode == "python" else ""
+        lines.append(
+            f"  {mode}: {entry.get('waits', 0)} 次（超时 {entry.get('timeouts', 0)}）, "
+            f"耗时 {entry.get('elapsed_ms', 0):.0f}ms, 按 {LEGACY_INTERVAL_MS}ms 轮询估算 "
+            f"{entry.get('polling_estimate_ms', 0):.0f}ms{checks}"
+        )
+    return [f"相对固定间隔轮询节省: {total_saved:.0f}ms"] + lines
+
 
+session_stats.register_formatter("wait_condition", _format_wait_stats)